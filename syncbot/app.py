@@ -14,13 +14,27 @@ Federation API endpoints (``/api/federation/*``) handle cross-instance
 communication and are dispatched separately from Slack events.
 """
 
+import contextlib
 import json
 import logging
 import os
 import re
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from importlib.metadata import PackageNotFoundError, version
 
-from dotenv import load_dotenv
+# Imported first: starts the cold-start profile clock (stdlib only, reads no env vars).
+from logger import (
+    LazyLogValue,
+    configure_logging,
+    emit_cold_start_profile,
+    emit_metric,
+    get_request_duration_ms,
+    mark_cold_start_phase,
+    set_correlation_id,
+)
 
 try:
     __version__ = version("syncbot")
@@ -29,33 +43,43 @@ except PackageNotFoundError:
 
 # Load .env before any other app imports so env vars are available everywhere.
 # In production (Lambda) there is no .env file and this is a harmless no-op.
+from dotenv import load_dotenv
+
 load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
+mark_cold_start_phase("dotenv")
 
+# Federation, export/import, the OAuth stores, Alembic and Bolt's Lambda
+# adapter (boto3) are imported when first used, not here.
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
 from slack_bolt import App
-from slack_bolt.adapter.aws_lambda import SlackRequestHandler
 from slack_bolt.request import BoltRequest
 from slack_bolt.response import BoltResponse
 from slack_bolt.util.utils import get_boot_message
 
+mark_cold_start_phase("slack_bolt")
+
 from constants import (
     FEDERATION_ENABLED,
+    FEDERATION_OUTBOX_POLL_SECONDS,
+    FEDERATION_OUTBOX_TIME_BUDGET_SECONDS,
     HAS_REAL_BOT_TOKEN,
+    HTTP_SERVER_DRAIN_SECONDS,
+    HTTP_SERVER_MAX_IN_FLIGHT,
+    HTTP_SERVER_WORKERS,
     LOCAL_DEVELOPMENT,
+    USER_DIR_SYNC_INTERVAL_SECONDS,
     validate_config,
 )
-from db import initialize_database
-from federation.api import dispatch_federation_request
-from helpers import get_oauth_flow, get_request_type, safe_get
-from logger import (
-    configure_logging,
-    emit_metric,
-    get_request_duration_ms,
-    set_correlation_id,
-)
+from db import dispose_engine, initialize_database, request_session
+from helpers import get_oauth_flow, get_request_type, run_directory_maintenance, safe_get
+
+mark_cold_start_phase("app_modules")
+
 from routing import MAIN_MAPPER, VIEW_ACK_MAPPER, VIEW_MAPPER
 
+mark_cold_start_phase("routing")
+
 _SENSITIVE_KEYS = frozenset({
     "token", "bot_token", "access_token", "shared_secret",
     "public_key", "private_key", "private_key_encrypted",
@@ -76,7 +100,11 @@ def _redact_sensitive(obj, _depth=0):
     return obj
 
 
-SlackRequestHandler.clear_all_log_handlers()
+def _redacted_json(body: dict) -> str:
+    """Serialize a request *body* for the debug log, with sensitive keys redacted."""
+    return json.dumps(_redact_sensitive(body))
+
+
 configure_logging()
 
 validate_config()
@@ -108,18 +136,85 @@ def handler(event: dict, context: dict) -> dict:
 
     Receives an API Gateway proxy event.  Federation API paths
     (``/api/federation/*``) are handled directly; everything else
-    is delegated to the Slack Bolt request handler.
+    is delegated to the Slack Bolt request handler.  Scheduled
+    invocations (the keep-warm rule) run :func:`run_scheduled_maintenance`.
     """
+    if _is_scheduled_invocation(event):
+        run_scheduled_maintenance()
+        return {"statusCode": 200, "body": json.dumps({"status": "ok"})}
+
     path = event.get("path", "") or event.get("rawPath", "")
     if path.startswith("/api/federation"):
         return _lambda_federation_handler(event)
 
+    from slack_bolt.adapter.aws_lambda import SlackRequestHandler
+
     slack_request_handler = SlackRequestHandler(app=app)
     return slack_request_handler.handle(event, context)
 
 
+def _is_scheduled_invocation(event: dict) -> bool:
+    """True for EventBridge scheduled events, which carry no HTTP request."""
+    return "requestContext" not in event and not (event.get("path") or event.get("rawPath"))
+
+
+def run_scheduled_maintenance(*, outbox: bool = True) -> None:
+    """Background work kept out of request handling: outbox retries, directory crawls, federation user exchanges.
+
+    *outbox* is False in container mode when a dedicated thread already runs
+    :func:`run_outbox_delivery`.
+    """
+    if outbox:
+        run_outbox_delivery()
+    try:
+        run_directory_maintenance()
+    except Exception:
+        _logger.exception("scheduled_maintenance_failed")
+    if FEDERATION_ENABLED:
+        from federation import users as federation_users
+
+        try:
+            federation_users.run_user_exchange(time_budget_seconds=federation_users.BACKGROUND_TIME_BUDGET_SECONDS)
+        except Exception:
+            _logger.exception("federation_user_exchange_maintenance_failed")
+
+
+def run_outbox_delivery() -> None:
+    """Deliver queued federation events whose handler did not (remote down, or retry due)."""
+    if not FEDERATION_ENABLED:
+        return
+    from federation.outbox import BACKGROUND_SETTLE_SECONDS, deliver_outbox
+
+    try:
+        deliver_outbox(
+            settle_seconds=BACKGROUND_SETTLE_SECONDS,
+            time_budget_seconds=FEDERATION_OUTBOX_TIME_BUDGET_SECONDS,
+        )
+    except Exception:
+        _logger.exception("federation_outbox_delivery_failed")
+
+
+def _start_maintenance_thread(
+    interval_seconds: float,
+    target=run_scheduled_maintenance,
+    name: str = "syncbot-maintenance",
+) -> threading.Thread:
+    """Run *target* (default :func:`run_scheduled_maintenance`) every *interval_seconds* (container mode)."""
+
+    def _loop() -> None:
+        while True:
+            time.sleep(interval_seconds)
+            target()
+
+    thread = threading.Thread(target=_loop, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
 def _lambda_federation_handler(event: dict) -> dict:
     """Handle a federation API request inside Lambda."""
+    from federation.api import dispatch_federation_request
+
     method = event.get("httpMethod", "GET")
     path = event.get("path", "")
     body_str = event.get("body", "") or ""
@@ -153,7 +248,7 @@ def view_ack(body: dict, logger, client, ack, context: dict) -> None:
             "phase": "view_ack",
         },
     )
-    _logger.debug("request_body", extra={"body": json.dumps(_redact_sensitive(body))})
+    _logger.debug("request_body", extra={"body": LazyLogValue(_redacted_json, body)})
 
     ack_handler = VIEW_ACK_MAPPER.get(request_id)
     if ack_handler:
@@ -176,7 +271,9 @@ def main_response(body: dict, logger, client, ack, context: dict) -> None:
     call the ack handler from :data:`~routing.VIEW_ACK_MAPPER`, then the work handler.
 
     A unique correlation ID is assigned to every incoming request and
-    attached to all log entries emitted while processing it.
+    attached to all log entries emitted while processing it.  The handler
+    runs inside :func:`db.request_session`, so its database calls share one
+    session and connection.
     """
     set_correlation_id()
     request_type, request_id = get_request_type(body)
@@ -204,12 +301,13 @@ def main_response(body: dict, logger, client, ack, context: dict) -> None:
             "team_id": safe_get(body, "team_id"),
         },
     )
-    _logger.debug("request_body", extra={"body": json.dumps(_redact_sensitive(body))})
+    _logger.debug("request_body", extra={"body": LazyLogValue(_redacted_json, body)})
 
     run_function = MAIN_MAPPER.get(request_type, {}).get(request_id)
     if run_function:
         try:
-            run_function(body, client, logger, context)
+            with request_session():
+                run_function(body, client, logger, context)
             emit_metric(
                 "request_handled",
                 duration_ms=round(get_request_duration_ms(), 1),
@@ -266,18 +364,111 @@ def _http_listen_port() -> int:
         return 3000
 
 
+_BUSY_RESPONSE = (
+    b"HTTP/1.1 503 Service Unavailable\r\n"
+    b"Retry-After: 1\r\n"
+    b"Content-Length: 0\r\n"
+    b"Connection: close\r\n\r\n"
+)
+
+
+class _PooledHTTPServer(HTTPServer):
+    """``HTTPServer`` that handles requests on a pool of worker threads.
+
+    The listening thread only accepts connections.  At most *max_in_flight*
+    requests are admitted at once (running, or queued for one of *workers*
+    threads); further connections get an immediate ``503`` with
+    ``Retry-After`` so Slack retries instead of timing out.  Each worker
+    thread has its own context, so :func:`db.request_session` gives every
+    request its own DB connection.
+    """
+
+    def __init__(self, server_address, handler_class, *, workers: int, max_in_flight: int):
+        super().__init__(server_address, handler_class)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="syncbot-http")
+        self._max_in_flight = max(workers, max_in_flight)
+        self._in_flight = 0
+        self._idle = threading.Condition()
+
+    @property
+    def in_flight(self) -> int:
+        with self._idle:
+            return self._in_flight
+
+    def process_request(self, request, client_address) -> None:
+        with self._idle:
+            admitted = self._in_flight < self._max_in_flight
+            if admitted:
+                self._in_flight += 1
+        if not admitted:
+            emit_metric("http_requests_rejected")
+            with contextlib.suppress(OSError):
+                # Read what the client already sent, so closing does not reset the connection under it.
+                request.settimeout(0.05)
+                request.recv(65536)
+                request.sendall(_BUSY_RESPONSE)
+            self.shutdown_request(request)
+            return
+        self._executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address) -> None:
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._idle:
+                self._in_flight -= 1
+                self._idle.notify_all()
+
+    def drain(self, timeout: float) -> bool:
+        """Wait up to *timeout* seconds for admitted requests to finish; False if some are still running."""
+        with self._idle:
+            drained = self._idle.wait_for(lambda: self._in_flight == 0, timeout)
+        self._executor.shutdown(wait=False, cancel_futures=not drained)
+        return drained
+
+
+def _shutdown_on_sigterm(server: _PooledHTTPServer) -> None:
+    """Stop accepting on SIGTERM (Cloud Run scale-in / deploy); in-flight requests then drain."""
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    def _handle(signum, frame) -> None:
+        _logger.info("http_server_draining", extra={"in_flight": server.in_flight})
+        # shutdown() blocks until serve_forever() returns, which runs on this thread.
+        threading.Thread(target=server.shutdown, name="syncbot-http-shutdown", daemon=True).start()
+
+    signal.signal(signal.SIGTERM, _handle)
+
+
 def run_syncbot_http_server(
     *,
     port: int | None = None,
     bolt_path: str = "/slack/events",
     http_server_logger_enabled: bool = True,
+    maintenance_interval_seconds: float | None = USER_DIR_SYNC_INTERVAL_SECONDS,
+    outbox_interval_seconds: float | None = FEDERATION_OUTBOX_POLL_SECONDS,
+    workers: int = HTTP_SERVER_WORKERS,
+    max_in_flight: int = HTTP_SERVER_MAX_IN_FLIGHT,
+    drain_seconds: float = HTTP_SERVER_DRAIN_SECONDS,
 ) -> None:
     """Start the HTTP server used by Cloud Run and ``python app.py``.
 
     Serves Slack (``bolt_path``), OAuth install/callback, ``/health``, and
     ``/api/federation/*`` when :data:`~constants.FEDERATION_ENABLED` is true.
     Mirrors :class:`slack_bolt.app.app.SlackAppDevelopmentServer` routing with
-    extra paths for production parity with API Gateway + Lambda.
+    extra paths for production parity with API Gateway + Lambda.  Requests
+    run on *workers* threads with at most *max_in_flight* admitted at once
+    (see :class:`_PooledHTTPServer`), so one slow request does not hold up
+    other events or ``/health``.  On SIGTERM the server stops accepting,
+    waits up to *drain_seconds* for in-flight requests, then closes pooled
+    federation and DB connections.  Background maintenance runs on a daemon
+    thread every *maintenance_interval_seconds*, and queued federation
+    events are delivered every *outbox_interval_seconds* when federation is
+    enabled, by their own thread only (``None`` disables either; with no
+    outbox thread, maintenance delivers them).
     """
     listen_port = port if port is not None else _http_listen_port()
     _bolt_app = app
@@ -377,6 +568,8 @@ def run_syncbot_http_server(
             self._send_bolt_response(bolt_resp)
 
         def _handle_federation(self, method: str) -> None:
+            from federation.api import dispatch_federation_request
+
             try:
                 content_len = min(
                     int(self.headers.get("Content-Length", 0)),
@@ -395,19 +588,41 @@ def run_syncbot_http_server(
                 json.dumps(resp),
             )
 
-    server = HTTPServer(("0.0.0.0", listen_port), SyncBotHTTPHandler)
+    server = _PooledHTTPServer(
+        ("0.0.0.0", listen_port),
+        SyncBotHTTPHandler,
+        workers=workers,
+        max_in_flight=max_in_flight,
+    )
     if _bolt_app.logger.level > logging.INFO:
         print(get_boot_message(development_server=True))
     else:
         _bolt_app.logger.info(
             "http_server_started",
-            extra={"port": listen_port, "bolt_path": bolt_path},
+            extra={"port": listen_port, "bolt_path": bolt_path, "workers": workers, "max_in_flight": max_in_flight},
         )
+    outbox_thread = bool(_fed_enabled and outbox_interval_seconds)
+    if maintenance_interval_seconds:
+        _start_maintenance_thread(
+            maintenance_interval_seconds, lambda: run_scheduled_maintenance(outbox=not outbox_thread)
+        )
+    if outbox_thread:
+        _start_maintenance_thread(outbox_interval_seconds, run_outbox_delivery, "syncbot-federation-outbox")
+    _shutdown_on_sigterm(server)
     try:
         server.serve_forever(0.05)
     finally:
+        if not server.drain(drain_seconds):
+            _logger.warning("http_server_drain_timeout", extra={"in_flight": server.in_flight})
         server.server_close()
+        from federation.core import close_federation_sessions
+
+        close_federation_sessions()
+        dispose_engine()
+
 
+mark_cold_start_phase("init")
+emit_cold_start_profile()
 
 if __name__ == "__main__":
     run_syncbot_http_server(http_server_logger_enabled=LOCAL_DEVELOPMENT)
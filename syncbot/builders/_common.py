@@ -104,7 +104,7 @@ def _get_workspace_info(workspace: Workspace) -> dict:
         return cached
 
     try:
-        ws_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
+        ws_client = helpers.get_workspace_client(workspace)
         info = ws_client.team_info()
         result["icon_url"] = helpers.safe_get(info, "team", "icon", "image_88") or helpers.safe_get(
             info, "team", "icon", "image_68"
@@ -142,7 +142,7 @@ def _format_channel_ref(
 
     ch_name = channel_id
     try:
-        ws_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
+        ws_client = helpers.get_workspace_client(workspace)
         info = ws_client.conversations_info(channel=channel_id)
         ch_name = helpers.safe_get(info, "channel", "name") or channel_id
     except Exception as e:
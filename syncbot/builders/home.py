@@ -124,7 +124,7 @@ def refresh_home_tab_for_workspace(workspace: Workspace, logger: Logger, context
         return
     ctx = context if context is not None else {}
     try:
-        ws_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
+        ws_client = helpers.get_workspace_client(workspace)
         admin_ids = helpers.get_admin_ids(ws_client, team_id=workspace.team_id, context=ctx)
     except Exception as e:
         _logger.warning(f"refresh_home_tab_for_workspace: failed to get admins: {e}")
@@ -262,6 +262,7 @@ def build_home_tab(
         f"refresh_at:home:{team_id}:{user_id}",
         current_hash,
         block_dicts,
+        tags=(helpers.home_tab_cache_tag(team_id),),
     )
     return None
 
@@ -298,7 +299,7 @@ def _build_pending_invite_section(
         inviter_ws = helpers.get_workspace_by_id(invite.invited_by_workspace_id, context=context)
         if inviter_ws and inviter_ws.bot_token:
             try:
-                ws_client = WebClient(token=helpers.decrypt_bot_token(inviter_ws.bot_token))
+                ws_client = helpers.get_workspace_client(inviter_ws)
                 admin_name, _ = helpers.get_user_info(ws_client, invite.invited_by_slack_user_id)
                 if admin_name:
                     inviter_label = f"{admin_name} from {workspace_label}"
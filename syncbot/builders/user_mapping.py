@@ -154,7 +154,7 @@ def build_user_mapping_screen(
         member_client = None
         if ws and ws.bot_token:
             with contextlib.suppress(Exception):
-                member_client = WebClient(token=helpers.decrypt_bot_token(ws.bot_token))
+                member_client = helpers.get_workspace_client(ws)
         dir_entries = DbManager.find_records(
             UserDirectory,
             [UserDirectory.workspace_id == source_ws_id, UserDirectory.deleted_at.is_(None)],
@@ -320,7 +320,7 @@ def build_user_mapping_edit_modal(
     avatar_accessory = None
     if source_ws and source_ws.bot_token:
         with contextlib.suppress(Exception):
-            member_client = WebClient(token=helpers.decrypt_bot_token(source_ws.bot_token))
+            member_client = helpers.get_workspace_client(source_ws)
             _, avatar_url = helpers.get_user_info(member_client, mapping.source_user_id)
             if avatar_url:
                 avatar_accessory = orm.ImageAccessoryElement(image_url=avatar_url, alt_text=display)
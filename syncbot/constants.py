@@ -27,6 +27,10 @@ SLACK_BOT_SCOPES = "SLACK_BOT_SCOPES"
 SLACK_USER_SCOPES = "SLACK_USER_SCOPES"
 SLACK_SIGNING_SECRET = "SLACK_SIGNING_SECRET"
 TOKEN_ENCRYPTION_KEY = "TOKEN_ENCRYPTION_KEY"
+# Optional: output of ``python -m db.derive_token_key``; skips PBKDF2 at cold start.
+TOKEN_ENCRYPTION_DERIVED_KEY = "TOKEN_ENCRYPTION_DERIVED_KEY"
+# Optional: comma-separated earlier TOKEN_ENCRYPTION_KEY values, still accepted for decryption.
+TOKEN_ENCRYPTION_KEY_PREVIOUS = "TOKEN_ENCRYPTION_KEY_PREVIOUS"
 REQUIRE_ADMIN = "REQUIRE_ADMIN"
 
 # Database: backend-agnostic (postgresql, mysql, or sqlite)
@@ -85,6 +89,78 @@ REFRESH_COOLDOWN_SECONDS = 60
 
 SOFT_DELETE_RETENTION_DAYS = int(os.environ.get("SOFT_DELETE_RETENTION_DAYS", "30"))
 
+# ---------------------------------------------------------------------------
+# User directory sync
+#
+# ``team_join`` and ``user_profile_changed`` events keep ``user_directory``
+# current.  Full ``users.list`` crawls run only in background maintenance
+# (the scheduled keep-warm invocation, or a thread in container mode), a few
+# workspaces per run.  A workspace is re-crawled once its last crawl is older
+# than USER_DIR_REFRESH_TTL *and* user events arrived since then, or once it
+# is older than USER_DIR_FULL_SYNC_MAX_AGE_SECONDS regardless.
+# ---------------------------------------------------------------------------
+
+USER_DIR_FULL_SYNC_MAX_AGE_SECONDS = int(os.environ.get("USER_DIR_FULL_SYNC_MAX_AGE_SECONDS", str(7 * 24 * 3600)))
+USER_DIR_SYNC_WORKSPACES_PER_RUN = max(1, int(os.environ.get("USER_DIR_SYNC_WORKSPACES_PER_RUN", "1")))
+USER_DIR_SYNC_INTERVAL_SECONDS = max(1, int(os.environ.get("USER_DIR_SYNC_INTERVAL_SECONDS", "300")))
+
+# ---------------------------------------------------------------------------
+# Auto-matching
+#
+# run_auto_match_for_workspace checks unmatched mappings in batches, with
+# concurrent users.info / users.lookupByEmail calls, and stops starting new
+# batches once the time budget is spent; the next run picks up the rest.
+# ---------------------------------------------------------------------------
+
+USER_MATCH_BATCH_SIZE = max(1, int(os.environ.get("USER_MATCH_BATCH_SIZE", "200")))
+USER_MATCH_MAX_WORKERS = max(1, int(os.environ.get("USER_MATCH_MAX_WORKERS", "4")))
+USER_MATCH_TIME_BUDGET_SECONDS = float(os.environ.get("USER_MATCH_TIME_BUDGET_SECONDS", "20"))
+
+# ---------------------------------------------------------------------------
+# Message fan-out
+#
+# Maximum number of target channels a single message is synced to in
+# parallel.  ``1`` disables concurrency (targets are processed in order).
+# ---------------------------------------------------------------------------
+
+SYNC_FANOUT_MAX_WORKERS = max(1, int(os.environ.get("SYNC_FANOUT_MAX_WORKERS", "8")))
+
+# ---------------------------------------------------------------------------
+# Container HTTP server
+#
+# Requests are handled on a pool of HTTP_SERVER_WORKERS threads.  At most
+# HTTP_SERVER_MAX_IN_FLIGHT requests are accepted at once (running or queued
+# for a worker); beyond that the server answers 503 straight away.  On
+# SIGTERM it stops accepting and waits up to HTTP_SERVER_DRAIN_SECONDS for
+# in-flight requests (Cloud Run allows 10 s).
+# ---------------------------------------------------------------------------
+
+HTTP_SERVER_WORKERS = max(1, int(os.environ.get("HTTP_SERVER_WORKERS", "8")))
+HTTP_SERVER_MAX_IN_FLIGHT = max(
+    HTTP_SERVER_WORKERS, int(os.environ.get("HTTP_SERVER_MAX_IN_FLIGHT", str(4 * HTTP_SERVER_WORKERS)))
+)
+HTTP_SERVER_DRAIN_SECONDS = float(os.environ.get("HTTP_SERVER_DRAIN_SECONDS", "8"))
+
+# ---------------------------------------------------------------------------
+# Slack rate limiting
+#
+# Slack calls are shaped per workspace and method tier before they are sent.
+# A call that would have to wait longer than this is rejected instead.
+# ---------------------------------------------------------------------------
+
+SLACK_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.environ.get("SLACK_RATE_LIMIT_MAX_WAIT_SECONDS", "10"))
+
+# ---------------------------------------------------------------------------
+# In-process cache
+#
+# Entry cap per cache namespace (key prefix before the first ``:``); the least
+# recently used entry is evicted when a namespace is full.  Expired entries
+# are swept, and cache metrics emitted, at most once per sweep interval.
+# ---------------------------------------------------------------------------
+
+CACHE_MAX_ENTRIES_PER_NAMESPACE = max(1, int(os.environ.get("CACHE_MAX_ENTRIES_PER_NAMESPACE", "5000")))
+CACHE_SWEEP_INTERVAL_SECONDS = max(1, int(os.environ.get("CACHE_SWEEP_INTERVAL_SECONDS", "300")))
+
 # ---------------------------------------------------------------------------
 # Federation
 # ---------------------------------------------------------------------------
@@ -92,6 +168,24 @@ SOFT_DELETE_RETENTION_DAYS = int(os.environ.get("SOFT_DELETE_RETENTION_DAYS", "3
 SYNCBOT_INSTANCE_ID = "SYNCBOT_INSTANCE_ID"
 SYNCBOT_PUBLIC_URL = "SYNCBOT_PUBLIC_URL"
 FEDERATION_ENABLED = os.environ.get("SYNCBOT_FEDERATION_ENABLED", "false").lower() == "true"
+# Keep-alive connections kept open per remote instance (one pooled session per webhook URL).
+FEDERATION_HTTP_POOL_MAXSIZE = max(1, int(os.environ.get("FEDERATION_HTTP_POOL_MAXSIZE", "8")))
+
+# Federation outbox: queued pushes are retried with exponential backoff and
+# dead-lettered after FEDERATION_OUTBOX_MAX_ATTEMPTS failed deliveries.  In
+# container mode a thread delivers every FEDERATION_OUTBOX_POLL_SECONDS; on
+# Lambda the scheduled invocation does, for at most
+# FEDERATION_OUTBOX_TIME_BUDGET_SECONDS.
+FEDERATION_OUTBOX_MAX_ATTEMPTS = max(1, int(os.environ.get("FEDERATION_OUTBOX_MAX_ATTEMPTS", "10")))
+FEDERATION_OUTBOX_POLL_SECONDS = float(os.environ.get("FEDERATION_OUTBOX_POLL_SECONDS", "5"))
+FEDERATION_OUTBOX_TIME_BUDGET_SECONDS = float(os.environ.get("FEDERATION_OUTBOX_TIME_BUDGET_SECONDS", "10"))
+
+# Federation user directory exchange: users changed since the last exchange
+# are sent and received FEDERATION_USERS_PAGE_SIZE per request.  Background
+# maintenance repeats the exchange with each connected peer every
+# FEDERATION_USER_SYNC_INTERVAL_SECONDS.
+FEDERATION_USERS_PAGE_SIZE = max(1, int(os.environ.get("FEDERATION_USERS_PAGE_SIZE", "500")))
+FEDERATION_USER_SYNC_INTERVAL_SECONDS = max(60, int(os.environ.get("FEDERATION_USER_SYNC_INTERVAL_SECONDS", "3600")))
 
 
 # ---------------------------------------------------------------------------
@@ -8,23 +8,34 @@ Key design decisions:
 * **Automatic retry** — The :func:`_with_retry` decorator retries any
   :class:`~sqlalchemy.exc.OperationalError` up to ``_MAX_RETRIES`` times,
   disposing the engine between attempts to force a fresh connection.
+* **Request scope** — Inside :func:`request_session` every :class:`DbManager`
+  call on the same thread shares one session and one pooled connection
+  instead of building a session and checking out a connection per call.
+* **Startup fast path** — :func:`initialize_database` reads ``alembic_version``
+  with one query and only loads Alembic when the schema is not at
+  :data:`SCHEMA_HEAD_REVISION`; deploys can migrate ahead of time with
+  ``python -m db.migrate``.
 """
 
 import logging
 import os
 import ssl
 import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TypeVar
 from urllib.parse import quote_plus
 
-from sqlalchemy import and_, create_engine, func, pool, text
+from sqlalchemy import and_, create_engine, func, insert, pool, text, update
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 import constants
 from db.schemas import BaseClass
+from logger import emit_metric
 
 _logger = logging.getLogger(__name__)
 
@@ -43,6 +54,8 @@ GLOBAL_SCHEMA = None
 _MAX_RETRIES = 2
 _DB_INIT_MAX_ATTEMPTS = 15
 _DB_INIT_RETRY_SECONDS = 2
+# Revision of the newest migration in db/alembic/versions; bump it with every new migration.
+SCHEMA_HEAD_REVISION = "005_federation_user_sync"
 # Migrations live next to this package so they are included in the Lambda bundle (SAM CodeUri: syncbot/).
 _ALEMBIC_SCRIPT_LOCATION = Path(__file__).resolve().parent / "alembic"
 
@@ -215,15 +228,36 @@ def _run_alembic_upgrade() -> None:
     command.upgrade(config, "head")
 
 
-def initialize_database() -> None:
+def _schema_revision() -> str | None:
+    """Return the schema's Alembic revision from one query on the pooled engine; *None* if it cannot be read."""
+    try:
+        with get_engine().connect() as conn:
+            return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except Exception:
+        # No database, no alembic_version table yet, or the server is not up: take the full path.
+        return None
+
+
+def initialize_database(*, force_upgrade: bool = False) -> None:
     """Ensure the database exists (MySQL/PostgreSQL) and apply Alembic migrations.
 
-    Runs ``alembic upgrade head`` so the schema matches the current revision.
+    When the schema is already at :data:`SCHEMA_HEAD_REVISION` (every warm
+    start after the first boot of a release) this is one query on the
+    pooled engine.  Otherwise, or with *force_upgrade*, it creates the
+    database if needed and runs ``alembic upgrade head``.  The time taken is
+    emitted as the ``cold_start_phase`` metric (``phase="db_init"``, ``path``
+    ``fast`` or ``migrate``).
     """
+    started = time.perf_counter()
+    if not force_upgrade and _schema_revision() == SCHEMA_HEAD_REVISION:
+        _emit_db_init_phase("fast", started)
+        return
+
     for attempt in range(1, _DB_INIT_MAX_ATTEMPTS + 1):
         try:
             _ensure_database_exists()
             _run_alembic_upgrade()
+            _emit_db_init_phase("migrate", started)
             return
         except Exception as exc:
             if attempt >= _DB_INIT_MAX_ATTEMPTS:
@@ -239,6 +273,11 @@ def initialize_database() -> None:
             time.sleep(_DB_INIT_RETRY_SECONDS)
 
 
+def _emit_db_init_phase(path: str, started: float) -> None:
+    elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    emit_metric("cold_start_phase", elapsed_ms, unit="Milliseconds", phase="db_init", path=path)
+
+
 def _drop_all_tables_dialect_aware(engine) -> None:
     """Drop all tables in the current schema. MySQL / PostgreSQL / SQLite dialect-aware."""
     if _is_sqlite(engine):
@@ -340,7 +379,9 @@ def get_engine(echo: bool = False, schema: str = None):
             echo=echo,
             poolclass=pool.QueuePool,
             pool_size=1,
-            max_overflow=1,
+            # Container-mode HTTP workers each hold a request-scoped connection, and fan-out
+            # tasks (capped process-wide by helpers.fanout, not per request) one each.
+            max_overflow=constants.HTTP_SERVER_WORKERS + constants.SYNC_FANOUT_MAX_WORKERS,
             pool_recycle=3600,
             pool_pre_ping=True,
             connect_args=connect_args,
@@ -349,17 +390,105 @@ def get_engine(echo: bool = False, schema: str = None):
     return GLOBAL_ENGINE
 
 
+def dispose_engine() -> None:
+    """Close every pooled connection of the global engine (graceful shutdown)."""
+    if GLOBAL_ENGINE is not None:
+        GLOBAL_ENGINE.dispose()
+
+
+class _RequestScope:
+    """One session bound to one connection, opened lazily on first use."""
+
+    def __init__(self, schema: str = None):
+        self.schema = schema
+        self.connection = None
+        self.session: Session | None = None
+
+    def get_session(self) -> Session:
+        if self.session is None:
+            self.connection = get_engine(schema=self.schema).connect()
+            self.session = Session(bind=self.connection)
+        return self.session
+
+    def commit(self) -> None:
+        if self.session is not None:
+            self.session.commit()
+
+    def rollback(self) -> None:
+        if self.session is not None:
+            self.session.rollback()
+
+    def discard(self) -> None:
+        """Drop a connection that raised a transient error; the next call reconnects."""
+        if self.connection is not None:
+            self.connection.invalidate()
+        self.close()
+
+    def close(self) -> None:
+        if self.session is not None:
+            self.session.close()
+        if self.connection is not None:
+            self.connection.close()
+        self.session = None
+        self.connection = None
+
+
+_REQUEST_SCOPE: ContextVar[_RequestScope | None] = ContextVar("syncbot_request_scope", default=None)
+
+
+@contextmanager
+def request_session(schema: str = None) -> Iterator[None]:
+    """Share one session and connection across all :class:`DbManager` calls in the block.
+
+    Each ``DbManager`` call still ends its own transaction (reads roll back,
+    writes commit), so behaviour matches the per-call sessions; only the
+    session construction and pool checkout are shared.  Leaving the block is
+    the commit point for anything still pending on the session; an exception
+    rolls it back instead.  The connection goes back to the pool on exit.
+
+    The scope is bound to the current context, so worker threads started by
+    :func:`helpers.fan_out` keep using their own per-call sessions.  Nested
+    blocks reuse the outer scope.
+    """
+    if _REQUEST_SCOPE.get() is not None:
+        yield
+        return
+    scope = _RequestScope(schema)
+    token = _REQUEST_SCOPE.set(scope)
+    try:
+        yield
+        scope.commit()
+    except BaseException:
+        scope.rollback()
+        raise
+    finally:
+        _REQUEST_SCOPE.reset(token)
+        scope.close()
+
+
 def get_session(echo: bool = False, schema: str = None):
     if GLOBAL_SESSION:
         return GLOBAL_SESSION
+    scope = _REQUEST_SCOPE.get()
+    if scope is not None and (schema is None or schema == scope.schema):
+        return scope.get_session()
     engine = get_engine(echo=echo, schema=schema)
     return sessionmaker(bind=engine)()
 
 
 def close_session(session):
-    """Close the session (return the connection to the pool)."""
-    if session is not None:
-        session.close()
+    """Close the session (return the connection to the pool).
+
+    The request-scoped session stays open until :func:`request_session` exits;
+    its objects are detached so callers see the same state as after ``close()``.
+    """
+    if session is None:
+        return
+    scope = _REQUEST_SCOPE.get()
+    if scope is not None and session is scope.session:
+        session.expunge_all()
+        return
+    session.close()
 
 
 T = TypeVar("T")
@@ -380,6 +509,9 @@ def _with_retry(fn):
                 return fn(*args, **kwargs)
             except OperationalError as exc:
                 last_exc = exc
+                scope = _REQUEST_SCOPE.get()
+                if scope is not None:
+                    scope.discard()
                 if attempt < _MAX_RETRIES:
                     _logger.warning(f"DB operation {fn.__name__} failed (attempt {attempt + 1}), retrying: {exc}")
                 else:
@@ -409,10 +541,15 @@ class DbManager:
 
     @staticmethod
     @_with_retry
-    def find_records(cls: T, filters, schema=None) -> list[T]:
+    def find_records(cls: T, filters, schema=None, order_by=None, limit: int | None = None) -> list[T]:
         session = get_session(schema=schema)
         try:
-            records = session.query(cls).filter(and_(*filters)).all()
+            query = session.query(cls).filter(and_(*filters))
+            if order_by is not None:
+                query = query.order_by(*order_by) if isinstance(order_by, (list, tuple)) else query.order_by(order_by)
+            if limit is not None:
+                query = query.limit(limit)
+            records = query.all()
             for r in records:
                 session.expunge(r)
             return records
@@ -445,18 +582,20 @@ class DbManager:
     @staticmethod
     @_with_retry
     def find_join_records3(
-        left_cls: T, right_cls1: T, right_cls2: T, filters, schema=None, left_join=False
+        left_cls: T, right_cls1: T, right_cls2: T, filters, schema=None, left_join=False, order_by=None
     ) -> list[tuple[T]]:
         session = get_session(schema=schema)
         try:
-            records = (
+            query = (
                 session.query(left_cls, right_cls1, right_cls2)
                 .select_from(left_cls)
                 .join(right_cls1, isouter=left_join)
                 .join(right_cls2, isouter=left_join)
                 .filter(and_(*filters))
-                .all()
             )
+            if order_by is not None:
+                query = query.order_by(order_by)
+            records = query.all()
             session.expunge_all()
             return records
         finally:
@@ -479,10 +618,11 @@ class DbManager:
 
     @staticmethod
     @_with_retry
-    def update_records(cls: T, filters, fields, schema=None):
+    def update_records(cls: T, filters, fields, schema=None) -> int:
+        """Update every row matching *filters*; returns the number of rows matched."""
         session = get_session(schema=schema)
         try:
-            session.query(cls).filter(and_(*filters)).update(fields, synchronize_session="fetch")
+            count = session.query(cls).filter(and_(*filters)).update(fields, synchronize_session="fetch")
             session.flush()
             session.commit()
         except Exception:
@@ -490,6 +630,7 @@ class DbManager:
             raise
         finally:
             close_session(session)
+        return count
 
     @staticmethod
     @_with_retry
@@ -531,12 +672,70 @@ class DbManager:
         try:
             session.add_all(records)
             session.flush()
+            for record in records:
+                session.expunge(record)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            close_session(session)
+
+    @staticmethod
+    @_with_retry
+    def insert_rows(cls: T, rows: list[dict], schema=None):
+        """Insert *rows* (column name -> value dicts) with multi-row ``INSERT`` statements."""
+        if not rows:
+            return
+        session = get_session(schema=schema)
+        try:
+            session.execute(insert(cls), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            close_session(session)
+
+    @staticmethod
+    @_with_retry
+    def update_rows(cls: T, rows: list[dict], schema=None):
+        """Update rows by primary key in one batched ``UPDATE``; each dict holds ``id`` plus the columns to set."""
+        if not rows:
+            return
+        session = get_session(schema=schema)
+        try:
+            session.execute(update(cls), rows)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            close_session(session)
+
+    @staticmethod
+    @_with_retry
+    def swap_values(cls: T, column, swaps: list[tuple[int, str, str]], schema=None) -> int:
+        """Set *column* on each ``(id, old, new)`` row that still holds *old*, in one transaction.
+
+        Rows changed by someone else since they were read are left alone.
+        Returns the number of rows updated.
+        """
+        if not swaps:
+            return 0
+        session = get_session(schema=schema)
+        try:
+            updated = 0
+            for row_id, old, new in swaps:
+                result = session.execute(update(cls).where(cls.id == row_id, column == old).values({column.key: new}))
+                updated += result.rowcount
             session.commit()
         except Exception:
             session.rollback()
             raise
         finally:
             close_session(session)
+        return updated
 
     @staticmethod
     @_with_retry
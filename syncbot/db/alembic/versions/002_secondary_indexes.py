@@ -0,0 +1,60 @@
+"""Secondary indexes for hot lookup paths. Supports MySQL, PostgreSQL and SQLite.
+
+Revision ID: 002_secondary_indexes
+Revises: 001_baseline
+Create Date: Indexes matched to message-sync and user-matching queries
+
+* ``post_meta(ts)`` — ``get_post_records`` resolves a Slack ts to its post.
+* ``post_meta(post_id, sync_channel_id)`` — sibling lookup for edits, deletes,
+  replies and reactions; federation inbound lookups.
+* ``sync_channels(channel_id, status)`` — ``get_sync_list``.
+* ``sync_channels(sync_id, workspace_id)`` — sibling channels of a sync.
+* ``user_directory(workspace_id, slack_user_id)`` — directory upserts and matching.
+* ``user_mappings(source_workspace_id, source_user_id, target_workspace_id)`` —
+  mention resolution and ``get_mapped_target_user_id``.
+* ``user_mappings(target_workspace_id, match_method)`` — auto-match re-runs.
+
+Databases created from ``001_baseline`` after these indexes were added to the
+ORM models already have them (``create_all``), so each index is only created
+when missing.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "002_secondary_indexes"
+down_revision: str | None = "001_baseline"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_INDEXES: list[tuple[str, str, list[str]]] = [
+    ("ix_post_meta_ts", "post_meta", ["ts"]),
+    ("ix_post_meta_post_id_sync_channel_id", "post_meta", ["post_id", "sync_channel_id"]),
+    ("ix_sync_channels_channel_id", "sync_channels", ["channel_id", "status"]),
+    ("ix_sync_channels_sync_id_workspace_id", "sync_channels", ["sync_id", "workspace_id"]),
+    ("ix_user_directory_workspace_id_slack_user_id", "user_directory", ["workspace_id", "slack_user_id"]),
+    (
+        "ix_user_mappings_source_target",
+        "user_mappings",
+        ["source_workspace_id", "source_user_id", "target_workspace_id"],
+    ),
+    ("ix_user_mappings_target_workspace_id_match_method", "user_mappings", ["target_workspace_id", "match_method"]),
+]
+
+
+def _existing_index_names(table: str) -> set[str]:
+    inspector = sa.inspect(op.get_bind())
+    return {ix["name"] for ix in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in _INDEXES:
+        if name not in _existing_index_names(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(_INDEXES):
+        if name in _existing_index_names(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,46 @@
+"""Per-workspace user directory sync watermark. Supports MySQL, PostgreSQL and SQLite.
+
+Revision ID: 003_user_directory_sync
+Revises: 002_secondary_indexes
+Create Date: Watermark for event-driven user directory refresh
+
+* ``user_directory_sync`` — one row per workspace: ``last_full_sync_at`` (last
+  complete ``users.list`` crawl) and ``last_event_at`` (last ``team_join`` /
+  ``user_profile_changed`` applied).  Background reconciliation uses it to
+  decide which workspaces need a full crawl.
+
+Databases created from ``001_baseline`` after the table was added to the ORM
+models already have it (``create_all``), so it is only created when missing.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "003_user_directory_sync"
+down_revision: str | None = "002_secondary_indexes"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TABLE = "user_directory_sync"
+
+
+def _has_table() -> bool:
+    return sa.inspect(op.get_bind()).has_table(_TABLE)
+
+
+def upgrade() -> None:
+    if _has_table():
+        return
+    op.create_table(
+        _TABLE,
+        sa.Column("workspace_id", sa.Integer(), sa.ForeignKey("workspaces.id"), nullable=False),
+        sa.Column("last_full_sync_at", sa.DateTime(), nullable=True),
+        sa.Column("last_event_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("workspace_id"),
+    )
+
+
+def downgrade() -> None:
+    if _has_table():
+        op.drop_table(_TABLE)
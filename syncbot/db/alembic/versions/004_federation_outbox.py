@@ -0,0 +1,57 @@
+"""Durable outbox for federation pushes. Supports MySQL, PostgreSQL and SQLite.
+
+Revision ID: 004_federation_outbox
+Revises: 003_user_directory_sync
+Create Date: Queue federation events for background delivery
+
+* ``federation_outbox`` — one row per federation event awaiting delivery to a
+  federated workspace: event type and JSON payload, retry state
+  (``attempts``, ``next_attempt_at``, ``last_error``) and ``status``
+  (``pending`` / ``dead``).  Indexed by ``(federated_workspace_id, status, id)``
+  for in-order delivery per peer.
+
+Databases created from ``001_baseline`` after the table was added to the ORM
+models already have it (``create_all``), so it is only created when missing.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004_federation_outbox"
+down_revision: str | None = "003_user_directory_sync"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TABLE = "federation_outbox"
+_INDEX = "ix_federation_outbox_peer_status"
+
+
+def _has_table() -> bool:
+    return sa.inspect(op.get_bind()).has_table(_TABLE)
+
+
+def upgrade() -> None:
+    if _has_table():
+        return
+    op.create_table(
+        _TABLE,
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("federated_workspace_id", sa.Integer(), sa.ForeignKey("federated_workspaces.id"), nullable=False),
+        sa.Column("event_type", sa.String(20), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("sync_channel_id", sa.Integer(), nullable=True),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.String(500), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(_INDEX, _TABLE, ["federated_workspace_id", "status", "id"])
+
+
+def downgrade() -> None:
+    if _has_table():
+        op.drop_table(_TABLE)
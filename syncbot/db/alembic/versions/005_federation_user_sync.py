@@ -0,0 +1,59 @@
+"""Delta federation user directory exchange. Supports MySQL, PostgreSQL and SQLite.
+
+Revision ID: 005_federation_user_sync
+Revises: 004_federation_outbox
+Create Date: Watermarks for incremental user directory exchange with federated workspaces
+
+* ``federation_user_sync`` — one row per (federated workspace, local
+  workspace): ``sent_through`` / ``received_through`` watermarks of the last
+  completed user directory exchange, and ``last_exchange_at``.
+* ``user_directory(workspace_id, updated_at)`` — pages of directory rows
+  changed since a watermark.
+
+Databases created from ``001_baseline`` after these were added to the ORM
+models already have them (``create_all``), so each is only created when
+missing.
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005_federation_user_sync"
+down_revision: str | None = "004_federation_outbox"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TABLE = "federation_user_sync"
+_INDEX = "ix_user_directory_workspace_id_updated_at"
+
+
+def _has_table() -> bool:
+    return sa.inspect(op.get_bind()).has_table(_TABLE)
+
+
+def _has_index() -> bool:
+    return _INDEX in {ix["name"] for ix in sa.inspect(op.get_bind()).get_indexes("user_directory")}
+
+
+def upgrade() -> None:
+    if not _has_table():
+        op.create_table(
+            _TABLE,
+            sa.Column("federated_workspace_id", sa.Integer(), sa.ForeignKey("federated_workspaces.id"), nullable=False),
+            sa.Column("workspace_id", sa.Integer(), sa.ForeignKey("workspaces.id"), nullable=False),
+            sa.Column("sent_through", sa.DateTime(), nullable=True),
+            sa.Column("received_through", sa.DateTime(), nullable=True),
+            sa.Column("last_exchange_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("federated_workspace_id", "workspace_id"),
+        )
+    if not _has_index():
+        op.create_index(_INDEX, "user_directory", ["workspace_id", "updated_at"])
+
+
+def downgrade() -> None:
+    if _has_index():
+        op.drop_index(_INDEX, table_name="user_directory")
+    if _has_table():
+        op.drop_table(_TABLE)
@@ -0,0 +1,39 @@
+"""Print the TOKEN_ENCRYPTION_DERIVED_KEY value for the current TOKEN_ENCRYPTION_KEY.
+
+Run from ``syncbot/`` with the app's TOKEN_ENCRYPTION_KEY in the environment::
+
+    python -m db.derive_token_key
+
+and store the printed line as the TOKEN_ENCRYPTION_DERIVED_KEY secret next
+to TOKEN_ENCRYPTION_KEY, so new processes skip the PBKDF2 key derivation
+(see :mod:`helpers.encryption`).  It is as sensitive as the passphrase.
+Regenerate it whenever TOKEN_ENCRYPTION_KEY changes; a stale value is
+ignored with a warning.  Exits non-zero if encryption is not enabled.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Same .env as app.py when run locally; a harmless no-op in deployed images.
+try:
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+except ImportError:
+    pass
+
+import constants  # noqa: E402
+from helpers.encryption import _encryption_enabled, format_derived_key  # noqa: E402
+
+
+def main() -> int:
+    if not _encryption_enabled():
+        print(f"{constants.TOKEN_ENCRYPTION_KEY} is not set; token encryption is disabled.", file=sys.stderr)
+        return 1
+    print(format_derived_key(os.environ[constants.TOKEN_ENCRYPTION_KEY]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""Deploy-time migration entry point.
+
+Run from ``syncbot/`` (the Docker image's working directory, or the Lambda
+bundle root) before switching traffic to a new release::
+
+    python -m db.migrate
+
+It creates the database if needed and applies pending Alembic migrations,
+so the app's own startup check finds the schema at head and skips Alembic.
+Exits non-zero if the migration fails.
+"""
+
+import logging
+import sys
+from pathlib import Path
+
+# Same .env as app.py when run locally; a harmless no-op in deployed images.
+try:
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+except ImportError:
+    pass
+
+from db import SCHEMA_HEAD_REVISION, _schema_revision, initialize_database  # noqa: E402
+from logger import configure_logging  # noqa: E402
+
+_logger = logging.getLogger(__name__)
+
+
+def main() -> int:
+    configure_logging()
+    before = _schema_revision()
+    try:
+        initialize_database(force_upgrade=True)
+    except Exception:
+        _logger.exception("db_migrate_failed")
+        return 1
+    _logger.info("db_migrate_complete", extra={"from_revision": before, "to_revision": SCHEMA_HEAD_REVISION})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Re-encrypt stored bot tokens and the instance private key under the current key.
+
+Rotating ``TOKEN_ENCRYPTION_KEY`` without downtime:
+
+1. Deploy with the new key in ``TOKEN_ENCRYPTION_KEY`` and the old one in
+   ``TOKEN_ENCRYPTION_KEY_PREVIOUS`` (regenerate ``TOKEN_ENCRYPTION_DERIVED_KEY``
+   if you use it).  The app now encrypts with the new key and still reads
+   rows written with the old one.
+2. Run, from ``syncbot/`` with the same environment::
+
+       python -m db.reencrypt_tokens [--batch-size 500] [--dry-run]
+
+3. Once it reports no failures, drop the old key from
+   ``TOKEN_ENCRYPTION_KEY_PREVIOUS``.
+
+Rows are read in primary-key order, ``--batch-size`` at a time, and each
+batch is written in one transaction.  A row is only updated if it still
+holds the value that was read, so tokens the app rewrites meanwhile (e.g. a
+reinstall) are left alone.  Rows already under the current key are skipped
+without decrypting, so an interrupted run can simply be started again.
+Plaintext tokens stored before encryption was enabled are encrypted too.
+Exits non-zero if any row could not be decrypted with the configured keys.
+"""
+
+import argparse
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# Same .env as app.py when run locally; a harmless no-op in deployed images.
+try:
+    from dotenv import load_dotenv
+
+    load_dotenv(Path(__file__).resolve().parent.parent.parent / ".env")
+except ImportError:
+    pass
+
+from db import DbManager, schemas  # noqa: E402
+from helpers.encryption import _encryption_enabled, rotate_token  # noqa: E402
+from logger import configure_logging  # noqa: E402
+
+_logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+# (model, encrypted column) pairs holding values written by helpers.encrypt_bot_token.
+ENCRYPTED_COLUMNS = (
+    (schemas.Workspace, schemas.Workspace.bot_token),
+    (schemas.InstanceKey, schemas.InstanceKey.private_key_encrypted),
+)
+
+
+@dataclass
+class ReencryptStats:
+    scanned: int = 0
+    rotated: int = 0
+    skipped: int = 0
+    changed_meanwhile: int = 0
+    failed: int = 0
+
+
+def reencrypt_column(model, column, *, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> ReencryptStats:
+    """Re-encrypt every non-null *column* value of *model* under the current key."""
+    stats = ReencryptStats()
+    last_id = 0
+    while True:
+        rows = DbManager.find_records(
+            model,
+            [model.id > last_id, column.isnot(None)],
+            order_by=model.id,
+            limit=batch_size,
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        swaps = []
+        for row in rows:
+            stats.scanned += 1
+            value = getattr(row, column.key)
+            try:
+                rotated = rotate_token(value)
+            except ValueError:
+                stats.failed += 1
+                _logger.error("token_reencrypt_failed", extra={"table": model.__tablename__, "row_id": row.id})
+                continue
+            if rotated is None:
+                stats.skipped += 1
+            else:
+                swaps.append((row.id, value, rotated))
+        if swaps and not dry_run:
+            updated = DbManager.swap_values(model, column, swaps)
+            stats.changed_meanwhile += len(swaps) - updated
+            stats.rotated += updated
+        elif dry_run:
+            stats.rotated += len(swaps)
+        _logger.info(
+            "token_reencrypt_batch",
+            extra={"table": model.__tablename__, "last_id": last_id, "rotated": stats.rotated, "dry_run": dry_run},
+        )
+        if len(rows) < batch_size:
+            break
+    return stats
+
+
+def reencrypt_tokens(*, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> dict[str, ReencryptStats]:
+    """Run :func:`reencrypt_column` over :data:`ENCRYPTED_COLUMNS`; returns stats by table name."""
+    return {
+        model.__tablename__: reencrypt_column(model, column, batch_size=batch_size, dry_run=dry_run)
+        for model, column in ENCRYPTED_COLUMNS
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m db.reencrypt_tokens", description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without writing")
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    if not _encryption_enabled():
+        _logger.error("token_reencrypt_disabled", extra={"reason": "TOKEN_ENCRYPTION_KEY is not set"})
+        return 1
+    results = reencrypt_tokens(batch_size=max(1, args.batch_size), dry_run=args.dry_run)
+    for table, stats in results.items():
+        _logger.info("token_reencrypt_complete", extra={"table": table, "dry_run": args.dry_run, **vars(stats)})
+    return 1 if any(stats.failed for stats in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
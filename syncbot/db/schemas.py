@@ -12,14 +12,22 @@ Tables:
   timestamp so edits, deletes, and thread replies can be propagated.
 * **user_directory** — Cached copy of each workspace's user profiles,
   used for cross-workspace name-based matching.
+* **user_directory_sync** — Per-workspace watermark for ``user_directory``:
+  when ``users.list`` was last fully crawled and when the last user event
+  was applied.
 * **user_mappings** — Cross-workspace user match results (including
   confirmed matches, name-based matches, manual admin matches, and
   explicit "no match" records to avoid redundant lookups).
+* **federation_outbox** — Federation events waiting to be delivered to a
+  federated workspace, with retry state; undeliverable events stay as
+  dead letters.
+* **federation_user_sync** — Per federated workspace and local workspace
+  watermarks for the delta user directory exchange.
 """
 
 from typing import Any
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.types import DECIMAL
 
@@ -122,6 +130,10 @@ class Sync(BaseClass, GetDBClass):
 
 class SyncChannel(BaseClass, GetDBClass):
     __tablename__ = "sync_channels"
+    __table_args__ = (
+        Index("ix_sync_channels_channel_id", "channel_id", "status"),
+        Index("ix_sync_channels_sync_id_workspace_id", "sync_id", "workspace_id"),
+    )
     id = Column(Integer, primary_key=True)
     sync_id = Column(Integer, ForeignKey("syncs.id"))
     workspace_id = Column(Integer, ForeignKey("workspaces.id"))
@@ -137,6 +149,10 @@ class SyncChannel(BaseClass, GetDBClass):
 
 class PostMeta(BaseClass, GetDBClass):
     __tablename__ = "post_meta"
+    __table_args__ = (
+        Index("ix_post_meta_ts", "ts"),
+        Index("ix_post_meta_post_id_sync_channel_id", "post_id", "sync_channel_id"),
+    )
     id = Column(Integer, primary_key=True)
     post_id = Column(String(100))
     sync_channel_id = Column(Integer, ForeignKey("sync_channels.id"))
@@ -150,6 +166,10 @@ class UserDirectory(BaseClass, GetDBClass):
     """Cached user profile from a Slack workspace, used for name matching."""
 
     __tablename__ = "user_directory"
+    __table_args__ = (
+        Index("ix_user_directory_workspace_id_slack_user_id", "workspace_id", "slack_user_id"),
+        Index("ix_user_directory_workspace_id_updated_at", "workspace_id", "updated_at"),
+    )
     id = Column(Integer, primary_key=True)
     workspace_id = Column(Integer, ForeignKey("workspaces.id"))
     slack_user_id = Column(String(100), nullable=False)
@@ -164,10 +184,31 @@ class UserDirectory(BaseClass, GetDBClass):
         return UserDirectory.id
 
 
+class UserDirectorySync(BaseClass, GetDBClass):
+    """Sync watermark for one workspace's ``user_directory`` rows."""
+
+    __tablename__ = "user_directory_sync"
+    workspace_id = Column(Integer, ForeignKey("workspaces.id"), primary_key=True)
+    last_full_sync_at = Column(DateTime, nullable=True)
+    last_event_at = Column(DateTime, nullable=True)
+
+    def get_id():
+        return UserDirectorySync.workspace_id
+
+
 class UserMapping(BaseClass, GetDBClass):
     """Cross-workspace user match result (or explicit no-match)."""
 
     __tablename__ = "user_mappings"
+    __table_args__ = (
+        Index(
+            "ix_user_mappings_source_target",
+            "source_workspace_id",
+            "source_user_id",
+            "target_workspace_id",
+        ),
+        Index("ix_user_mappings_target_workspace_id_match_method", "target_workspace_id", "match_method"),
+    )
     id = Column(Integer, primary_key=True)
     source_workspace_id = Column(Integer, ForeignKey("workspaces.id"))
     source_user_id = Column(String(100), nullable=False)
@@ -223,3 +264,51 @@ class FederatedWorkspace(BaseClass, GetDBClass):
 
     def get_id():
         return FederatedWorkspace.id
+
+
+class FederationOutbox(BaseClass, GetDBClass):
+    """A federation event queued for delivery to a federated workspace.
+
+    Rows are delivered per ``federated_workspace_id`` in ``id`` order and
+    deleted once delivered.  ``next_attempt_at`` holds the retry backoff (and
+    a short lease while a worker is delivering); rows that keep failing, or
+    that the remote rejects, are kept with ``status="dead"``.
+    ``sync_channel_id`` is the local channel whose ``post_meta`` row receives
+    the remote ``ts`` of a delivered message.
+    """
+
+    __tablename__ = "federation_outbox"
+    __table_args__ = (Index("ix_federation_outbox_peer_status", "federated_workspace_id", "status", "id"),)
+    id = Column(Integer, primary_key=True)
+    federated_workspace_id = Column(Integer, ForeignKey("federated_workspaces.id"), nullable=False)
+    event_type = Column(String(20), nullable=False)
+    payload = Column(Text, nullable=False)
+    sync_channel_id = Column(Integer, nullable=True)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(String(500), nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    def get_id():
+        return FederationOutbox.id
+
+
+class FederationUserSync(BaseClass, GetDBClass):
+    """Delta watermarks for the user directory exchange with one federated workspace.
+
+    ``sent_through`` is the ``updated_at`` of the newest local directory row
+    of ``workspace_id`` the peer has received; ``received_through`` is the
+    watermark the peer returned for its own directory.  Both only advance
+    when an exchange completes.
+    """
+
+    __tablename__ = "federation_user_sync"
+    federated_workspace_id = Column(Integer, ForeignKey("federated_workspaces.id"), primary_key=True)
+    workspace_id = Column(Integer, ForeignKey("workspaces.id"), primary_key=True)
+    sent_through = Column(DateTime, nullable=True)
+    received_through = Column(DateTime, nullable=True)
+    last_exchange_at = Column(DateTime, nullable=True)
+
+    def get_id():
+        return FederationUserSync.federated_workspace_id
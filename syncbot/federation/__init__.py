@@ -1,58 +1,71 @@
 """Cross-instance federation for SyncBot.
 
-Re-exports public API from :mod:`federation.core` and
-:mod:`federation.api` so callers can use ``import federation``
+Re-exports public API from :mod:`federation.core`,
+:mod:`federation.outbox` and :mod:`federation.users` so callers can use ``import federation``
 and access all federation functions directly.
+
+The submodules (and with them ``requests`` and ``cryptography``) are
+imported on first attribute access, so ``import federation`` costs nothing
+on instances and requests that never talk to a federated peer.
 """
 
-from federation.core import (
-    FEDERATION_USER_AGENT,
-    build_delete_payload,
-    build_edit_payload,
-    build_message_payload,
-    build_reaction_payload,
-    federation_sign,
-    federation_verify,
-    generate_federation_code,
-    get_instance_id,
-    get_or_create_federated_workspace,
-    get_or_create_instance_keypair,
-    get_public_url,
-    initiate_federation_connect,
-    parse_federation_code,
-    ping_federated_workspace,
-    push_delete,
-    push_edit,
-    push_message,
-    push_reaction,
-    push_users,
-    sign_body,
-    validate_webhook_url,
-    verify_body,
-)
+import importlib
+
+_OUTBOX_EXPORTS = frozenset({"deliver_outbox", "enqueue_events"})
+_USERS_EXPORTS = frozenset({"exchange_user_directory", "run_user_exchange"})
 
 __all__ = [
+    "BATCH_MAX_BYTES",
+    "BATCH_MAX_EVENTS",
+    "BATCH_PATH",
     "FEDERATION_USER_AGENT",
     "build_delete_payload",
     "build_edit_payload",
     "build_message_payload",
     "build_reaction_payload",
+    "close_federation_sessions",
+    "deliver_events",
+    "deliver_outbox",
+    "enqueue_events",
+    "exchange_user_directory",
     "federation_sign",
     "federation_verify",
     "generate_federation_code",
+    "get_federated_peer",
     "get_instance_id",
     "get_or_create_federated_workspace",
     "get_or_create_instance_keypair",
     "get_public_url",
     "initiate_federation_connect",
+    "invalidate_federated_peer",
     "parse_federation_code",
     "ping_federated_workspace",
+    "push_batch",
     "push_delete",
     "push_edit",
     "push_message",
     "push_reaction",
     "push_users",
+    "run_user_exchange",
     "sign_body",
     "validate_webhook_url",
     "verify_body",
 ]
+
+
+def __getattr__(name: str):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if name in _OUTBOX_EXPORTS:
+        module = importlib.import_module("federation.outbox")
+    elif name in _USERS_EXPORTS:
+        module = importlib.import_module("federation.users")
+    else:
+        module = importlib.import_module("federation.core")
+    value = getattr(module, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
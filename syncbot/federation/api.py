@@ -15,7 +15,8 @@ Endpoints:
 * ``POST /api/federation/message/edit``   -- Receive a message edit
 * ``POST /api/federation/message/delete`` -- Receive a message delete
 * ``POST /api/federation/message/react``  -- Receive a reaction
-* ``POST /api/federation/users``    -- Exchange user directory
+* ``POST /api/federation/batch``    -- Receive several of the above events at once
+* ``POST /api/federation/users``    -- Exchange user directory changes, a page at a time
 * ``GET  /api/federation/ping``     -- Health check
 """
 
@@ -25,12 +26,12 @@ import re
 from datetime import UTC, datetime
 
 from slack_sdk.errors import SlackApiError
-from slack_sdk.web import WebClient
 
 import constants
 import helpers
 from db import DbManager, schemas
 from federation import core as federation
+from federation import users as federation_users
 
 _logger = logging.getLogger(__name__)
 
@@ -154,15 +155,19 @@ def _verify_federated_request(body_str: str, headers: dict) -> schemas.Federated
     if not sig or not ts or not instance_id:
         return None
 
-    matches = DbManager.find_records(
-        schemas.FederatedWorkspace,
-        [schemas.FederatedWorkspace.instance_id == instance_id],
-    )
-    fed_ws = matches[0] if matches else None
-    if not fed_ws or fed_ws.status != "active":
+    peer = federation.get_federated_peer(instance_id)
+    if peer is None or peer[0].status != "active":
         return None
-
-    if not federation.federation_verify(body_str, sig, ts, fed_ws.public_key):
+    fed_ws, public_key = peer
+
+    verified = public_key is not None and federation.federation_verify(body_str, sig, ts, public_key)
+    if not verified:
+        # The cached key may predate a re-pairing made through another instance.
+        fresh = federation.get_federated_peer(instance_id, refresh=True)
+        if fresh and fresh[0].status == "active" and fresh[0].public_key != fed_ws.public_key:
+            fed_ws, public_key = fresh
+            verified = public_key is not None and federation.federation_verify(body_str, sig, ts, public_key)
+    if not verified:
         _logger.warning(
             "federation_auth_failed — remote workspace may have regenerated its keypair; reconnection required",
             extra={"instance_id": instance_id},
@@ -230,33 +235,6 @@ def _resolve_channel_for_federated(
     return sync_channel, workspace
 
 
-def _get_local_workspace_ids(fed_ws: schemas.FederatedWorkspace) -> set[int]:
-    """Return local workspace IDs that participate in groups shared with *fed_ws*."""
-    fed_members = DbManager.find_records(
-        schemas.WorkspaceGroupMember,
-        [
-            schemas.WorkspaceGroupMember.federated_workspace_id == fed_ws.id,
-            schemas.WorkspaceGroupMember.status == "active",
-            schemas.WorkspaceGroupMember.deleted_at.is_(None),
-        ],
-    )
-    ws_ids: set[int] = set()
-    for fed_member in fed_members:
-        group_members = DbManager.find_records(
-            schemas.WorkspaceGroupMember,
-            [
-                schemas.WorkspaceGroupMember.group_id == fed_member.group_id,
-                schemas.WorkspaceGroupMember.workspace_id.isnot(None),
-                schemas.WorkspaceGroupMember.status == "active",
-                schemas.WorkspaceGroupMember.deleted_at.is_(None),
-            ],
-        )
-        for m in group_members:
-            if m.workspace_id:
-                ws_ids.add(m.workspace_id)
-    return ws_ids
-
-
 # ---------------------------------------------------------------------------
 # POST /api/federation/pair
 # ---------------------------------------------------------------------------
@@ -402,7 +380,7 @@ def handle_message(body: dict, fed_ws: schemas.FederatedWorkspace) -> tuple[int,
     workspace_name = user.get("workspace_name", "Remote")
 
     text = _resolve_mentions_for_federated(text, workspace.id, workspace_name)
-    ws_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
+    ws_client = helpers.get_workspace_client(workspace)
     text = helpers.resolve_channel_references(text, ws_client, None, target_workspace_id=workspace.id)
 
     try:
@@ -430,7 +408,7 @@ def handle_message(body: dict, fed_ws: schemas.FederatedWorkspace) -> tuple[int,
                 )
 
         res = helpers.post_message(
-            bot_token=helpers.decrypt_bot_token(workspace.bot_token),
+            bot_token=helpers.get_bot_token(workspace),
             channel_id=channel_id,
             msg_text=text,
             user_name=user_name,
@@ -484,7 +462,7 @@ def handle_message_edit(body: dict, fed_ws: schemas.FederatedWorkspace) -> tuple
 
     remote_label = fed_ws.primary_workspace_name or fed_ws.name or "Remote"
     text = _resolve_mentions_for_federated(text, workspace.id, remote_label)
-    ws_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
+    ws_client = helpers.get_workspace_client(workspace)
     text = helpers.resolve_channel_references(text, ws_client, None, target_workspace_id=workspace.id)
 
     post_records = _find_post_records(post_id, sync_channel.id)
@@ -522,7 +500,7 @@ def handle_message_delete(body: dict, fed_ws: schemas.FederatedWorkspace) -> tup
     post_records = _find_post_records(post_id, sync_channel.id)
 
     deleted = 0
-    ws_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
+    ws_client = helpers.get_workspace_client(workspace)
     for post_meta in post_records:
         try:
             ws_client.chat_delete(channel=channel_id, ts=str(post_meta.ts))
@@ -560,8 +538,8 @@ def handle_message_react(body: dict, fed_ws: schemas.FederatedWorkspace) -> tupl
     post_records = _find_post_records(post_id, sync_channel.id)
 
     applied = 0
-    bot_token = helpers.decrypt_bot_token(workspace.bot_token)
-    ws_client = WebClient(token=bot_token)
+    bot_token = helpers.get_bot_token(workspace)
+    ws_client = helpers.get_workspace_client(workspace)
     for post_meta in post_records:
         try:
             if action == "add":
@@ -603,79 +581,105 @@ def handle_message_react(body: dict, fed_ws: schemas.FederatedWorkspace) -> tupl
     return 200, {"ok": True, "applied": applied}
 
 
+# ---------------------------------------------------------------------------
+# POST /api/federation/batch
+# ---------------------------------------------------------------------------
+
+
+def handle_batch(body: dict, fed_ws: schemas.FederatedWorkspace) -> tuple[int, dict]:
+    """Apply a batch envelope of message / edit / delete / react events in order.
+
+    The envelope is signed as a whole, so each event is handled exactly as if
+    it had been posted to its own endpoint.  Returns per-event results as
+    ``{"status": <code>, "body": <response>}`` in envelope order; an event
+    whose handler raises gets a ``500`` result without affecting the others.
+    """
+    events = body.get("events")
+    if not isinstance(events, list) or not events:
+        return 400, {"error": "missing_events"}
+    if len(events) > federation.BATCH_MAX_EVENTS:
+        return 400, {"error": "too_many_events"}
+
+    handlers = {
+        "message": handle_message,
+        "edit": handle_message_edit,
+        "delete": handle_message_delete,
+        "react": handle_message_react,
+    }
+    results = []
+    for event in events:
+        handler = handlers.get(event.get("type")) if isinstance(event, dict) else None
+        payload = event.get("payload") if handler else None
+        if not isinstance(payload, dict):
+            results.append({"status": 400, "body": {"error": "invalid_event"}})
+            continue
+        try:
+            status, response = handler(payload, fed_ws)
+        except Exception:
+            # Report this event only: a 500 for the envelope would make the
+            # sender resend (and us re-apply) the events before it.
+            _logger.exception(
+                "federation_batch_event_error",
+                extra={"remote": fed_ws.instance_id, "type": event.get("type")},
+            )
+            status, response = 500, {"error": "internal_error"}
+        results.append({"status": status, "body": response})
+
+    _logger.info(
+        "federation_batch_received",
+        extra={"remote": fed_ws.instance_id, "count": len(events)},
+    )
+    return 200, {"ok": True, "results": results}
+
+
 # ---------------------------------------------------------------------------
 # POST /api/federation/users
 # ---------------------------------------------------------------------------
 
 
 def handle_users(body: dict, fed_ws: schemas.FederatedWorkspace) -> tuple[int, dict]:
-    """Exchange user directory with a federated workspace.
+    """Exchange user directory changes with a federated workspace.
 
-    Only returns users from workspaces that share groups with this federated workspace.
+    Stores the page of remote users in the request, then returns one page of
+    local users changed since ``since`` (see :mod:`federation.users`).  Only
+    users from workspaces that share groups with this federated workspace
+    are returned.
     """
+    try:
+        since = federation_users.parse_watermark(body.get("since"))
+        limit = min(int(body.get("limit", constants.FEDERATION_USERS_PAGE_SIZE)), constants.FEDERATION_USERS_PAGE_SIZE)
+    except (TypeError, ValueError):
+        return 400, {"error": "invalid_since_or_limit"}
+
     remote_users = body.get("users", [])[:5000]
     workspace_id = body.get("workspace_id")
 
     if remote_users and workspace_id:
-        now = datetime.now(UTC)
-        for u in remote_users:
-            existing = DbManager.find_records(
-                schemas.UserDirectory,
-                [
-                    schemas.UserDirectory.workspace_id == workspace_id,
-                    schemas.UserDirectory.slack_user_id == u.get("user_id", ""),
-                ],
-            )
-            if existing:
-                DbManager.update_records(
-                    schemas.UserDirectory,
-                    [schemas.UserDirectory.id == existing[0].id],
-                    {
-                        schemas.UserDirectory.email: u.get("email"),
-                        schemas.UserDirectory.real_name: u.get("real_name"),
-                        schemas.UserDirectory.display_name: u.get("display_name"),
-                        schemas.UserDirectory.updated_at: now,
-                    },
-                )
-            else:
-                record = schemas.UserDirectory(
-                    workspace_id=workspace_id,
-                    slack_user_id=u.get("user_id", ""),
-                    email=u.get("email"),
-                    real_name=u.get("real_name"),
-                    display_name=u.get("display_name"),
-                    updated_at=now,
-                )
-                DbManager.create_record(record)
-
+        applied = federation_users.apply_remote_users(remote_users, workspace_id)
         _logger.info(
             "federation_users_received",
-            extra={"remote": fed_ws.instance_id, "count": len(remote_users)},
+            extra={"remote": fed_ws.instance_id, "count": applied},
         )
 
-    allowed_ws_ids = _get_local_workspace_ids(fed_ws)
-
-    local_users = []
-    for ws_id in allowed_ws_ids:
+    allowed_ws_ids = []
+    for ws_id in sorted(federation_users.shared_workspace_ids(fed_ws)):
         ws = helpers.get_workspace_by_id(ws_id)
-        if not ws or ws.deleted_at:
-            continue
-        users = DbManager.find_records(
-            schemas.UserDirectory,
-            [schemas.UserDirectory.workspace_id == ws_id, schemas.UserDirectory.deleted_at.is_(None)],
+        if ws and not ws.deleted_at:
+            allowed_ws_ids.append(ws_id)
+
+    try:
+        local_users, next_cursor, watermark = federation_users.changed_users(
+            allowed_ws_ids, since, body.get("cursor"), limit
         )
-        for u in users:
-            local_users.append(
-                {
-                    "user_id": u.slack_user_id,
-                    "email": u.email,
-                    "real_name": u.real_name,
-                    "display_name": u.display_name,
-                    "workspace_id": ws_id,
-                }
-            )
+    except ValueError:
+        return 400, {"error": "invalid_cursor"}
 
-    return 200, {"ok": True, "users": local_users}
+    return 200, {
+        "ok": True,
+        "users": local_users,
+        "next_cursor": next_cursor,
+        "watermark": watermark.isoformat() if watermark else None,
+    }
 
 
 # ---------------------------------------------------------------------------
@@ -737,6 +741,8 @@ def dispatch_federation_request(method: str, path: str, body_str: str, headers:
         return handle_message_delete(body, fed_ws)
     elif path == "/api/federation/message/react":
         return handle_message_react(body, fed_ws)
+    elif path == federation.BATCH_PATH:
+        return handle_batch(body, fed_ws)
     elif path == "/api/federation/users":
         return handle_users(body, fed_ws)
 
@@ -5,7 +5,8 @@ Provides:
 * **Ed25519 signing and verification** of inter-instance HTTP requests.
 * **Auto-generated keypair** created on first boot and stored in the DB.
 * **HTTP client** for pushing events (messages, edits, deletes, reactions,
-  user-directory exchanges) to federated workspaces.
+  user-directory exchanges) to federated workspaces, over one pooled
+  keep-alive session per remote instance.
 * **Connection code** generation and parsing (encodes webhook URL + code +
   instance ID + public key).
 * **Payload builders** for standardised federation message formats.
@@ -17,14 +18,16 @@ import json
 import logging
 import os
 import secrets
+import threading
 import time
 import uuid
+from collections.abc import Iterator
 from datetime import UTC, datetime
 from urllib.parse import urlparse
 
 import requests
 from cryptography.exceptions import InvalidSignature
-from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey, Ed25519PublicKey
 from cryptography.hazmat.primitives.serialization import (
     Encoding,
     NoEncryption,
@@ -33,9 +36,11 @@ from cryptography.hazmat.primitives.serialization import (
     load_pem_private_key,
     load_pem_public_key,
 )
+from requests.adapters import HTTPAdapter
 
 import constants
 from db import DbManager, schemas
+from logger import emit_metric
 
 _logger = logging.getLogger(__name__)
 
@@ -137,10 +142,20 @@ def federation_sign(body: str) -> tuple[str, str]:
     return base64.b64encode(sig).decode(), ts
 
 
-def federation_verify(body: str, signature_b64: str, timestamp: str, public_key_pem: str) -> bool:
+def _load_public_key(public_key: str | Ed25519PublicKey) -> Ed25519PublicKey:
+    if isinstance(public_key, Ed25519PublicKey):
+        return public_key
+    return load_pem_public_key(public_key.encode())
+
+
+def federation_verify(
+    body: str, signature_b64: str, timestamp: str, public_key_pem: str | Ed25519PublicKey
+) -> bool:
     """Verify an incoming federation request using the sender's public key.
 
-    Returns *True* if the signature is valid and the timestamp is fresh.
+    *public_key_pem* may also be an already parsed key (see
+    :func:`get_federated_peer`).  Returns *True* if the signature is valid
+    and the timestamp is fresh.
     """
     try:
         ts_int = int(timestamp)
@@ -152,7 +167,7 @@ def federation_verify(body: str, signature_b64: str, timestamp: str, public_key_
         return False
 
     try:
-        public_key = load_pem_public_key(public_key_pem.encode())
+        public_key = _load_public_key(public_key_pem)
         signing_str = f"{timestamp}:{body}".encode()
         public_key.verify(base64.b64decode(signature_b64), signing_str)
         return True
@@ -177,6 +192,65 @@ def verify_body(body: str, signature_b64: str, public_key_pem: str) -> bool:
         return False
 
 
+# ---------------------------------------------------------------------------
+# Verified-peer cache
+# ---------------------------------------------------------------------------
+
+# Inbound requests name their sender by instance ID; the peer's row and parsed
+# public key are cached under ``federation_peer:<instance_id>`` so a busy peer
+# does not cost a DB query and a PEM parse per request.  Hit rate is reported
+# by the cache sweep (``cache_hits`` / ``cache_misses``, namespace
+# ``federation_peer``).  Any change to a peer's key or status goes through
+# :func:`get_or_create_federated_workspace`, which drops the entry.
+_PEER_CACHE_TTL = 300
+
+
+def get_federated_peer(
+    instance_id: str, *, refresh: bool = False
+) -> tuple[schemas.FederatedWorkspace, Ed25519PublicKey | None] | None:
+    """Return ``(federated workspace, parsed public key)`` for *instance_id*, or *None* if unknown.
+
+    The workspace is returned whatever its status; callers check
+    ``status``.  The key is *None* if the stored PEM cannot be parsed.
+    *refresh* bypasses the cache (e.g. after another instance re-paired the
+    peer).
+    """
+    from helpers._cache import _cache_get, _cache_set
+
+    key = f"federation_peer:{instance_id}"
+    if not refresh:
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+    matches = DbManager.find_records(
+        schemas.FederatedWorkspace,
+        [schemas.FederatedWorkspace.instance_id == instance_id],
+    )
+    if not matches:
+        return None
+    fed_ws = matches[0]
+    try:
+        public_key = _load_public_key(fed_ws.public_key)
+    except (ValueError, TypeError):
+        public_key = None
+    if public_key is not None and not isinstance(public_key, Ed25519PublicKey):
+        public_key = None
+    peer = (fed_ws, public_key)
+    _cache_set(key, peer, ttl=_PEER_CACHE_TTL)
+    return peer
+
+
+def invalidate_federated_peer(instance_id: str | None = None) -> None:
+    """Drop the cached peer for *instance_id*, or every cached peer."""
+    from helpers._cache import _cache_delete, _cache_delete_namespace
+
+    if instance_id is None:
+        _cache_delete_namespace("federation_peer")
+    else:
+        _cache_delete(f"federation_peer:{instance_id}")
+
+
 # ---------------------------------------------------------------------------
 # URL validation (SSRF protection)
 # ---------------------------------------------------------------------------
@@ -335,6 +409,7 @@ def get_or_create_federated_workspace(
             [schemas.FederatedWorkspace.id == existing.id],
             update_fields,
         )
+        invalidate_federated_peer(instance_id)
         return DbManager.get_record(schemas.FederatedWorkspace, existing.id)
 
     fed_ws = schemas.FederatedWorkspace(
@@ -349,6 +424,7 @@ def get_or_create_federated_workspace(
         updated_at=datetime.now(UTC),
     )
     DbManager.create_record(fed_ws)
+    invalidate_federated_peer(instance_id)
     return DbManager.get_record(schemas.FederatedWorkspace, fed_ws.id)
 
 
@@ -360,24 +436,115 @@ _REQUEST_TIMEOUT = 15  # seconds
 _MAX_RETRIES = 3
 _RETRY_BACKOFF = [1, 2, 4]  # seconds between retries
 
+# One pooled keep-alive session per remote base URL, shared by every thread in
+# the process, so repeated pushes to the same instance reuse their TCP+TLS
+# connections instead of opening a new one per request.
+_sessions_lock = threading.Lock()
+_sessions: dict[str, requests.Session] = {}
+# Per session: (requests, connections) already reported as metrics.
+_reported: dict[str, tuple[int, int]] = {}
+
+
+def _session_key(base_url: str) -> str:
+    return base_url.rstrip("/")
+
+
+def _federation_session(base_url: str) -> requests.Session:
+    """Return the shared pooled session for the remote instance at *base_url*."""
+    key = _session_key(base_url)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=constants.FEDERATION_HTTP_POOL_MAXSIZE,
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = FEDERATION_USER_AGENT
+            _sessions[key] = session
+            _reported[key] = (0, 0)
+    return session
+
+
+def _pool_counters(session: requests.Session) -> tuple[int, int]:
+    """Return ``(requests sent, connections opened)`` over all of *session*'s pools."""
+    sent = opened = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        # RecentlyUsedContainer does not support iteration; keys() returns a snapshot.
+        pool_keys = pools.keys()
+        for pool_key in pool_keys:
+            pool = pools.get(pool_key)
+            if pool is not None:
+                sent += pool.num_requests
+                opened += pool.num_connections
+    return sent, opened
+
+
+def _report_connection_reuse(base_url: str) -> None:
+    """Emit ``federation_http_connections_opened`` / ``_reused`` since the last report."""
+    key = _session_key(base_url)
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            return
+        sent, opened = _pool_counters(session)
+        last_sent, last_opened = _reported[key]
+        _reported[key] = (sent, opened)
+    host = urlparse(key).netloc
+    new_connections = opened - last_opened
+    reused = (sent - last_sent) - new_connections
+    if new_connections > 0:
+        emit_metric("federation_http_connections_opened", new_connections, remote_host=host)
+    if reused > 0:
+        emit_metric("federation_http_connections_reused", reused, remote_host=host)
+
+
+def _send(base_url: str, method: str, url: str, **kwargs) -> requests.Response:
+    """Send a request through the pooled session for *base_url* and report connection reuse."""
+    try:
+        return _federation_session(base_url).request(method, url, **kwargs)
+    finally:
+        _report_connection_reuse(base_url)
+
 
-def _federation_request(
+def close_federation_sessions() -> None:
+    """Close and forget every pooled federation session."""
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+        _reported.clear()
+    for session in sessions:
+        session.close()
+
+
+def _signed_request(
     fed_ws: schemas.FederatedWorkspace,
     path: str,
     payload: dict,
     method: str = "POST",
-) -> dict | None:
+    *,
+    attempts: int = _MAX_RETRIES,
+    not_found_ok: bool = False,
+) -> tuple[int | None, dict | None]:
     """Send an authenticated request to a federated workspace.
 
-    Signs the request with this instance's Ed25519 private key.
-    Retries up to :data:`_MAX_RETRIES` times on transient failures.
+    Signs the request with this instance's Ed25519 private key.  Timeouts,
+    connection errors and 5xx responses are retried up to *attempts* times.
+    Returns ``(status, body)``: *body* is the decoded JSON of a 200 response,
+    and *status* is *None* when no response was received.  With
+    *not_found_ok*, a 404 (an endpoint unknown to an older peer) is not
+    logged as a failure.
     """
     url = fed_ws.webhook_url.rstrip("/") + path
     body = json.dumps(payload)
 
     start_time = time.time()
+    status = None
 
-    for attempt in range(_MAX_RETRIES):
+    for attempt in range(attempts):
         try:
             sig, ts = federation_sign(body)
             headers = {
@@ -387,8 +554,9 @@ def _federation_request(
                 "X-Federation-Timestamp": ts,
                 "X-Federation-Instance": get_instance_id(),
             }
-            resp = requests.request(method, url, data=body, headers=headers, timeout=_REQUEST_TIMEOUT)
+            resp = _send(fed_ws.webhook_url, method, url, data=body, headers=headers, timeout=_REQUEST_TIMEOUT)
             elapsed = round((time.time() - start_time) * 1000, 1)
+            status = resp.status_code
 
             if resp.status_code == 200:
                 _logger.debug(
@@ -396,10 +564,10 @@ def _federation_request(
                     extra={"url": url, "elapsed_ms": elapsed, "attempts": attempt + 1},
                 )
                 try:
-                    return resp.json()
+                    return 200, resp.json()
                 except Exception as exc:
                     _logger.debug(f"federation_request: non-JSON success response: {exc}")
-                    return {"ok": True}
+                    return 200, {"ok": True}
             elif resp.status_code >= 500:
                 _logger.warning(
                     "federation_request_retry",
@@ -410,9 +578,11 @@ def _federation_request(
                         "remote": fed_ws.instance_id,
                     },
                 )
-                if attempt < _MAX_RETRIES - 1:
+                if attempt < attempts - 1:
                     time.sleep(_RETRY_BACKOFF[attempt])
                 continue
+            elif resp.status_code == 404 and not_found_ok:
+                return 404, None
             elif resp.status_code == 401:
                 _logger.error(
                     "federation_auth_rejected",
@@ -422,7 +592,7 @@ def _federation_request(
                         "message": "Keypair may have changed — reconnection required",
                     },
                 )
-                return None
+                return 401, None
             else:
                 _logger.error(
                     "federation_request_failed",
@@ -433,34 +603,47 @@ def _federation_request(
                         "remote": fed_ws.instance_id,
                     },
                 )
-                return None
+                return resp.status_code, None
         except requests.exceptions.Timeout:
+            status = None
             _logger.warning(
                 "federation_request_timeout",
                 extra={"url": url, "attempt": attempt + 1, "remote": fed_ws.instance_id},
             )
-            if attempt < _MAX_RETRIES - 1:
+            if attempt < attempts - 1:
                 time.sleep(_RETRY_BACKOFF[attempt])
         except requests.exceptions.ConnectionError as e:
+            status = None
             _logger.warning(
                 "federation_connection_error",
                 extra={"url": url, "attempt": attempt + 1, "error": str(e), "remote": fed_ws.instance_id},
             )
-            if attempt < _MAX_RETRIES - 1:
+            if attempt < attempts - 1:
                 time.sleep(_RETRY_BACKOFF[attempt])
         except Exception as e:
             _logger.error(
                 "federation_request_error",
                 extra={"url": url, "error": str(e), "remote": fed_ws.instance_id},
             )
-            return None
+            return None, None
 
     elapsed = round((time.time() - start_time) * 1000, 1)
     _logger.error(
         "federation_request_exhausted",
-        extra={"url": url, "elapsed_ms": elapsed, "attempts": _MAX_RETRIES, "remote": fed_ws.instance_id},
+        extra={"url": url, "elapsed_ms": elapsed, "attempts": attempts, "remote": fed_ws.instance_id},
     )
-    return None
+    return status, None
+
+
+def _federation_request(
+    fed_ws: schemas.FederatedWorkspace,
+    path: str,
+    payload: dict,
+    method: str = "POST",
+) -> dict | None:
+    """Send an authenticated request to a federated workspace; return the response body, or *None* on failure."""
+    status, body = _signed_request(fed_ws, path, payload, method)
+    return body if status == 200 else None
 
 
 def push_message(fed_ws: schemas.FederatedWorkspace, payload: dict) -> dict | None:
@@ -488,6 +671,107 @@ def push_users(fed_ws: schemas.FederatedWorkspace, payload: dict) -> dict | None
     return _federation_request(fed_ws, "/api/federation/users", payload)
 
 
+# ---------------------------------------------------------------------------
+# Batched events — several events for one federated workspace per request
+# ---------------------------------------------------------------------------
+
+BATCH_PATH = "/api/federation/batch"
+# Protocol limit on events per batch envelope (enforced by the receiver too).
+BATCH_MAX_EVENTS = 50
+# Serialized payload bytes per envelope, below the receiver's 1 MB body limit
+# with room for the envelope itself.
+BATCH_MAX_BYTES = 768 * 1024
+
+_EVENT_PATHS = {
+    "message": "/api/federation/message",
+    "edit": "/api/federation/message/edit",
+    "delete": "/api/federation/message/delete",
+    "react": "/api/federation/message/react",
+}
+
+# Peers that answered the batch endpoint with 404, mapped to when to try it again.
+_BATCH_RETRY_AFTER_SECONDS = 3600
+_batch_unsupported: dict[str, float] = {}
+
+
+def _batch_supported(fed_ws: schemas.FederatedWorkspace) -> bool:
+    retry_at = _batch_unsupported.get(fed_ws.instance_id)
+    return retry_at is None or time.monotonic() >= retry_at
+
+
+def batch_chunks(events: list[tuple[str, dict]]) -> Iterator[tuple[int, list[tuple[str, dict]]]]:
+    """Split *events* into ``(start index, chunk)`` envelopes within both batch limits.
+
+    A chunk holds up to :data:`BATCH_MAX_EVENTS` events whose JSON payloads
+    total at most :data:`BATCH_MAX_BYTES`; an event larger than that on its
+    own gets an envelope to itself.
+    """
+    start = 0
+    while start < len(events):
+        end, size = start, 0
+        while end < len(events) and end - start < BATCH_MAX_EVENTS:
+            size += len(json.dumps(events[end][1]))
+            if end > start and size > BATCH_MAX_BYTES:
+                break
+            end += 1
+        yield start, events[start:end]
+        start = end
+
+
+def deliver_events(
+    fed_ws: schemas.FederatedWorkspace,
+    events: list[tuple[str, dict]],
+    *,
+    attempts: int = _MAX_RETRIES,
+) -> list[tuple[int | None, dict | None]]:
+    """Send several events to one federated workspace in signed batch envelopes.
+
+    *events* are ``(event_type, payload)`` pairs, where *event_type* is one of
+    ``"message"``, ``"edit"``, ``"delete"`` or ``"react"``.  Events go out in
+    envelopes within :data:`BATCH_MAX_EVENTS` and :data:`BATCH_MAX_BYTES`
+    (see :func:`batch_chunks`) and are applied in order by the remote.  Returns one ``(status, body)`` per event, in order (see
+    :func:`_signed_request`).  A single event, or a peer without the batch
+    endpoint, uses the per-event endpoints instead.
+    """
+    if len(events) <= 1 or not _batch_supported(fed_ws):
+        return [_signed_request(fed_ws, _EVENT_PATHS[kind], payload, attempts=attempts) for kind, payload in events]
+
+    outcomes: list[tuple[int | None, dict | None]] = []
+    for start, chunk in batch_chunks(events):
+        envelope = {"events": [{"type": kind, "payload": payload} for kind, payload in chunk]}
+        status, response = _signed_request(fed_ws, BATCH_PATH, envelope, attempts=attempts, not_found_ok=True)
+
+        if status == 404:
+            _logger.info("federation_batch_unsupported", extra={"remote": fed_ws.instance_id})
+            _batch_unsupported[fed_ws.instance_id] = time.monotonic() + _BATCH_RETRY_AFTER_SECONDS
+            outcomes.extend(
+                _signed_request(fed_ws, _EVENT_PATHS[kind], payload, attempts=attempts)
+                for kind, payload in events[start:]
+            )
+            break
+        if status != 200:
+            outcomes.extend((status, None) for _ in chunk)
+            continue
+
+        entries = (response or {}).get("results") or []
+        for i, (kind, _payload) in enumerate(chunk):
+            entry = entries[i] if i < len(entries) and isinstance(entries[i], dict) else {}
+            if entry.get("status") == 200:
+                outcomes.append((200, entry.get("body") or {"ok": True}))
+            else:
+                _logger.warning(
+                    "federation_batch_event_failed",
+                    extra={"remote": fed_ws.instance_id, "type": kind, "status": entry.get("status")},
+                )
+                outcomes.append((entry.get("status"), None))
+    return outcomes
+
+
+def push_batch(fed_ws: schemas.FederatedWorkspace, events: list[tuple[str, dict]]) -> list[dict | None]:
+    """Send *events* with :func:`deliver_events`; return each event's response body, or *None* if it failed."""
+    return [body if status == 200 else None for status, body in deliver_events(fed_ws, events)]
+
+
 def initiate_federation_connect(
     remote_url: str,
     code: str,
@@ -520,7 +804,9 @@ def initiate_federation_connect(
 
     for attempt in range(_MAX_RETRIES):
         try:
-            resp = requests.post(
+            resp = _send(
+                remote_url,
+                "POST",
                 url,
                 data=body,
                 headers={
@@ -575,7 +861,9 @@ def ping_federated_workspace(fed_ws: schemas.FederatedWorkspace) -> bool:
     """Check if a federated workspace is reachable."""
     url = fed_ws.webhook_url.rstrip("/") + "/api/federation/ping"
     try:
-        resp = requests.get(
+        resp = _send(
+            fed_ws.webhook_url,
+            "GET",
             url,
             headers={"User-Agent": FEDERATION_USER_AGENT},
             timeout=5,
@@ -0,0 +1,228 @@
+"""Durable outbox for federation pushes.
+
+Message handlers used to push federation events inline, retrying with
+sleeps, so an unreachable remote stalled every fan-out.  Events are now
+written to the ``federation_outbox`` table with :func:`enqueue_events` and
+delivered by :func:`deliver_outbox`: right away by the handler that queued
+them (a single envelope, no sleeps), and in the background by the maintenance
+worker (a thread in container mode, the scheduled invocation on Lambda).
+
+Delivery is ordered per federated workspace: a peer's oldest pending row
+gates the rest, so while it is backing off nothing newer is sent to that
+peer.  A worker leases a peer by pushing its head row's ``next_attempt_at``
+forward with a conditional update, so concurrent workers never send the
+same rows.  Failed deliveries back off exponentially; rows rejected by the
+remote (4xx) or failing :data:`constants.FEDERATION_OUTBOX_MAX_ATTEMPTS`
+times are kept as dead letters.  When a queued message is delivered later,
+the remote ``ts`` replaces the placeholder in ``post_meta``.
+
+Metrics: ``federation_outbox_delivered``, ``federation_outbox_retried`` and
+``federation_outbox_dead_lettered`` (count, by ``remote``).
+"""
+
+import json
+import logging
+import time as _time
+from datetime import UTC, datetime, timedelta
+
+import constants
+from db import DbManager, schemas
+from federation import core
+from logger import emit_metric
+
+_logger = logging.getLogger(__name__)
+
+_Outbox = schemas.FederationOutbox
+
+# A lease must outlast one envelope request (timeout 15 s).
+_LEASE_SECONDS = 60
+_BACKOFF_BASE_SECONDS = 10
+_BACKOFF_MAX_SECONDS = 3600
+# Background delivery leaves freshly queued rows to the handler that queued them.
+BACKGROUND_SETTLE_SECONDS = 30
+# Statuses worth retrying: no response, auth (keypair rotation), throttling, server errors.
+_RETRYABLE = {None, 401, 408, 429}
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(_BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), _BACKOFF_MAX_SECONDS))
+
+
+def enqueue_events(
+    fed_ws: schemas.FederatedWorkspace,
+    events: list[tuple[str, dict, int | None]],
+) -> list[int]:
+    """Queue ``(event_type, payload, sync_channel_id)`` events for *fed_ws*; returns the outbox row IDs in order."""
+    if not events:
+        return []
+    now = datetime.now(UTC)
+    rows = [
+        _Outbox(
+            federated_workspace_id=fed_ws.id,
+            event_type=event_type,
+            payload=json.dumps(payload),
+            sync_channel_id=sync_channel_id,
+            status="pending",
+            attempts=0,
+            next_attempt_at=now,
+            created_at=now,
+        )
+        for event_type, payload, sync_channel_id in events
+    ]
+    DbManager.create_records(rows)
+    return [row.id for row in rows]
+
+
+def _reconcile_post_meta(row: schemas.FederationOutbox, payload: dict, body: dict | None) -> None:
+    """Store the remote ``ts`` of a delivered message on its ``post_meta`` row."""
+    ts = (body or {}).get("ts")
+    if row.event_type != "message" or not ts or not row.sync_channel_id or not payload.get("post_id"):
+        return
+    DbManager.update_records(
+        schemas.PostMeta,
+        [
+            schemas.PostMeta.post_id == payload["post_id"],
+            schemas.PostMeta.sync_channel_id == row.sync_channel_id,
+        ],
+        {schemas.PostMeta.ts: float(ts)},
+    )
+
+
+def _claim(head: schemas.FederationOutbox, now: datetime) -> bool:
+    """Lease the peer of *head* by moving its ``next_attempt_at``; False if another worker got there first."""
+    return bool(
+        DbManager.update_records(
+            _Outbox,
+            [
+                _Outbox.id == head.id,
+                _Outbox.status == "pending",
+                _Outbox.next_attempt_at == head.next_attempt_at,
+            ],
+            {_Outbox.next_attempt_at: now + timedelta(seconds=_LEASE_SECONDS)},
+        )
+    )
+
+
+def _deliver_run(
+    fed_ws: schemas.FederatedWorkspace,
+    run: list[schemas.FederationOutbox],
+    now: datetime,
+) -> tuple[dict[int, dict], bool]:
+    """Send *run* in one envelope and record the outcome of every row.
+
+    Returns ``(delivered bodies by outbox ID, whether any row will be retried)``.
+    """
+    payloads = [json.loads(row.payload) for row in run]
+    try:
+        outcomes = core.deliver_events(
+            fed_ws, [(row.event_type, payload) for row, payload in zip(run, payloads, strict=True)], attempts=1
+        )
+    except Exception as exc:
+        _logger.exception("federation_outbox_delivery_error", extra={"remote": fed_ws.instance_id})
+        outcomes = [(None, {"error": str(exc)})] * len(run)
+
+    delivered: dict[int, dict] = {}
+    updates: list[dict] = []
+    retried = dead = 0
+    for row, payload, (status, body) in zip(run, payloads, outcomes, strict=True):
+        if status == 200:
+            delivered[row.id] = body or {"ok": True}
+            _reconcile_post_meta(row, payload, body)
+            continue
+        attempts = row.attempts + 1
+        error = f"status {status}" if status is not None else "no response"
+        if (status in _RETRYABLE or status >= 500) and attempts < constants.FEDERATION_OUTBOX_MAX_ATTEMPTS:
+            updates.append(
+                {"id": row.id, "attempts": attempts, "next_attempt_at": now + _backoff(attempts), "last_error": error}
+            )
+            retried += 1
+        else:
+            updates.append({"id": row.id, "attempts": attempts, "status": "dead", "last_error": error})
+            dead += 1
+            _logger.error(
+                "federation_outbox_dead_letter",
+                extra={"remote": fed_ws.instance_id, "outbox_id": row.id, "type": row.event_type, "error": error},
+            )
+
+    if delivered:
+        DbManager.delete_records(_Outbox, [_Outbox.id.in_(list(delivered))])
+        emit_metric("federation_outbox_delivered", len(delivered), remote=fed_ws.instance_id)
+    DbManager.update_rows(_Outbox, updates)
+    if retried:
+        emit_metric("federation_outbox_retried", retried, remote=fed_ws.instance_id)
+    if dead:
+        emit_metric("federation_outbox_dead_lettered", dead, remote=fed_ws.instance_id)
+    return delivered, retried > 0
+
+
+def _deliver_peer(
+    fed_ws: schemas.FederatedWorkspace,
+    settle_seconds: float,
+    deadline: float | None,
+    max_envelopes: int | None,
+) -> dict[int, dict]:
+    delivered: dict[int, dict] = {}
+    envelopes = 0
+    while (deadline is None or _time.monotonic() < deadline) and (max_envelopes is None or envelopes < max_envelopes):
+        now = datetime.now(UTC)
+        pending = DbManager.find_records(
+            _Outbox,
+            [_Outbox.federated_workspace_id == fed_ws.id, _Outbox.status == "pending"],
+            order_by=_Outbox.id,
+            limit=core.BATCH_MAX_EVENTS,
+        )
+        if not pending:
+            break
+        head = pending[0]
+        if _utc(head.next_attempt_at) > now or _utc(head.created_at) > now - timedelta(seconds=settle_seconds):
+            break
+        # One envelope's worth (see core.batch_chunks).
+        run, size = [], 0
+        for row in pending:
+            size += len(row.payload)
+            if _utc(row.next_attempt_at) > now or (run and size > core.BATCH_MAX_BYTES):
+                break
+            run.append(row)
+        if not _claim(head, now):
+            break
+        sent, retrying = _deliver_run(fed_ws, run, now)
+        envelopes += 1
+        delivered.update(sent)
+        if retrying:
+            break
+    return delivered
+
+
+def deliver_outbox(
+    federated_workspace_id: int | None = None,
+    *,
+    settle_seconds: float = 0,
+    time_budget_seconds: float | None = None,
+    max_envelopes: int | None = None,
+) -> dict[int, dict]:
+    """Deliver due outbox rows for one federated workspace, or for every peer with pending rows.
+
+    Rows queued less than *settle_seconds* ago are left alone (see
+    :data:`BACKGROUND_SETTLE_SECONDS`).  No new envelope is started once
+    *time_budget_seconds* have passed, or once *max_envelopes* have been sent
+    to a peer (message handlers send one and leave any backlog to background
+    delivery).  Returns the remote response of each
+    row delivered in this call, by outbox ID.
+    """
+    deadline = _time.monotonic() + time_budget_seconds if time_budget_seconds is not None else None
+    if federated_workspace_id is not None:
+        peers = [DbManager.get_record(schemas.FederatedWorkspace, federated_workspace_id)]
+    else:
+        peers = DbManager.find_records(schemas.FederatedWorkspace, [schemas.FederatedWorkspace.status == "active"])
+
+    delivered: dict[int, dict] = {}
+    for fed_ws in peers:
+        if deadline is not None and _time.monotonic() >= deadline:
+            break
+        if fed_ws is not None and fed_ws.status == "active":
+            delivered.update(_deliver_peer(fed_ws, settle_seconds, deadline, max_envelopes))
+    return delivered
@@ -0,0 +1,286 @@
+"""Delta user directory exchange between federated instances.
+
+``POST /api/federation/users`` used to carry a workspace's whole directory
+in the request and return every shared directory row in the response.  Each
+side now sends only the rows changed since the last completed exchange, a
+page at a time:
+
+* The request carries one page of the sender's changed users
+  (``users``, ``workspace_id``) and asks for one page of the receiver's:
+  ``since`` (the watermark the receiver returned last time), ``cursor``
+  (``next_cursor`` of the previous page) and ``limit`` (``0`` once the
+  sender has everything).
+* The response carries ``users``, ``next_cursor`` (*None* on the last page)
+  and ``watermark``, which the caller stores for its next ``since``.
+
+Pages are ordered by ``(updated_at, id)`` and continued with a keyset
+cursor.  Delta pages include deactivated users (``"deleted": true``); the
+first exchange only sends active ones.  Received pages are applied with
+:func:`helpers.upsert_directory_users` (one bulk insert/update per page).
+Watermarks are kept per federated workspace and local workspace in
+``federation_user_sync`` and only advance when an exchange completes.
+Peers that predate the protocol ignore the new fields and answer with a
+single page.
+"""
+
+import contextlib
+import logging
+import time as _time
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+import constants
+import helpers
+from db import DbManager, schemas
+from federation import core
+
+_logger = logging.getLogger(__name__)
+
+_Dir = schemas.UserDirectory
+_Sync = schemas.FederationUserSync
+
+# Directory rows are stamped before they are committed, so a row stamped just
+# before a read may only become visible after it.  Watermarks never move
+# closer to the present than this, so such rows are picked up next time.
+_WATERMARK_LAG = timedelta(seconds=60)
+# Background maintenance starts no new exchange after this long.
+BACKGROUND_TIME_BUDGET_SECONDS = 20
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(tzinfo=None) if value.tzinfo else value
+
+
+def parse_watermark(value: str | None) -> datetime | None:
+    """Parse an ISO ``since`` / ``watermark`` value; *None* if absent. Raises ``ValueError`` if malformed."""
+    if not value:
+        return None
+    return _naive_utc(datetime.fromisoformat(value))
+
+
+def _encode_cursor(row: schemas.UserDirectory) -> str:
+    return f"{_naive_utc(row.updated_at).isoformat()}|{row.id}"
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    updated_at, _, row_id = cursor.partition("|")
+    return _naive_utc(datetime.fromisoformat(updated_at)), int(row_id)
+
+
+def changed_users(
+    workspace_ids: list[int],
+    since: datetime | None,
+    cursor: str | None,
+    limit: int,
+) -> tuple[list[dict], str | None, datetime | None]:
+    """Return one page of directory rows of *workspace_ids* changed since *since*.
+
+    Returns ``(users, next_cursor, watermark)``; *next_cursor* is *None* on
+    the last page and *watermark* is the ``updated_at`` of the newest row
+    returned so far (*since* if there are none), held back by
+    :data:`_WATERMARK_LAG`.  Raises ``ValueError`` for a malformed *cursor*.
+    """
+    if not workspace_ids or limit <= 0:
+        return [], None, since
+
+    filters = [_Dir.workspace_id.in_(workspace_ids)]
+    if since is None:
+        filters.append(_Dir.deleted_at.is_(None))
+    else:
+        filters.append(_Dir.updated_at > since)
+    watermark = since
+    if cursor:
+        after_ts, after_id = _decode_cursor(cursor)
+        filters.append(or_(_Dir.updated_at > after_ts, and_(_Dir.updated_at == after_ts, _Dir.id > after_id)))
+        watermark = max(watermark, after_ts) if watermark else after_ts
+
+    rows = DbManager.find_records(_Dir, filters, order_by=[_Dir.updated_at, _Dir.id], limit=limit + 1)
+    page = rows[:limit]
+    users = []
+    for row in page:
+        user = {
+            "user_id": row.slack_user_id,
+            "email": row.email,
+            "real_name": row.real_name,
+            "display_name": row.display_name,
+            "workspace_id": row.workspace_id,
+        }
+        if row.deleted_at is not None:
+            user["deleted"] = True
+        users.append(user)
+    if page:
+        newest = min(_naive_utc(page[-1].updated_at), _naive_utc(datetime.now(UTC)) - _WATERMARK_LAG)
+        watermark = max(watermark, newest) if watermark else newest
+    next_cursor = _encode_cursor(page[-1]) if len(rows) > limit else None
+    return users, next_cursor, watermark
+
+
+def apply_remote_users(users: list[dict], workspace_id: int | None = None) -> int:
+    """Store users received from a federated instance; returns how many were applied.
+
+    Users are grouped by *workspace_id* (or, if not given, each user's own
+    ``workspace_id``) and each group is upserted in bulk.
+    """
+    by_workspace: dict[int, list[dict]] = {}
+    for u in users:
+        ws_id = workspace_id or u.get("workspace_id")
+        if not ws_id or not u.get("user_id"):
+            continue
+        by_workspace.setdefault(ws_id, []).append(
+            {
+                "id": u["user_id"],
+                "deleted": bool(u.get("deleted")),
+                "profile": {
+                    "email": u.get("email"),
+                    "real_name": u.get("real_name"),
+                    "display_name": u.get("display_name"),
+                },
+            }
+        )
+    for ws_id, members in by_workspace.items():
+        helpers.upsert_directory_users(members, ws_id)
+    return sum(len(members) for members in by_workspace.values())
+
+
+def shared_workspace_ids(fed_ws: schemas.FederatedWorkspace) -> set[int]:
+    """Return local workspace IDs that participate in groups shared with *fed_ws*."""
+    fed_members = DbManager.find_records(
+        schemas.WorkspaceGroupMember,
+        [
+            schemas.WorkspaceGroupMember.federated_workspace_id == fed_ws.id,
+            schemas.WorkspaceGroupMember.status == "active",
+            schemas.WorkspaceGroupMember.deleted_at.is_(None),
+        ],
+    )
+    ws_ids: set[int] = set()
+    for fed_member in fed_members:
+        group_members = DbManager.find_records(
+            schemas.WorkspaceGroupMember,
+            [
+                schemas.WorkspaceGroupMember.group_id == fed_member.group_id,
+                schemas.WorkspaceGroupMember.workspace_id.isnot(None),
+                schemas.WorkspaceGroupMember.status == "active",
+                schemas.WorkspaceGroupMember.deleted_at.is_(None),
+            ],
+        )
+        for m in group_members:
+            if m.workspace_id:
+                ws_ids.add(m.workspace_id)
+    return ws_ids
+
+
+def _sync_state(fed_ws_id: int, workspace_id: int) -> schemas.FederationUserSync | None:
+    rows = DbManager.find_records(
+        _Sync, [_Sync.federated_workspace_id == fed_ws_id, _Sync.workspace_id == workspace_id]
+    )
+    return rows[0] if rows else None
+
+
+def _save_sync_state(
+    state: schemas.FederationUserSync | None,
+    fed_ws_id: int,
+    workspace_id: int,
+    fields: dict,
+) -> None:
+    if state is None:
+        DbManager.create_record(_Sync(federated_workspace_id=fed_ws_id, workspace_id=workspace_id, **fields))
+    else:
+        DbManager.update_records(
+            _Sync,
+            [_Sync.federated_workspace_id == fed_ws_id, _Sync.workspace_id == workspace_id],
+            {getattr(_Sync, k): v for k, v in fields.items()},
+        )
+
+
+def exchange_user_directory(fed_ws: schemas.FederatedWorkspace, workspace: schemas.Workspace) -> bool:
+    """Send *workspace*'s directory changes to *fed_ws* and store the peer's changes.
+
+    Pages are exchanged until both sides are done.  Returns *False* (and
+    keeps the old watermarks, so the next exchange repeats the delta) if a
+    request fails.
+    """
+    state = _sync_state(fed_ws.id, workspace.id)
+    sent_since = state.sent_through if state else None
+    received_since = state.received_through if state else None
+    page_size = constants.FEDERATION_USERS_PAGE_SIZE
+
+    out_cursor: str | None = None
+    in_cursor: str | None = None
+    sent_through = sent_since
+    received_through = received_since
+    sending = receiving = True
+    sent = received = 0
+
+    while sending or receiving:
+        users: list[dict] = []
+        if sending:
+            users, out_cursor, sent_through = changed_users([workspace.id], sent_since, out_cursor, page_size)
+            sending = out_cursor is not None
+        result = core.push_users(
+            fed_ws,
+            {
+                "users": users,
+                "workspace_id": workspace.id,
+                "since": received_since.isoformat() if received_since else None,
+                "cursor": in_cursor,
+                "limit": page_size if receiving else 0,
+            },
+        )
+        if result is None:
+            _logger.warning(
+                "federation_user_exchange_failed",
+                extra={"remote": fed_ws.instance_id, "workspace_id": workspace.id, "sent": sent, "received": received},
+            )
+            return False
+        sent += len(users)
+        if receiving:
+            received += apply_remote_users(result.get("users") or [])
+            in_cursor = result.get("next_cursor")
+            receiving = bool(in_cursor)
+            with contextlib.suppress(ValueError):
+                received_through = parse_watermark(result.get("watermark")) or received_through
+
+    _save_sync_state(
+        state,
+        fed_ws.id,
+        workspace.id,
+        {
+            "sent_through": sent_through,
+            "received_through": received_through,
+            "last_exchange_at": datetime.now(UTC),
+        },
+    )
+    _logger.info(
+        "federation_user_exchange_complete",
+        extra={"remote": fed_ws.instance_id, "workspace_id": workspace.id, "sent": sent, "received": received},
+    )
+    return True
+
+
+def run_user_exchange(time_budget_seconds: float | None = None) -> int:
+    """Repeat the user directory exchange for every connected pair that is due.
+
+    A (federated workspace, local workspace) pair is due when its last
+    exchange is older than :data:`constants.FEDERATION_USER_SYNC_INTERVAL_SECONDS`.
+    Returns the number of exchanges completed.
+    """
+    deadline = _time.monotonic() + time_budget_seconds if time_budget_seconds is not None else None
+    cutoff = _naive_utc(datetime.now(UTC)) - timedelta(seconds=constants.FEDERATION_USER_SYNC_INTERVAL_SECONDS)
+    peers = DbManager.find_records(schemas.FederatedWorkspace, [schemas.FederatedWorkspace.status == "active"])
+
+    done = 0
+    for fed_ws in peers:
+        for ws_id in sorted(shared_workspace_ids(fed_ws)):
+            if deadline is not None and _time.monotonic() >= deadline:
+                return done
+            state = _sync_state(fed_ws.id, ws_id)
+            if state and state.last_exchange_at and _naive_utc(state.last_exchange_at) > cutoff:
+                continue
+            workspace = helpers.get_workspace_by_id(ws_id)
+            if not workspace or workspace.deleted_at:
+                continue
+            if not exchange_user_directory(fed_ws, workspace):
+                break
+            done += 1
+    return done
@@ -2,8 +2,14 @@
 
 Re-exports every public symbol so that ``import handlers`` /
 ``from handlers import X`` continues to work after the split.
+
+Backup/restore and federation handlers (:mod:`handlers.export_import`,
+:mod:`handlers.federation_cmds`) are only used from the Home tab, so they
+are imported on first access rather than on every cold start.
 """
 
+import importlib
+
 from handlers._common import (
     EventContext,
     _get_authorized_workspace,
@@ -23,25 +29,6 @@ from handlers.channel_sync import (
     handle_subscribe_channel_submit,
     handle_unpublish_channel,
 )
-from handlers.export_import import (
-    handle_backup_download,
-    handle_backup_restore,
-    handle_backup_restore_proceed,
-    handle_backup_restore_submit_ack,
-    handle_backup_restore_submit_work,
-    handle_data_migration,
-    handle_data_migration_export,
-    handle_data_migration_proceed,
-    handle_data_migration_submit_ack,
-    handle_data_migration_submit_work,
-)
-from handlers.federation_cmds import (
-    handle_enter_federation_code,
-    handle_federation_code_submit,
-    handle_federation_label_submit,
-    handle_generate_federation_code,
-    handle_remove_federation_connection,
-)
 from handlers.group_manage import (
     handle_leave_group,
     handle_leave_group_confirm,
@@ -82,6 +69,25 @@ from handlers.users import (
     handle_user_profile_changed,
 )
 
+_LAZY_EXPORTS = {
+    "handle_backup_download": "handlers.export_import",
+    "handle_backup_restore": "handlers.export_import",
+    "handle_backup_restore_proceed": "handlers.export_import",
+    "handle_backup_restore_submit_ack": "handlers.export_import",
+    "handle_backup_restore_submit_work": "handlers.export_import",
+    "handle_data_migration": "handlers.export_import",
+    "handle_data_migration_export": "handlers.export_import",
+    "handle_data_migration_proceed": "handlers.export_import",
+    "handle_data_migration_submit_ack": "handlers.export_import",
+    "handle_data_migration_submit_work": "handlers.export_import",
+    "handle_enter_federation_code": "handlers.federation_cmds",
+    "handle_federation_code_submit": "handlers.federation_cmds",
+    "handle_federation_label_submit": "handlers.federation_cmds",
+    "handle_generate_federation_code": "handlers.federation_cmds",
+    "handle_remove_federation_connection": "handlers.federation_cmds",
+}
+"""Handler name -> module imported when it is first accessed."""
+
 __all__ = [
     "EventContext",
     "_get_authorized_workspace",
@@ -143,3 +149,16 @@ __all__ = [
     "handle_user_profile_changed",
     "respond_to_message_event",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
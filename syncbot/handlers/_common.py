@@ -15,13 +15,17 @@ except ImportError:
 
 
 class EventContext(TypedDict):
-    """Strongly-typed dict returned by ``_parse_event_fields``."""
+    """Strongly-typed dict returned by ``_parse_event_fields``.
+
+    ``mentioned_users`` is ``None`` until a handler that syncs text resolves
+    it (``handlers.messages._resolve_mentions``).
+    """
 
     team_id: str | None
     channel_id: str | None
     user_id: str | None
     msg_text: str
-    mentioned_users: list[dict[str, Any]]
+    mentioned_users: list[dict[str, Any]] | None
     thread_ts: str | None
     ts: str | None
     event_subtype: str | None
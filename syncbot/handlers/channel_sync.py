@@ -412,7 +412,7 @@ def handle_unpublish_channel(
                 name = (
                     admin_name if workspace_record and sync_channel.workspace_id == workspace_record.id else admin_label
                 )
-                member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
+                member_client = helpers.get_workspace_client(member_ws)
                 helpers.notify_synced_channels(
                     member_client,
                     [sync_channel.channel_id],
@@ -491,7 +491,7 @@ def _toggle_sync_status(
             )
             ws_cache[sync_channel.workspace_id] = channel_ws
             if channel_ws and channel_ws.bot_token:
-                ws_client = WebClient(token=helpers.decrypt_bot_token(channel_ws.bot_token))
+                ws_client = helpers.get_workspace_client(channel_ws)
                 if target_status == "active":
                     with contextlib.suppress(Exception):
                         ws_client.conversations_join(channel=sync_channel.channel_id)
@@ -645,7 +645,7 @@ def handle_stop_sync_confirm(
                     msg = f":octagonal_sign: *{admin_label}* stopped syncing with *{my_ref}*."
                 else:
                     msg = f":octagonal_sign: *{admin_name}* stopped Channel Syncing."
-                ws_client = WebClient(token=helpers.decrypt_bot_token(channel_ws.bot_token))
+                ws_client = helpers.get_workspace_client(channel_ws)
                 helpers.notify_synced_channels(ws_client, [sync_channel.channel_id], msg)
         except Exception as e:
             _logger.warning(f"Failed to notify channel {sync_channel.channel_id}: {e}")
@@ -834,7 +834,7 @@ def handle_subscribe_channel_submit(
             try:
                 pub_ws = helpers.get_workspace_by_id(pub_ch.workspace_id)
                 if pub_ws:
-                    pub_client = WebClient(token=helpers.decrypt_bot_token(pub_ws.bot_token))
+                    pub_client = helpers.get_workspace_client(pub_ws)
                     pub_client.chat_postMessage(
                         channel=pub_ch.channel_id,
                         text=f":arrows_counterclockwise: *{admin_label}* started syncing *{local_ref}* with this Channel. Messages will be shared automatically.",
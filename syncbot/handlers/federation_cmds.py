@@ -17,75 +17,6 @@ from slack import actions, orm
 _logger = logging.getLogger(__name__)
 
 
-def _exchange_user_directory(
-    fed_ws: schemas.FederatedWorkspace,
-    workspace_record: schemas.Workspace,
-) -> None:
-    """Push our local user directory to a federated workspace and store theirs."""
-    local_users = DbManager.find_records(
-        schemas.UserDirectory,
-        [schemas.UserDirectory.workspace_id == workspace_record.id],
-    )
-    users_payload = [
-        {
-            "user_id": u.slack_user_id,
-            "email": u.email,
-            "real_name": u.real_name,
-            "display_name": u.display_name,
-        }
-        for u in local_users
-    ]
-
-    result = federation.push_users(
-        fed_ws,
-        {
-            "users": users_payload,
-            "workspace_id": workspace_record.id,
-        },
-    )
-
-    if result and result.get("users"):
-        remote_users = result["users"]
-        now = datetime.now(UTC)
-        for u in remote_users:
-            remote_ws_id = u.get("workspace_id")
-            if not remote_ws_id:
-                continue
-            existing = DbManager.find_records(
-                schemas.UserDirectory,
-                [
-                    schemas.UserDirectory.workspace_id == remote_ws_id,
-                    schemas.UserDirectory.slack_user_id == u.get("user_id", ""),
-                ],
-            )
-            if existing:
-                DbManager.update_records(
-                    schemas.UserDirectory,
-                    [schemas.UserDirectory.id == existing[0].id],
-                    {
-                        schemas.UserDirectory.email: u.get("email"),
-                        schemas.UserDirectory.real_name: u.get("real_name"),
-                        schemas.UserDirectory.display_name: u.get("display_name"),
-                        schemas.UserDirectory.updated_at: now,
-                    },
-                )
-            else:
-                record = schemas.UserDirectory(
-                    workspace_id=remote_ws_id,
-                    slack_user_id=u.get("user_id", ""),
-                    email=u.get("email"),
-                    real_name=u.get("real_name"),
-                    display_name=u.get("display_name"),
-                    updated_at=now,
-                )
-                DbManager.create_record(record)
-
-        _logger.info(
-            "federation_user_exchange_complete",
-            extra={"remote": fed_ws.instance_id, "sent": len(users_payload), "received": len(remote_users)},
-        )
-
-
 def handle_generate_federation_code(
     body: dict,
     client: WebClient,
@@ -318,7 +249,7 @@ def handle_federation_code_submit(
         },
     )
 
-    _exchange_user_directory(fed_ws, workspace_record)
+    federation.exchange_user_directory(fed_ws, workspace_record)
 
     builders.refresh_home_tab_for_workspace(workspace_record, logger, context=context)
 
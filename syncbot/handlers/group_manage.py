@@ -198,7 +198,7 @@ def handle_leave_group_confirm(
             if not member_ws or not member_ws.bot_token or member_ws.deleted_at:
                 continue
             try:
-                member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
+                member_client = helpers.get_workspace_client(member_ws)
                 helpers.notify_admins_dm(
                     member_client,
                     f":wave: *{admin_label}* left the group *{group.name}*.",
@@ -40,7 +40,7 @@ def _activate_group_membership(
 ) -> None:
     """Refresh user directories and seed mappings for all existing group members."""
     try:
-        helpers._refresh_user_directory(client, workspace_record.id)
+        helpers._refresh_user_directory(client, workspace_record.id, force=True)
     except Exception as e:
         _logger.warning(f"Failed to refresh user directory for workspace {workspace_record.id}: {e}")
 
@@ -64,8 +64,8 @@ def _activate_group_membership(
             continue
 
         try:
-            member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
-            helpers._refresh_user_directory(member_client, member_ws.id)
+            member_client = helpers.get_workspace_client(member_ws)
+            helpers._refresh_user_directory(member_client, member_ws.id, force=True)
             member_clients.append((member_client, member_ws.id))
         except Exception as e:
             _logger.warning(f"Failed to refresh user directory for workspace {member_ws.id}: {e}")
@@ -330,7 +330,7 @@ def handle_join_group_submit(
         if not member_ws or not member_ws.bot_token or member_ws.deleted_at:
             continue
         try:
-            member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
+            member_client = helpers.get_workspace_client(member_ws)
             helpers.notify_admins_dm(
                 member_client,
                 f":punch: *{admin_label}* joined the Workspace Group called *{group.name}*.",
@@ -531,7 +531,7 @@ def handle_invite_workspace_submit(
 
     _, admin_label = helpers.format_admin_label(client, acting_user_id, workspace_record)
 
-    target_client = WebClient(token=helpers.decrypt_bot_token(target_ws.bot_token))
+    target_client = helpers.get_workspace_client(target_ws)
 
     invite_blocks = [
         {
@@ -649,7 +649,7 @@ def handle_accept_group_invite(
         if not member_ws or not member_ws.bot_token or member_ws.deleted_at:
             continue
         try:
-            member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
+            member_client = helpers.get_workspace_client(member_ws)
             helpers.notify_admins_dm(
                 member_client,
                 f":punch: *{ws_name}* has joined the Workspace Group called *{group.name}*.",
@@ -763,7 +763,7 @@ def _update_invite_dms(
     if not entries:
         return
 
-    ws_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
+    ws_client = helpers.get_workspace_client(workspace)
     blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": new_text}}]
     for entry in entries:
         channel_id = entry.get("channel")
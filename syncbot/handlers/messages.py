@@ -2,6 +2,7 @@
 
 import logging
 import uuid
+from collections.abc import Hashable
 from logging import Logger
 
 from slack_sdk.web import WebClient
@@ -52,7 +53,7 @@ def _shared_by_file_initial_comment(
     return f"Shared by {user_ref}"
 
 
-def _parse_event_fields(body: dict, client: WebClient) -> EventContext:
+def _parse_event_fields(body: dict) -> EventContext:
     """Extract the common fields every message handler needs."""
     event: dict = body.get("event", {})
     msg_text: str = helpers.safe_get(event, "text") or helpers.safe_get(event, "message", "text")
@@ -63,7 +64,7 @@ def _parse_event_fields(body: dict, client: WebClient) -> EventContext:
         channel_id=helpers.safe_get(event, "channel"),
         user_id=(helpers.safe_get(event, "user") or helpers.safe_get(event, "message", "user")),
         msg_text=msg_text,
-        mentioned_users=helpers.parse_mentioned_users(msg_text, client),
+        mentioned_users=None,
         thread_ts=helpers.safe_get(event, "thread_ts"),
         ts=(
             helpers.safe_get(event, "message", "ts")
@@ -74,6 +75,51 @@ def _parse_event_fields(body: dict, client: WebClient) -> EventContext:
     )
 
 
+def _resolve_mentions(ctx: EventContext, client: WebClient) -> list[dict]:
+    """Return the @mention profiles for *ctx*, looking them up on first use.
+
+    Handlers call this only once they know the message has targets to sync
+    to, and before fanning out, so events from unsynced channels never pay
+    for the ``users.info`` lookups and worker threads share one result.
+    """
+    if ctx["mentioned_users"] is None:
+        ctx["mentioned_users"] = helpers.parse_mentioned_users(ctx["msg_text"], client)
+    return ctx["mentioned_users"]
+
+
+def _mention_table(
+    client: WebClient,
+    mentioned_users: list[dict],
+    source_workspace_id: int | None,
+    workspaces: list[schemas.Workspace],
+) -> dict[int, dict[str, str]]:
+    """Resolve every @mention for every Slack target workspace before fanning out.
+
+    One :func:`helpers.resolve_mentions_bulk` call replaces a mapping lookup
+    per mention per target; each worker then reads its row of the table.
+    """
+    if not mentioned_users:
+        return {}
+    target_clients: dict[int, WebClient] = {}
+    for workspace in workspaces:
+        if workspace.id in target_clients:
+            continue
+        try:
+            target_clients[workspace.id] = helpers.get_workspace_client(workspace)
+        except Exception as exc:
+            _logger.error(f"Failed to load client for workspace {workspace.id}: {exc}")
+    try:
+        return helpers.resolve_mentions_bulk(
+            client,
+            source_workspace_id or 0,
+            [u.get("user_id", "") for u in mentioned_users],
+            target_clients,
+        )
+    except Exception as exc:
+        _logger.error(f"Failed to resolve mentions: {exc}")
+        return {}
+
+
 def _build_file_context(body: dict, client: WebClient, logger: Logger) -> tuple[list[dict], list[dict], list[dict]]:
     """Process files attached to a message event.
 
@@ -144,6 +190,81 @@ def _get_workspace_name(records: list, channel_id: str, workspace_index: int) ->
     )
 
 
+def _post_meta_rows(
+    post_uuid: str, sync_channel_id: int, ts: str | None, split_file_ts: str | None
+) -> list[schemas.PostMeta]:
+    """Build the PostMeta rows for one synced target (text message plus optional split file message)."""
+    rows: list[schemas.PostMeta] = []
+    if ts:
+        rows.append(schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel_id, ts=float(ts)))
+    if split_file_ts:
+        rows.append(schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel_id, ts=float(split_file_ts)))
+    return rows
+
+
+def _push_federated(
+    fed_ws: schemas.FederatedWorkspace | None, events: dict[Hashable, tuple[str, dict, int]]
+) -> dict[Hashable, dict | None]:
+    """Queue one message's federated events for *fed_ws* and try to deliver them right away.
+
+    *events* maps a key per target record (its sync channel ID, plus the
+    synced ``ts`` where one channel can hold several records) to its
+    ``(event_type, payload, sync_channel_id)``.  Returns the remote's result
+    for each event delivered now; the rest stay in the federation outbox
+    for background delivery (``None``).  Only one envelope is sent inline:
+    if the peer has an older backlog, that goes first (delivery is ordered
+    per peer) and these events wait for the background worker.
+    """
+    if not fed_ws or not events:
+        return {}
+    keys = list(events)
+    try:
+        outbox_ids = federation.enqueue_events(fed_ws, [events[k] for k in keys])
+    except Exception as exc:
+        _logger.error(f"Failed to queue federated events for {fed_ws.instance_id}, sending directly: {exc}")
+        results = federation.push_batch(fed_ws, [events[k][:2] for k in keys])
+        return dict(zip(keys, results, strict=True))
+    try:
+        delivered = federation.deliver_outbox(fed_ws.id, max_envelopes=1)
+    except Exception as exc:
+        _logger.error(f"Failed to deliver federated events for {fed_ws.instance_id}: {exc}")
+        delivered = {}
+    return {key: delivered.get(outbox_id) for key, outbox_id in zip(keys, outbox_ids, strict=True)}
+
+
+def _split_federated_targets(
+    records: list[tuple], fed_ws: schemas.FederatedWorkspace | None, source_workspace_id: int | None
+) -> tuple[list[tuple], list[tuple]]:
+    """Split ``(post_meta, sync_channel, workspace)`` records into ``(federated, local)`` targets.
+
+    In a federated sync, records outside the source workspace live on the
+    remote instance and are sent through :func:`_push_federated`.
+    """
+    if not fed_ws:
+        return [], list(records)
+    federated = [r for r in records if r[2].id != source_workspace_id]
+    local = [r for r in records if r[2].id == source_workspace_id]
+    return federated, local
+
+
+def _collect_fan_out(outcomes: list[tuple], error_prefix: str) -> tuple[list[schemas.PostMeta], int]:
+    """Merge per-target fan-out results into ``(post_list, channels_synced)``.
+
+    Each target item is a record tuple whose second-to-last element is the
+    :class:`~db.schemas.SyncChannel`; failures are logged against it.
+    """
+    post_list: list[schemas.PostMeta] = []
+    channels_synced = 0
+    for target, rows, error in outcomes:
+        if error is not None:
+            _logger.error(f"{error_prefix} {target[-2].channel_id}: {error}")
+            continue
+        if rows:
+            post_list.extend(rows)
+            channels_synced += 1
+    return post_list, channels_synced
+
+
 def _handle_new_post(
     body: dict,
     client: WebClient,
@@ -157,7 +278,6 @@ def _handle_new_post(
     team_id = ctx["team_id"]
     channel_id = ctx["channel_id"]
     msg_text = ctx["msg_text"]
-    mentioned_users = ctx["mentioned_users"]
     user_id = ctx["user_id"]
 
     sync_records = helpers.get_sync_list(team_id, channel_id)
@@ -184,6 +304,8 @@ def _handle_new_post(
                 logger.error(f"Failed to notify and leave unconfigured channel {channel_id}: {e}")
         return
 
+    mentioned_users = _resolve_mentions(ctx, client)
+
     if user_id:
         user_name, user_profile_url = helpers.get_user_info(client, user_id)
     else:
@@ -192,8 +314,6 @@ def _handle_new_post(
     workspace_name = _get_workspace_name(sync_records, channel_id, workspace_index=1)
 
     post_uuid = uuid.uuid4().hex
-    post_list: list[schemas.PostMeta] = []
-    channels_synced = 0
 
     source_workspace_id = _find_source_workspace_id(sync_records, channel_id)
 
@@ -204,22 +324,28 @@ def _handle_new_post(
     source_ws_fed = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
     fed_adapted_text = helpers.resolve_channel_references(msg_text, client, source_ws_fed)
 
-    for sync_channel, workspace in sync_records:
-        try:
-            split_file_ts: str | None = None
-            if sync_channel.channel_id == channel_id:
-                ts = helpers.safe_get(body, "event", "ts")
-            elif fed_ws and workspace.id != source_workspace_id:
-                image_payloads = []
-                for block in photo_blocks or []:
-                    if block.get("type") == "image":
-                        image_payloads.append(
-                            {
-                                "url": block.get("image_url", ""),
-                                "alt_text": block.get("alt_text", "Shared image"),
-                            }
-                        )
-                payload = federation.build_message_payload(
+    mentions = _mention_table(
+        client,
+        mentioned_users,
+        source_workspace_id,
+        [
+            ws
+            for sc, ws in sync_records
+            if sc.channel_id != channel_id and not (fed_ws and ws.id != source_workspace_id)
+        ],
+    )
+
+    image_payloads = [
+        {"url": block.get("image_url", ""), "alt_text": block.get("alt_text", "Shared image")}
+        for block in photo_blocks or []
+        if block.get("type") == "image"
+    ]
+    fed_results = _push_federated(
+        fed_ws,
+        {
+            sync_channel.id: (
+                "message",
+                federation.build_message_payload(
                     sync_id=sync_channel.sync_id,
                     post_id=post_uuid,
                     channel_id=sync_channel.channel_id,
@@ -229,38 +355,82 @@ def _handle_new_post(
                     text=fed_adapted_text,
                     images=image_payloads,
                     timestamp=helpers.safe_get(body, "event", "ts"),
-                )
-                result = federation.push_message(fed_ws, payload)
-                ts = helpers.safe_get(result, "ts") if result else helpers.safe_get(body, "event", "ts")
-                if not ts:
-                    ts = helpers.safe_get(body, "event", "ts")
-            else:
-                bot_token = helpers.decrypt_bot_token(workspace.bot_token)
-                target_client = WebClient(token=bot_token)
-                adapted_text = helpers.apply_mentioned_users(
-                    msg_text,
-                    client,
-                    target_client,
-                    mentioned_users,
+                ),
+                sync_channel.id,
+            )
+            for sync_channel, workspace in sync_records
+            if sync_channel.channel_id != channel_id and fed_ws and workspace.id != source_workspace_id
+        },
+    )
+
+    def _sync_target(target: tuple[schemas.SyncChannel, schemas.Workspace]) -> list[schemas.PostMeta]:
+        sync_channel, workspace = target
+        split_file_ts: str | None = None
+        if sync_channel.channel_id == channel_id:
+            ts = helpers.safe_get(body, "event", "ts")
+        elif fed_ws and workspace.id != source_workspace_id:
+            result = fed_results.get(sync_channel.id)
+            ts = helpers.safe_get(result, "ts") if result else helpers.safe_get(body, "event", "ts")
+            if not ts:
+                ts = helpers.safe_get(body, "event", "ts")
+        else:
+            bot_token = helpers.get_bot_token(workspace)
+            target_client = helpers.get_workspace_client(workspace)
+            adapted_text = helpers.apply_mentioned_users(
+                msg_text,
+                client,
+                target_client,
+                mentioned_users,
+                source_workspace_id=source_workspace_id or 0,
+                target_workspace_id=workspace.id,
+                resolved=mentions.get(workspace.id, {}),
+            )
+            source_ws = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
+            adapted_text = helpers.resolve_channel_references(
+                adapted_text, client, source_ws, target_workspace_id=workspace.id
+            )
+
+            target_display_name, target_icon_url = helpers.get_display_name_and_icon_for_synced_message(
+                user_id or "",
+                source_workspace_id or 0,
+                user_name,
+                user_profile_url,
+                target_client,
+                workspace.id,
+            )
+            name_for_target = target_display_name or user_name or "Someone"
+
+            if direct_files and not msg_text.strip():
+                file_comment = _shared_by_file_initial_comment(
+                    user_id=user_id or "",
                     source_workspace_id=source_workspace_id or 0,
                     target_workspace_id=workspace.id,
+                    name_for_target=name_for_target,
+                    target_client=target_client,
+                    channel_id=sync_channel.channel_id,
+                    text_message_ts=None,
                 )
-                source_ws = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
-                adapted_text = helpers.resolve_channel_references(
-                    adapted_text, client, source_ws, target_workspace_id=workspace.id
+                _, file_ts = helpers.upload_files_to_slack(
+                    bot_token=bot_token,
+                    channel_id=sync_channel.channel_id,
+                    files=direct_files,
+                    initial_comment=file_comment,
                 )
-
-                target_display_name, target_icon_url = helpers.get_display_name_and_icon_for_synced_message(
-                    user_id or "",
-                    source_workspace_id or 0,
-                    user_name,
-                    user_profile_url,
-                    target_client,
-                    workspace.id,
+                ts = file_ts or helpers.safe_get(body, "event", "ts")
+            else:
+                res = helpers.post_message(
+                    bot_token=bot_token,
+                    channel_id=sync_channel.channel_id,
+                    msg_text=adapted_text,
+                    user_name=name_for_target,
+                    user_profile_url=target_icon_url or user_profile_url,
+                    workspace_name=workspace_name,
+                    blocks=photo_blocks,
                 )
-                name_for_target = target_display_name or user_name or "Someone"
+                ts = helpers.safe_get(res, "ts") or helpers.safe_get(body, "event", "ts")
 
-                if direct_files and not msg_text.strip():
+                if direct_files:
+                    text_ts = str(ts) if ts else None
                     file_comment = _shared_by_file_initial_comment(
                         user_id=user_id or "",
                         source_workspace_id=source_workspace_id or 0,
@@ -268,56 +438,21 @@ def _handle_new_post(
                         name_for_target=name_for_target,
                         target_client=target_client,
                         channel_id=sync_channel.channel_id,
-                        text_message_ts=None,
+                        text_message_ts=text_ts,
                     )
-                    _, file_ts = helpers.upload_files_to_slack(
+                    _, split_file_ts = helpers.upload_files_to_slack(
                         bot_token=bot_token,
                         channel_id=sync_channel.channel_id,
                         files=direct_files,
+                        thread_ts=ts,
                         initial_comment=file_comment,
                     )
-                    ts = file_ts or helpers.safe_get(body, "event", "ts")
-                else:
-                    res = helpers.post_message(
-                        bot_token=bot_token,
-                        channel_id=sync_channel.channel_id,
-                        msg_text=adapted_text,
-                        user_name=name_for_target,
-                        user_profile_url=target_icon_url or user_profile_url,
-                        workspace_name=workspace_name,
-                        blocks=photo_blocks,
-                    )
-                    ts = helpers.safe_get(res, "ts") or helpers.safe_get(body, "event", "ts")
-
-                    if direct_files:
-                        text_ts = str(ts) if ts else None
-                        file_comment = _shared_by_file_initial_comment(
-                            user_id=user_id or "",
-                            source_workspace_id=source_workspace_id or 0,
-                            target_workspace_id=workspace.id,
-                            name_for_target=name_for_target,
-                            target_client=target_client,
-                            channel_id=sync_channel.channel_id,
-                            text_message_ts=text_ts,
-                        )
-                        _, split_file_ts = helpers.upload_files_to_slack(
-                            bot_token=bot_token,
-                            channel_id=sync_channel.channel_id,
-                            files=direct_files,
-                            thread_ts=ts,
-                            initial_comment=file_comment,
-                        )
 
-            if ts:
-                post_list.append(schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel.id, ts=float(ts)))
-            if split_file_ts:
-                post_list.append(
-                    schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel.id, ts=float(split_file_ts))
-                )
-            if ts or split_file_ts:
-                channels_synced += 1
-        except Exception as exc:
-            _logger.error(f"Failed to sync new post to channel {sync_channel.channel_id}: {exc}")
+        return _post_meta_rows(post_uuid, sync_channel.id, ts, split_file_ts)
+
+    post_list, channels_synced = _collect_fan_out(
+        helpers.fan_out(_sync_target, sync_records), "Failed to sync new post to channel"
+    )
 
     synced = channels_synced
     failed = len(sync_records) - synced
@@ -342,7 +477,6 @@ def _handle_thread_reply(
     """Sync a threaded reply to all linked channels."""
     channel_id = ctx["channel_id"]
     msg_text = ctx["msg_text"]
-    mentioned_users = ctx["mentioned_users"]
     user_id = ctx["user_id"]
     thread_ts = ctx["thread_ts"]
 
@@ -350,6 +484,8 @@ def _handle_thread_reply(
     if not post_records:
         return
 
+    mentioned_users = _resolve_mentions(ctx, client)
+
     workspace_name = _get_workspace_name(post_records, channel_id, workspace_index=2)
 
     if user_id:
@@ -358,8 +494,6 @@ def _handle_thread_reply(
         user_name, user_profile_url = helpers.get_bot_info_from_event(body)
 
     post_uuid = uuid.uuid4().hex
-    post_list: list[schemas.PostMeta] = []
-    channels_synced = 0
 
     source_workspace_id = _find_source_workspace_id(post_records, channel_id, ws_index=2)
 
@@ -372,13 +506,23 @@ def _handle_thread_reply(
     source_ws_fed = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
     fed_adapted_text = helpers.resolve_channel_references(msg_text, client, source_ws_fed)
 
-    for post_meta, sync_channel, workspace in post_records:
-        try:
-            split_file_ts: str | None = None
-            if sync_channel.channel_id == channel_id:
-                ts = helpers.safe_get(body, "event", "ts")
-            elif fed_ws and workspace.id != source_workspace_id:
-                payload = federation.build_message_payload(
+    mentions = _mention_table(
+        client,
+        mentioned_users,
+        source_workspace_id,
+        [
+            ws
+            for _pm, sc, ws in post_records
+            if sc.channel_id != channel_id and not (fed_ws and ws.id != source_workspace_id)
+        ],
+    )
+
+    fed_results = _push_federated(
+        fed_ws,
+        {
+            (sync_channel.id, post_meta.ts): (
+                "message",
+                federation.build_message_payload(
                     sync_id=sync_channel.sync_id,
                     post_id=post_uuid,
                     channel_id=sync_channel.channel_id,
@@ -388,39 +532,87 @@ def _handle_thread_reply(
                     text=fed_adapted_text,
                     thread_post_id=str(thread_post_id) if thread_post_id else None,
                     timestamp=helpers.safe_get(body, "event", "ts"),
-                )
-                result = federation.push_message(fed_ws, payload)
-                ts = helpers.safe_get(result, "ts") if result else helpers.safe_get(body, "event", "ts")
-                if not ts:
-                    ts = helpers.safe_get(body, "event", "ts")
-            else:
-                bot_token = helpers.decrypt_bot_token(workspace.bot_token)
-                target_client = WebClient(token=bot_token)
-                adapted_text = helpers.apply_mentioned_users(
-                    msg_text,
-                    client,
-                    target_client,
-                    mentioned_users,
+                ),
+                sync_channel.id,
+            )
+            for post_meta, sync_channel, workspace in post_records
+            if sync_channel.channel_id != channel_id and fed_ws and workspace.id != source_workspace_id
+        },
+    )
+
+    def _sync_target(
+        target: tuple[schemas.PostMeta, schemas.SyncChannel, schemas.Workspace],
+    ) -> list[schemas.PostMeta]:
+        post_meta, sync_channel, workspace = target
+        split_file_ts: str | None = None
+        if sync_channel.channel_id == channel_id:
+            ts = helpers.safe_get(body, "event", "ts")
+        elif fed_ws and workspace.id != source_workspace_id:
+            result = fed_results.get((sync_channel.id, post_meta.ts))
+            ts = helpers.safe_get(result, "ts") if result else helpers.safe_get(body, "event", "ts")
+            if not ts:
+                ts = helpers.safe_get(body, "event", "ts")
+        else:
+            bot_token = helpers.get_bot_token(workspace)
+            target_client = helpers.get_workspace_client(workspace)
+            adapted_text = helpers.apply_mentioned_users(
+                msg_text,
+                client,
+                target_client,
+                mentioned_users,
+                source_workspace_id=source_workspace_id or 0,
+                target_workspace_id=workspace.id,
+                resolved=mentions.get(workspace.id, {}),
+            )
+            source_ws = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
+            adapted_text = helpers.resolve_channel_references(
+                adapted_text, client, source_ws, target_workspace_id=workspace.id
+            )
+            parent_ts = f"{post_meta.ts:.6f}"
+
+            target_display_name, target_icon_url = helpers.get_display_name_and_icon_for_synced_message(
+                user_id or "",
+                source_workspace_id or 0,
+                user_name,
+                user_profile_url,
+                target_client,
+                workspace.id,
+            )
+            name_for_target = target_display_name or user_name or "Someone"
+
+            if direct_files and not msg_text.strip():
+                file_comment = _shared_by_file_initial_comment(
+                    user_id=user_id or "",
                     source_workspace_id=source_workspace_id or 0,
                     target_workspace_id=workspace.id,
+                    name_for_target=name_for_target,
+                    target_client=target_client,
+                    channel_id=sync_channel.channel_id,
+                    text_message_ts=None,
                 )
-                source_ws = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
-                adapted_text = helpers.resolve_channel_references(
-                    adapted_text, client, source_ws, target_workspace_id=workspace.id
+                _, file_ts = helpers.upload_files_to_slack(
+                    bot_token=bot_token,
+                    channel_id=sync_channel.channel_id,
+                    files=direct_files,
+                    initial_comment=file_comment,
+                    thread_ts=parent_ts,
                 )
-                parent_ts = f"{post_meta.ts:.6f}"
-
-                target_display_name, target_icon_url = helpers.get_display_name_and_icon_for_synced_message(
-                    user_id or "",
-                    source_workspace_id or 0,
-                    user_name,
-                    user_profile_url,
-                    target_client,
-                    workspace.id,
+                ts = file_ts or helpers.safe_get(body, "event", "ts")
+            else:
+                res = helpers.post_message(
+                    bot_token=bot_token,
+                    channel_id=sync_channel.channel_id,
+                    msg_text=adapted_text,
+                    user_name=name_for_target,
+                    user_profile_url=target_icon_url or user_profile_url,
+                    thread_ts=parent_ts,
+                    workspace_name=workspace_name,
+                    blocks=photo_blocks,
                 )
-                name_for_target = target_display_name or user_name or "Someone"
+                ts = helpers.safe_get(res, "ts")
 
-                if direct_files and not msg_text.strip():
+                if direct_files:
+                    text_ts = str(ts) if ts else None
                     file_comment = _shared_by_file_initial_comment(
                         user_id=user_id or "",
                         source_workspace_id=source_workspace_id or 0,
@@ -428,58 +620,21 @@ def _handle_thread_reply(
                         name_for_target=name_for_target,
                         target_client=target_client,
                         channel_id=sync_channel.channel_id,
-                        text_message_ts=None,
+                        text_message_ts=text_ts,
                     )
-                    _, file_ts = helpers.upload_files_to_slack(
+                    _, split_file_ts = helpers.upload_files_to_slack(
                         bot_token=bot_token,
                         channel_id=sync_channel.channel_id,
                         files=direct_files,
-                        initial_comment=file_comment,
-                        thread_ts=parent_ts,
-                    )
-                    ts = file_ts or helpers.safe_get(body, "event", "ts")
-                else:
-                    res = helpers.post_message(
-                        bot_token=bot_token,
-                        channel_id=sync_channel.channel_id,
-                        msg_text=adapted_text,
-                        user_name=name_for_target,
-                        user_profile_url=target_icon_url or user_profile_url,
                         thread_ts=parent_ts,
-                        workspace_name=workspace_name,
-                        blocks=photo_blocks,
+                        initial_comment=file_comment,
                     )
-                    ts = helpers.safe_get(res, "ts")
-
-                    if direct_files:
-                        text_ts = str(ts) if ts else None
-                        file_comment = _shared_by_file_initial_comment(
-                            user_id=user_id or "",
-                            source_workspace_id=source_workspace_id or 0,
-                            target_workspace_id=workspace.id,
-                            name_for_target=name_for_target,
-                            target_client=target_client,
-                            channel_id=sync_channel.channel_id,
-                            text_message_ts=text_ts,
-                        )
-                        _, split_file_ts = helpers.upload_files_to_slack(
-                            bot_token=bot_token,
-                            channel_id=sync_channel.channel_id,
-                            files=direct_files,
-                            thread_ts=parent_ts,
-                            initial_comment=file_comment,
-                        )
 
-            if ts:
-                post_list.append(schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel.id, ts=float(ts)))
-            if split_file_ts:
-                post_list.append(
-                    schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel.id, ts=float(split_file_ts))
-                )
-            if ts or split_file_ts:
-                channels_synced += 1
-        except Exception as exc:
-            _logger.error(f"Failed to sync thread reply to channel {sync_channel.channel_id}: {exc}")
+        return _post_meta_rows(post_uuid, sync_channel.id, ts, split_file_ts)
+
+    post_list, channels_synced = _collect_fan_out(
+        helpers.fan_out(_sync_target, post_records), "Failed to sync thread reply to channel"
+    )
 
     synced = channels_synced
     failed = len(post_records) - synced
@@ -502,13 +657,14 @@ def _handle_message_edit(
     """Propagate an edited message to all linked channels."""
     channel_id = ctx["channel_id"]
     msg_text = ctx["msg_text"]
-    mentioned_users = ctx["mentioned_users"]
     ts = ctx["ts"]
 
     post_records = helpers.get_post_records(ts)
     if not post_records:
         return
 
+    mentioned_users = _resolve_mentions(ctx, client)
+
     workspace_name = _get_workspace_name(post_records, channel_id, workspace_index=2)
 
     source_workspace_id = _find_source_workspace_id(post_records, channel_id, ws_index=2)
@@ -520,43 +676,55 @@ def _handle_message_edit(
     source_ws_fed = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
     fed_adapted_text = helpers.resolve_channel_references(msg_text, client, source_ws_fed)
 
-    synced = 0
-    failed = 0
-    for post_meta, sync_channel, workspace in post_records:
-        if sync_channel.channel_id == channel_id:
-            continue
-        try:
-            if fed_ws and workspace.id != source_workspace_id:
-                payload = federation.build_edit_payload(
+    federated, local = _split_federated_targets(
+        [r for r in post_records if r[1].channel_id != channel_id], fed_ws, source_workspace_id
+    )
+    mentions = _mention_table(client, mentioned_users, source_workspace_id, [ws for _pm, _sc, ws in local])
+
+    _push_federated(
+        fed_ws,
+        {
+            (sync_channel.id, post_meta.ts): (
+                "edit",
+                federation.build_edit_payload(
                     post_id=post_meta.post_id.hex() if isinstance(post_meta.post_id, bytes) else str(post_meta.post_id),
                     channel_id=sync_channel.channel_id,
                     text=fed_adapted_text,
                     timestamp=f"{post_meta.ts:.6f}",
-                )
-                federation.push_edit(fed_ws, payload)
-            else:
-                bot_token = helpers.decrypt_bot_token(workspace.bot_token)
-                target_client = WebClient(token=bot_token)
-                adapted_text = helpers.apply_mentioned_users(
-                    msg_text,
-                    client,
-                    target_client,
-                    mentioned_users,
-                    source_workspace_id=source_workspace_id or 0,
-                    target_workspace_id=workspace.id,
-                )
-                source_ws = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
-                adapted_text = helpers.resolve_channel_references(
-                    adapted_text, client, source_ws, target_workspace_id=workspace.id
-                )
-                helpers.post_message(
-                    bot_token=bot_token,
-                    channel_id=sync_channel.channel_id,
-                    msg_text=adapted_text,
-                    update_ts=f"{post_meta.ts:.6f}",
-                    workspace_name=workspace_name,
-                    blocks=photo_blocks,
-                )
+                ),
+                sync_channel.id,
+            )
+            for post_meta, sync_channel, _workspace in federated
+        },
+    )
+
+    synced = len(federated)
+    failed = 0
+    for post_meta, sync_channel, workspace in local:
+        try:
+            bot_token = helpers.get_bot_token(workspace)
+            target_client = helpers.get_workspace_client(workspace)
+            adapted_text = helpers.apply_mentioned_users(
+                msg_text,
+                client,
+                target_client,
+                mentioned_users,
+                source_workspace_id=source_workspace_id or 0,
+                target_workspace_id=workspace.id,
+                resolved=mentions.get(workspace.id, {}),
+            )
+            source_ws = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
+            adapted_text = helpers.resolve_channel_references(
+                adapted_text, client, source_ws, target_workspace_id=workspace.id
+            )
+            helpers.post_message(
+                bot_token=bot_token,
+                channel_id=sync_channel.channel_id,
+                msg_text=adapted_text,
+                update_ts=f"{post_meta.ts:.6f}",
+                workspace_name=workspace_name,
+                blocks=photo_blocks,
+            )
             synced += 1
         except Exception as exc:
             failed += 1
@@ -584,26 +752,35 @@ def _handle_message_delete(
         fed_ws = helpers.get_federated_workspace_for_sync(post_records[0][1].sync_id)
 
     source_workspace_id = _find_source_workspace_id(post_records, channel_id, ws_index=2)
+    federated, local = _split_federated_targets(
+        [r for r in post_records if r[1].channel_id != channel_id], fed_ws, source_workspace_id
+    )
 
-    synced = 0
-    failed = 0
-    for post_meta, sync_channel, workspace in post_records:
-        if sync_channel.channel_id == channel_id:
-            continue
-        try:
-            if fed_ws and workspace.id != source_workspace_id:
-                payload = federation.build_delete_payload(
+    _push_federated(
+        fed_ws,
+        {
+            (sync_channel.id, post_meta.ts): (
+                "delete",
+                federation.build_delete_payload(
                     post_id=post_meta.post_id.hex() if isinstance(post_meta.post_id, bytes) else str(post_meta.post_id),
                     channel_id=sync_channel.channel_id,
                     timestamp=f"{post_meta.ts:.6f}",
-                )
-                federation.push_delete(fed_ws, payload)
-            else:
-                helpers.delete_message(
-                    bot_token=helpers.decrypt_bot_token(workspace.bot_token),
-                    channel_id=sync_channel.channel_id,
-                    ts=f"{post_meta.ts:.6f}",
-                )
+                ),
+                sync_channel.id,
+            )
+            for post_meta, sync_channel, _workspace in federated
+        },
+    )
+
+    synced = len(federated)
+    failed = 0
+    for post_meta, sync_channel, workspace in local:
+        try:
+            helpers.delete_message(
+                bot_token=helpers.get_bot_token(workspace),
+                channel_id=sync_channel.channel_id,
+                ts=f"{post_meta.ts:.6f}",
+            )
             synced += 1
         except Exception as exc:
             failed += 1
@@ -658,6 +835,7 @@ def _handle_reaction(
     fed_ws = helpers.get_federated_workspace_for_sync(reacted_records[0][1].sync_id)
 
     source_workspace_id = _find_source_workspace_id(reacted_records, channel_id, ws_index=2)
+    federated, local = _split_federated_targets(reacted_records, fed_ws, source_workspace_id)
 
     user_name, user_profile_url = helpers.get_user_info(client, user_id) if user_id else (None, None)
     source_ws = helpers.get_workspace_by_id(source_workspace_id) if source_workspace_id else None
@@ -667,12 +845,12 @@ def _handle_reaction(
     post_uuid = uuid.uuid4().hex
     post_list: list[schemas.PostMeta] = []
 
-    synced = 0
-    failed = 0
-    for post_meta, sync_channel, workspace in reacted_records:
-        try:
-            if fed_ws and workspace.id != source_workspace_id:
-                payload = federation.build_reaction_payload(
+    _push_federated(
+        fed_ws,
+        {
+            (sync_channel.id, post_meta.ts): (
+                "react",
+                federation.build_reaction_payload(
                     post_id=str(post_meta.post_id),
                     channel_id=sync_channel.channel_id,
                     reaction=reaction,
@@ -681,54 +859,62 @@ def _handle_reaction(
                     user_avatar_url=user_profile_url,
                     workspace_name=ws_name,
                     timestamp=f"{post_meta.ts:.6f}",
-                )
-                federation.push_reaction(fed_ws, payload)
-            else:
-                target_client = WebClient(token=helpers.decrypt_bot_token(workspace.bot_token))
-                target_msg_ts = f"{post_meta.ts:.6f}"
-
-                target_display_name, target_icon_url = helpers.get_display_name_and_icon_for_synced_message(
-                    user_id or "",
-                    source_workspace_id or 0,
-                    user_name,
-                    user_profile_url,
-                    target_client,
-                    workspace.id,
-                )
-                display_name = target_display_name or user_name or user_id or "Someone"
-
-                permalink = None
-                try:
-                    plink_resp = target_client.chat_getPermalink(
-                        channel=sync_channel.channel_id,
-                        message_ts=target_msg_ts,
-                    )
-                    permalink = helpers.safe_get(plink_resp, "permalink")
-                except Exception as exc:
-                    # Permalink lookup is optional; if it fails we still post a
-                    # reaction notice without the deep-link.
-                    _logger.debug(
-                        "reaction_permalink_lookup_failed",
-                        extra={"channel_id": sync_channel.channel_id, "message_ts": target_msg_ts, "error": str(exc)},
-                    )
-
-                if permalink:
-                    msg_text = f"reacted with :{reaction}: to <{permalink}|this message>"
-                else:
-                    msg_text = f"reacted with :{reaction}:"
+                ),
+                sync_channel.id,
+            )
+            for post_meta, sync_channel, _workspace in federated
+        },
+    )
 
-                resp = target_client.chat_postMessage(
+    synced = len(federated)
+    failed = 0
+    for post_meta, sync_channel, workspace in local:
+        try:
+            target_client = helpers.get_workspace_client(workspace)
+            target_msg_ts = f"{post_meta.ts:.6f}"
+
+            target_display_name, target_icon_url = helpers.get_display_name_and_icon_for_synced_message(
+                user_id or "",
+                source_workspace_id or 0,
+                user_name,
+                user_profile_url,
+                target_client,
+                workspace.id,
+            )
+            display_name = target_display_name or user_name or user_id or "Someone"
+
+            permalink = None
+            try:
+                plink_resp = target_client.chat_getPermalink(
                     channel=sync_channel.channel_id,
-                    text=msg_text,
-                    username=f"{display_name} {posted_from}",
-                    icon_url=target_icon_url or user_profile_url,
-                    thread_ts=target_msg_ts,
-                    unfurl_links=False,
-                    unfurl_media=False,
+                    message_ts=target_msg_ts,
+                )
+                permalink = helpers.safe_get(plink_resp, "permalink")
+            except Exception as exc:
+                # Permalink lookup is optional; if it fails we still post a
+                # reaction notice without the deep-link.
+                _logger.debug(
+                    "reaction_permalink_lookup_failed",
+                    extra={"channel_id": sync_channel.channel_id, "message_ts": target_msg_ts, "error": str(exc)},
                 )
-                ts = helpers.safe_get(resp, "ts")
-                if ts:
-                    post_list.append(schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel.id, ts=float(ts)))
+
+            if permalink:
+                msg_text = f"reacted with :{reaction}: to <{permalink}|this message>"
+            else:
+                msg_text = f"reacted with :{reaction}:"
+
+            resp = target_client.chat_postMessage(
+                channel=sync_channel.channel_id,
+                text=msg_text,
+                username=f"{display_name} {posted_from}",
+                icon_url=target_icon_url or user_profile_url,
+                thread_ts=target_msg_ts,
+                unfurl_links=False,
+                unfurl_media=False,
+            )
+            ts = helpers.safe_get(resp, "ts")
+            if ts:
+                post_list.append(schemas.PostMeta(post_id=post_uuid, sync_channel_id=sync_channel.id, ts=float(ts)))
             synced += 1
         except Exception as exc:
             failed += 1
@@ -789,7 +975,7 @@ def respond_to_message_event(
     context: dict,
 ) -> None:
     """Dispatch incoming message events to the appropriate sub-handler."""
-    ctx = _parse_event_fields(body, client)
+    ctx = _parse_event_fields(body)
     event_type = helpers.safe_get(body, "event", "type")
     event_subtype = ctx["event_subtype"]
 
@@ -112,6 +112,7 @@ def handle_refresh_home(
     hash_key = f"home_tab_hash:{team_id}"
     blocks_key = f"home_tab_blocks:{team_id}:{user_id}"
     refresh_at_key = f"refresh_at:home:{team_id}:{user_id}"
+    cache_tags = (helpers.home_tab_cache_tag(team_id),)
 
     action, cached_blocks, remaining = helpers.refresh_cooldown_check(
         current_hash, hash_key, blocks_key, refresh_at_key
@@ -129,13 +130,11 @@ def handle_refresh_home(
         return
     if action == "cached" and cached_blocks is not None:
         client.views_publish(user_id=user_id, view={"type": "home", "blocks": cached_blocks})
-        helpers._cache_set(refresh_at_key, time.monotonic(), ttl=cooldown_sec * 2)
+        helpers._cache_set(refresh_at_key, time.monotonic(), ttl=cooldown_sec * 2, tags=cache_tags)
         return
 
     # Full refresh: clear workspace name caches and refresh all workspace names
-    stale_keys = [k for k in helpers._CACHE if k.startswith("ws_name_refresh:")]
-    for k in stale_keys:
-        helpers._CACHE.pop(k, None)
+    helpers._cache_delete_namespace("ws_name_refresh")
 
     all_workspaces = DbManager.find_records(
         schemas.Workspace,
@@ -146,7 +145,7 @@ def handle_refresh_home(
             if ws.id == workspace_record.id:
                 ws_client = client
             elif ws.bot_token:
-                ws_client = WebClient(token=helpers.decrypt_bot_token(ws.bot_token))
+                ws_client = helpers.get_workspace_client(ws)
             else:
                 continue
 
@@ -170,7 +169,7 @@ def handle_refresh_home(
     if block_dicts is None:
         return
     client.views_publish(user_id=user_id, view={"type": "home", "blocks": block_dicts})
-    helpers.refresh_after_full(hash_key, blocks_key, refresh_at_key, current_hash, block_dicts)
+    helpers.refresh_after_full(hash_key, blocks_key, refresh_at_key, current_hash, block_dicts, tags=cache_tags)
 
 
 def handle_join_sync_submission(
@@ -265,7 +264,7 @@ def handle_join_sync_submission(
             try:
                 member_ws = helpers.get_workspace_by_id(sync_channel.workspace_id)
                 if member_ws and member_ws.bot_token:
-                    member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
+                    member_client = helpers.get_workspace_client(member_ws)
                     member_client.chat_postMessage(
                         channel=sync_channel.channel_id,
                         text=f":arrows_counterclockwise: *{admin_label}* started syncing *{local_ref}* with this Channel. Messages will be shared automatically.",
@@ -548,6 +547,7 @@ def handle_db_reset_proceed(
     drop_and_init_db()
 
     helpers.clear_all_caches()
+    helpers.clear_workspace_clients()
 
     if team_id and user_id:
         try:
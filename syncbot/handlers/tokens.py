@@ -43,6 +43,7 @@ def handle_tokens_revoked(
         [schemas.Workspace.id == workspace_record.id],
         {schemas.Workspace.deleted_at: now},
     )
+    helpers.invalidate_workspace_client(workspace_record.id)
 
     active_memberships = DbManager.find_records(
         schemas.WorkspaceGroupMember,
@@ -94,7 +95,7 @@ def handle_tokens_revoked(
             notified_ws.add(member.workspace_id)
 
             try:
-                member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
+                member_client = helpers.get_workspace_client(member_ws)
 
                 helpers.notify_admins_dm(
                     member_client,
@@ -146,6 +146,7 @@ def handle_user_mapping_refresh(
     hash_key = f"user_mapping_hash:{workspace_record.team_id}:{user_id}:{group_id}"
     blocks_key = f"user_mapping_blocks:{workspace_record.team_id}:{user_id}:{group_id}"
     refresh_at_key = f"refresh_at:user_mapping:{workspace_record.team_id}:{user_id}:{group_id}"
+    cache_tags = (helpers.user_mapping_cache_tag(workspace_record.team_id),)
 
     action, cached_blocks, remaining = helpers.refresh_cooldown_check(
         current_hash, hash_key, blocks_key, refresh_at_key
@@ -160,10 +161,16 @@ def handle_user_mapping_refresh(
         return
     if action == "cached" and cached_blocks is not None:
         client.views_publish(user_id=user_id, view={"type": "home", "blocks": cached_blocks})
-        helpers._cache_set(refresh_at_key, time.monotonic(), ttl=cooldown_sec * 2)
+        helpers._cache_set(refresh_at_key, time.monotonic(), ttl=cooldown_sec * 2, tags=cache_tags)
         return
 
-    helpers._CACHE.pop(f"dir_refresh:{workspace_record.id}", None)
+    try:
+        helpers._refresh_user_directory(client, workspace_record.id, force=True)
+    except Exception as exc:
+        _logger.warning(
+            "user_mapping_refresh_directory_failed",
+            extra={"workspace_id": workspace_record.id, "error": str(exc)},
+        )
 
     if group_id:
         members = _get_group_members(group_id)
@@ -178,13 +185,12 @@ def handle_user_mapping_refresh(
         if not member.workspace_id or member.workspace_id == workspace_record.id:
             continue
         try:
-            # Force a fresh directory pull before rematching. Cached directory
-            # snapshots can keep stale display names/emails after profile edits.
-            helpers._CACHE.pop(f"dir_refresh:{member.workspace_id}", None)
             member_ws = helpers.get_workspace_by_id(member.workspace_id, context=context)
             if member_ws and member_ws.bot_token:
-                member_client = WebClient(token=helpers.decrypt_bot_token(member_ws.bot_token))
-                helpers._refresh_user_directory(member_client, member.workspace_id)
+                member_client = helpers.get_workspace_client(member_ws)
+                # Force a fresh directory pull before rematching. Directory rows can
+                # keep stale display names/emails if a profile event was missed.
+                helpers._refresh_user_directory(member_client, member.workspace_id, force=True)
                 member_clients.append((member_client, member.workspace_id))
             helpers.seed_user_mappings(member.workspace_id, workspace_record.id, group_id=gid_opt)
             helpers.seed_user_mappings(workspace_record.id, member.workspace_id, group_id=gid_opt)
@@ -215,7 +221,7 @@ def handle_user_mapping_refresh(
     if block_dicts is None:
         return
     client.views_publish(user_id=user_id, view={"type": "home", "blocks": block_dicts})
-    helpers.refresh_after_full(hash_key, blocks_key, refresh_at_key, current_hash, block_dicts)
+    helpers.refresh_after_full(hash_key, blocks_key, refresh_at_key, current_hash, block_dicts, tags=cache_tags)
 
 
 def handle_user_mapping_edit_submit(
@@ -277,9 +283,7 @@ def handle_user_mapping_edit_submit(
         _logger.info("user_mapping_updated", extra={"mapping_id": mapping.id, "target_user_id": selected})
 
     # Invalidate user-mapping caches so next Refresh on that screen does a full rebuild
-    helpers._cache_delete_prefix(f"user_mapping_hash:{workspace_record.team_id}:")
-    helpers._cache_delete_prefix(f"user_mapping_blocks:{workspace_record.team_id}:")
-    helpers._cache_delete_prefix(f"refresh_at:user_mapping:{workspace_record.team_id}:")
+    helpers._cache_invalidate_tags(helpers.user_mapping_cache_tag(workspace_record.team_id))
 
     builders.build_user_mapping_screen(
         client,
@@ -9,11 +9,21 @@ from helpers._cache import (
     _CACHE_TTL_SECONDS,
     _USER_INFO_CACHE_TTL,
     _cache_delete,
+    _cache_delete_namespace,
     _cache_delete_prefix,
     _cache_get,
+    _cache_invalidate_tags,
     _cache_set,
+    cache_stats,
     clear_all_caches,
 )
+from helpers.clients import (
+    clear_workspace_clients,
+    client_for_token,
+    get_bot_token,
+    get_workspace_client,
+    invalidate_workspace_client,
+)
 from helpers.core import (
     format_admin_label,
     get_request_type,
@@ -24,6 +34,7 @@ from helpers.core import (
     safe_get,
 )
 from helpers.encryption import decrypt_bot_token, encrypt_bot_token
+from helpers.fanout import fan_out
 from helpers.files import (
     cleanup_temp_files,
     download_public_file,
@@ -39,12 +50,15 @@ from helpers.notifications import (
     save_dm_messages_to_group_member,
 )
 from helpers.oauth import get_oauth_flow
+from helpers.rate_limit import RateLimitExceeded, throttle
 from helpers.refresh import (
     cooldown_message_block,
+    home_tab_cache_tag,
     index_of_block_with_action,
     inject_cooldown_message,
     refresh_after_full,
     refresh_cooldown_check,
+    user_mapping_cache_tag,
 )
 from helpers.slack_api import (
     _users_info,
@@ -67,12 +81,16 @@ from helpers.user_matching import (
     find_synced_channel_in_target,
     get_display_name_and_icon_for_synced_message,
     get_mapped_target_user_id,
+    invalidate_user_name_index,
     normalize_display_name,
     parse_mentioned_users,
     resolve_channel_references,
     resolve_mention_for_workspace,
+    resolve_mentions_bulk,
     run_auto_match_for_workspace,
+    run_directory_maintenance,
     seed_user_mappings,
+    upsert_directory_users,
 )
 from helpers.workspace import (
     get_federated_workspace,
@@ -91,9 +109,12 @@ __all__ = [
     "_CACHE_TTL_SECONDS",
     "_USER_INFO_CACHE_TTL",
     "_cache_delete",
+    "_cache_delete_namespace",
     "_cache_delete_prefix",
     "_cache_get",
+    "_cache_invalidate_tags",
     "_cache_set",
+    "cache_stats",
     "clear_all_caches",
     "_get_user_profile",
     "_normalize_name",
@@ -102,15 +123,19 @@ __all__ = [
     "_users_info",
     "apply_mentioned_users",
     "cleanup_temp_files",
+    "clear_workspace_clients",
+    "client_for_token",
     "cooldown_message_block",
     "decrypt_bot_token",
     "delete_message",
     "download_public_file",
     "download_slack_files",
     "encrypt_bot_token",
+    "fan_out",
     "format_admin_label",
     "get_admin_ids",
     "get_bot_info_from_event",
+    "get_bot_token",
     "get_federated_workspace",
     "get_federated_workspace_for_sync",
     "get_group_members",
@@ -128,8 +153,12 @@ __all__ = [
     "get_user_id_from_body",
     "get_user_info",
     "get_workspace_by_id",
+    "get_workspace_client",
     "get_workspace_record",
+    "home_tab_cache_tag",
     "index_of_block_with_action",
+    "invalidate_user_name_index",
+    "invalidate_workspace_client",
     "inject_cooldown_message",
     "is_backup_visible_for_workspace",
     "is_db_reset_visible_for_workspace",
@@ -140,17 +169,23 @@ __all__ = [
     "parse_mentioned_users",
     "post_message",
     "purge_stale_soft_deletes",
+    "RateLimitExceeded",
     "resolve_channel_name",
     "resolve_channel_references",
     "refresh_after_full",
     "refresh_cooldown_check",
     "resolve_mention_for_workspace",
+    "resolve_mentions_bulk",
     "resolve_workspace_name",
     "run_auto_match_for_workspace",
+    "run_directory_maintenance",
     "safe_get",
     "save_dm_messages_to_group_member",
     "seed_user_mappings",
     "slack_retry",
+    "throttle",
     "update_modal",
     "upload_files_to_slack",
+    "upsert_directory_users",
+    "user_mapping_cache_tag",
 ]
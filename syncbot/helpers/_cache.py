@@ -2,27 +2,242 @@
 
 Lambda containers are reused across invocations, so a short TTL cache
 avoids redundant DB queries for the same sync list within a warm container.
+
+Long-running containers (Cloud Run, ``python app.py``) keep the same cache
+for days, so it is bounded: entries are grouped into namespaces by the key
+prefix before the first ``:`` (``user_info``, ``sync_list``, …), each
+namespace holds at most a fixed number of entries and evicts the least
+recently used one when full, and expired entries are swept periodically
+instead of only when their key is read again.  Hit/miss/eviction counters
+and namespace sizes are reported through :func:`logger.emit_metric` on each
+sweep.
+
+Entries can also carry tags (e.g. ``home_tab:<team_id>``) so a group of
+related keys is invalidated in time proportional to the entries removed,
+without scanning the cache: see :func:`_cache_invalidate_tags` and
+:func:`_cache_delete_namespace`.
 """
 
+import threading
 import time as _time
+from collections import OrderedDict
+from collections.abc import Iterable
+
+import constants
+from logger import emit_metric
 
-_CACHE: dict = {}
 _CACHE_TTL_SECONDS = 60
 _USER_INFO_CACHE_TTL = 300  # 5 min for user info lookups
 
+# Namespaces whose values are large (rendered Block Kit lists) get a tighter cap.
+_NAMESPACE_MAX_ENTRIES: dict[str, int] = {
+    "home_tab_blocks": 500,
+    "user_mapping_blocks": 500,
+}
+
+
+def _namespace(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+class _BoundedCache:
+    """Thread-safe TTL cache with a per-namespace LRU entry cap."""
+
+    def __init__(self, max_entries: int, sweep_interval: float):
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._lock = threading.Lock()
+        self._namespaces: dict[str, OrderedDict] = {}
+        self._tags: dict[str, set[str]] = {}
+        self._stats: dict[str, dict[str, int]] = {}
+        self._last_sweep = _time.monotonic()
+
+    # -- stats ---------------------------------------------------------------
+
+    def _count(self, ns: str, counter: str, n: int = 1) -> None:
+        stats = self._stats.setdefault(ns, {"hits": 0, "misses": 0, "evictions": 0, "expired": 0})
+        stats[counter] += n
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return counters since the last sweep plus the current size, per namespace."""
+        with self._lock:
+            names = set(self._stats) | set(self._namespaces)
+            return {
+                ns: {
+                    **self._stats.get(ns, {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}),
+                    "size": len(self._namespaces.get(ns, ())),
+                }
+                for ns in sorted(names)
+            }
+
+    # -- tag index (callers hold the lock) -----------------------------------
+
+    def _unlink(self, key: str, entry: dict) -> None:
+        for tag in entry["tags"]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def _remove(self, entries: OrderedDict, key: str) -> dict:
+        entry = entries.pop(key)
+        self._unlink(key, entry)
+        return entry
+
+    # -- core operations -----------------------------------------------------
+
+    def get(self, key: str):
+        ns = _namespace(key)
+        now = _time.monotonic()
+        with self._lock:
+            entries = self._namespaces.get(ns)
+            entry = entries.get(key) if entries else None
+            if entry is not None and now - entry["t"] < entry["ttl"]:
+                entries.move_to_end(key)
+                self._count(ns, "hits")
+                value = entry["v"]
+            else:
+                if entry is not None:
+                    self._remove(entries, key)
+                    self._count(ns, "expired")
+                self._count(ns, "misses")
+                value = None
+        self._maybe_sweep(now)
+        return value
+
+    def set(self, key: str, value, ttl: float, tags: Iterable[str] = ()) -> None:
+        ns = _namespace(key)
+        now = _time.monotonic()
+        limit = _NAMESPACE_MAX_ENTRIES.get(ns, self.max_entries)
+        tags = frozenset(tags)
+        with self._lock:
+            entries = self._namespaces.setdefault(ns, OrderedDict())
+            if key in entries:
+                self._remove(entries, key)
+            entries[key] = {"v": value, "t": now, "ttl": ttl, "tags": tags}
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            overflow = len(entries) - limit
+            for _ in range(max(0, overflow)):
+                self._remove(entries, next(iter(entries)))
+            if overflow > 0:
+                self._count(ns, "evictions", overflow)
+        self._maybe_sweep(now)
+
+    def pop(self, key: str, default=None):
+        with self._lock:
+            entries = self._namespaces.get(_namespace(key))
+            if not entries or key not in entries:
+                return default
+            return self._remove(entries, key)["v"]
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            if ":" in prefix:
+                candidates = [self._namespaces.get(_namespace(prefix))]
+            else:
+                candidates = [e for ns, e in self._namespaces.items() if ns.startswith(prefix)]
+            removed = 0
+            for entries in candidates:
+                if not entries:
+                    continue
+                for k in [k for k in entries if k.startswith(prefix)]:
+                    self._remove(entries, k)
+                    removed += 1
+            return removed
+
+    def delete_namespace(self, namespace: str) -> int:
+        with self._lock:
+            entries = self._namespaces.pop(namespace, None)
+            if not entries:
+                return 0
+            for key, entry in entries.items():
+                self._unlink(key, entry)
+            return len(entries)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        with self._lock:
+            removed = 0
+            for tag in tags:
+                for key in self._tags.pop(tag, ()):
+                    entries = self._namespaces.get(_namespace(key))
+                    if entries and key in entries:
+                        self._remove(entries, key)
+                        removed += 1
+            return removed
+
+    def clear(self) -> int:
+        with self._lock:
+            count = sum(len(e) for e in self._namespaces.values())
+            self._namespaces.clear()
+            self._tags.clear()
+            self._stats.clear()
+            return count
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(e) for e in self._namespaces.values())
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            entries = self._namespaces.get(_namespace(key))
+            return bool(entries) and key in entries
+
+    def __iter__(self):
+        with self._lock:
+            keys = [k for entries in self._namespaces.values() for k in entries]
+        return iter(keys)
+
+    # -- expiry sweep --------------------------------------------------------
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop every expired entry, emit cache metrics and reset the counters."""
+        now = _time.monotonic() if now is None else now
+        with self._lock:
+            self._last_sweep = now
+            removed = 0
+            for ns, entries in list(self._namespaces.items()):
+                expired = [k for k, e in entries.items() if now - e["t"] >= e["ttl"]]
+                for k in expired:
+                    self._remove(entries, k)
+                if expired:
+                    self._count(ns, "expired", len(expired))
+                    removed += len(expired)
+                if not entries:
+                    del self._namespaces[ns]
+        snapshot = self.stats()
+        with self._lock:
+            self._stats.clear()
+        for ns, stats in snapshot.items():
+            emit_metric("cache_hits", stats["hits"], namespace=ns)
+            emit_metric("cache_misses", stats["misses"], namespace=ns)
+            emit_metric("cache_evictions", stats["evictions"], namespace=ns)
+            emit_metric("cache_size", stats["size"], unit="None", namespace=ns)
+        return removed
+
+
+_CACHE = _BoundedCache(
+    max_entries=constants.CACHE_MAX_ENTRIES_PER_NAMESPACE,
+    sweep_interval=constants.CACHE_SWEEP_INTERVAL_SECONDS,
+)
+
 
 def _cache_get(key: str):
     """Return a cached value if it exists and has not expired, else *None*."""
-    entry = _CACHE.get(key)
-    if entry and (_time.monotonic() - entry["t"]) < entry.get("ttl", _CACHE_TTL_SECONDS):
-        return entry["v"]
-    _CACHE.pop(key, None)
-    return None
+    return _CACHE.get(key)
+
 
+def _cache_set(key: str, value, ttl: int = _CACHE_TTL_SECONDS, tags: Iterable[str] = ()):
+    """Store *value* in the cache under *key* with an optional TTL (seconds).
 
-def _cache_set(key: str, value, ttl: int = _CACHE_TTL_SECONDS):
-    """Store *value* in the cache under *key* with an optional TTL (seconds)."""
-    _CACHE[key] = {"v": value, "t": _time.monotonic(), "ttl": ttl}
+    *tags* replace any tags the key had before; see :func:`_cache_invalidate_tags`.
+    """
+    _CACHE.set(key, value, ttl, tags)
 
 
 def _cache_delete(key: str) -> None:
@@ -32,14 +247,24 @@ def _cache_delete(key: str) -> None:
 
 def _cache_delete_prefix(prefix: str) -> int:
     """Remove all cache entries whose key starts with *prefix*. Returns count removed."""
-    to_remove = [k for k in _CACHE if k.startswith(prefix)]
-    for k in to_remove:
-        _CACHE.pop(k, None)
-    return len(to_remove)
+    return _CACHE.delete_prefix(prefix)
+
+
+def _cache_delete_namespace(namespace: str) -> int:
+    """Remove every entry whose key starts with ``<namespace>:``. Returns count removed."""
+    return _CACHE.delete_namespace(namespace)
+
+
+def _cache_invalidate_tags(*tags: str) -> int:
+    """Remove every entry stored with any of *tags*. Returns count removed."""
+    return _CACHE.invalidate_tags(tags)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Return per-namespace ``hits``/``misses``/``evictions``/``expired`` counters and ``size``."""
+    return _CACHE.stats()
 
 
 def clear_all_caches() -> int:
     """Remove every entry from the in-process cache. Returns count removed."""
-    count = len(_CACHE)
-    _CACHE.clear()
-    return count
+    return _CACHE.clear()
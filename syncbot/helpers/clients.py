@@ -0,0 +1,115 @@
+"""Per-workspace registry of decrypted bot tokens and Slack clients.
+
+Every synced message, edit, delete and reaction needs the bot token and a
+:class:`~slack_sdk.web.WebClient` for each target workspace.  Decrypting the
+token (Fernet) and building a client per target per event is repeated work,
+so the registry keeps one entry per ``Workspace.id``: the decrypted token and
+a long-lived client.  Entries are keyed by the stored ciphertext as well, so a
+token rotated by another process is picked up on the next lookup; token
+changes in this process call :func:`invalidate_workspace_client`.
+
+``slack_sdk``'s default transport opens a new HTTPS connection per API call,
+and without an explicit :class:`ssl.SSLContext` it also builds a fresh
+context (loading the CA bundle) per call.  All registry clients share one
+SSL context so that cost is paid once per process.
+"""
+
+import logging
+import ssl
+import threading
+from dataclasses import dataclass
+
+from slack_sdk.web import WebClient
+
+from db import schemas
+from helpers.encryption import decrypt_bot_token
+
+_logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_ssl_context: ssl.SSLContext | None = None
+
+
+@dataclass
+class _WorkspaceClient:
+    ciphertext: str
+    token: str
+    team_id: str | None
+    client: WebClient
+
+
+_REGISTRY: dict[int, _WorkspaceClient] = {}
+_BY_TOKEN: dict[str, _WorkspaceClient] = {}
+
+
+def _shared_ssl_context() -> ssl.SSLContext:
+    global _ssl_context
+    if _ssl_context is None:
+        _ssl_context = ssl.create_default_context()
+    return _ssl_context
+
+
+def _new_client(token: str) -> WebClient:
+    return WebClient(token=token, ssl=_shared_ssl_context())
+
+
+def _entry(workspace: schemas.Workspace) -> _WorkspaceClient:
+    ciphertext = workspace.bot_token
+    with _lock:
+        entry = _REGISTRY.get(workspace.id)
+        if entry is not None and entry.ciphertext == ciphertext:
+            return entry
+
+    token = decrypt_bot_token(ciphertext)
+    fresh = _WorkspaceClient(
+        ciphertext=ciphertext,
+        token=token,
+        team_id=workspace.team_id,
+        client=_new_client(token),
+    )
+    with _lock:
+        stale = _REGISTRY.get(workspace.id)
+        if stale is not None:
+            _BY_TOKEN.pop(stale.token, None)
+        _REGISTRY[workspace.id] = fresh
+        _BY_TOKEN[token] = fresh
+    return fresh
+
+
+def get_bot_token(workspace: schemas.Workspace) -> str:
+    """Return the decrypted bot token for *workspace*, decrypting at most once per stored ciphertext."""
+    return _entry(workspace).token
+
+
+def get_workspace_client(workspace: schemas.Workspace) -> WebClient:
+    """Return the shared :class:`WebClient` for *workspace*'s current bot token."""
+    return _entry(workspace).client
+
+
+def client_for_token(bot_token: str) -> WebClient:
+    """Return the registry client for a plaintext *bot_token*, or a new client if it is not registered."""
+    with _lock:
+        entry = _BY_TOKEN.get(bot_token)
+    return entry.client if entry is not None else _new_client(bot_token)
+
+
+def team_id_for_token(bot_token: str) -> str | None:
+    """Return the Slack team ID of the registered workspace using *bot_token*, if any."""
+    with _lock:
+        entry = _BY_TOKEN.get(bot_token)
+    return entry.team_id if entry is not None else None
+
+
+def invalidate_workspace_client(workspace_id: int) -> None:
+    """Forget the cached token and client for a workspace (token refreshed or revoked)."""
+    with _lock:
+        entry = _REGISTRY.pop(workspace_id, None)
+        if entry is not None:
+            _BY_TOKEN.pop(entry.token, None)
+
+
+def clear_workspace_clients() -> None:
+    """Forget every cached token and client."""
+    with _lock:
+        _REGISTRY.clear()
+        _BY_TOKEN.clear()
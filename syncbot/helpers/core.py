@@ -39,6 +39,7 @@ def is_user_authorized(client, user_id: str) -> bool:
     When ``REQUIRE_ADMIN`` is ``"true"`` (the default), only workspace
     admins and owners are authorized.
     """
+    from .rate_limit import RateLimitExceeded
     from .slack_api import _users_info
 
     require_admin = os.environ.get(constants.REQUIRE_ADMIN, "true").lower()
@@ -47,7 +48,7 @@ def is_user_authorized(client, user_id: str) -> bool:
 
     try:
         res = _users_info(client, user_id)
-    except SlackApiError:
+    except (SlackApiError, RateLimitExceeded):
         _logger.warning(f"Could not verify admin status for user {user_id} — denying access")
         return False
 
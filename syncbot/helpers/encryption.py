@@ -3,38 +3,134 @@
 The TOKEN_ENCRYPTION_KEY env var is stretched to a 32-byte key using
 PBKDF2-HMAC-SHA256 with 600,000 iterations.  The derived Fernet instance
 is cached so the expensive KDF runs at most once per key per process.
+
+That is still once per cold start (hundreds of milliseconds on a small
+Lambda), so the derived key can be supplied up front:
+TOKEN_ENCRYPTION_DERIVED_KEY holds the output of ``python -m db.derive_token_key``
+(a fingerprint of the passphrase and the derived key).  It is used instead of
+the KDF when its fingerprint matches the current TOKEN_ENCRYPTION_KEY;
+otherwise a warning is logged and the key is derived as before.
+
+Ciphertexts are written as ``v2:<key id>:<Fernet token>``, where the key id
+names the derived key that encrypted them.  Decryption looks the key up by
+id among the current key and the passphrases in TOKEN_ENCRYPTION_KEY_PREVIOUS
+(comma-separated, derived only when a row needs them), so after a key
+rotation existing rows keep working until they are rewritten.  Bare Fernet
+tokens written before the envelope are tried against each key in turn.
+:func:`rotate_token` rewrites a stored value under the current key; the
+``python -m db.reencrypt_tokens`` command applies it to every stored token.
 """
 
 import base64
 import functools
+import hashlib
 import logging
 import os
+import time
+from collections.abc import Iterator
 
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
 import constants
+from logger import emit_metric
 
 _logger = logging.getLogger(__name__)
 
 _PBKDF2_ITERATIONS = 600_000
 _PBKDF2_SALT_PREFIX = b"syncbot-fernet-v1"
+_ENVELOPE_PREFIX = "v2:"
+# Stored before encryption was enabled: Slack tokens and PEM private keys.
+_PLAINTEXT_PREFIXES = ("xox", "-----BEGIN")
 
 
-@functools.lru_cache(maxsize=2)
-def _get_fernet(key: str) -> Fernet:
-    """Derive a Fernet cipher from an arbitrary passphrase via PBKDF2."""
+def derive_key(passphrase: str) -> bytes:
+    """Run PBKDF2 on *passphrase* and return the urlsafe-base64 Fernet key (slow)."""
     from cryptography.hazmat.primitives import hashes
     from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-    salt = _PBKDF2_SALT_PREFIX + key.encode()[:16]
+    salt = _PBKDF2_SALT_PREFIX + passphrase.encode()[:16]
     kdf = PBKDF2HMAC(
         algorithm=hashes.SHA256(),
         length=32,
         salt=salt,
         iterations=_PBKDF2_ITERATIONS,
     )
-    derived = kdf.derive(key.encode())
-    return Fernet(base64.urlsafe_b64encode(derived))
+    return base64.urlsafe_b64encode(kdf.derive(passphrase.encode()))
+
+
+def _key_id(fernet_key: bytes) -> str:
+    return hashlib.sha256(fernet_key).hexdigest()[:8]
+
+
+def _passphrase_fingerprint(passphrase: str) -> str:
+    return hashlib.sha256(passphrase.encode()).hexdigest()[:8]
+
+
+def format_derived_key(passphrase: str) -> str:
+    """Return the TOKEN_ENCRYPTION_DERIVED_KEY value for *passphrase* (runs the KDF)."""
+    return f"{_passphrase_fingerprint(passphrase)}:{derive_key(passphrase).decode()}"
+
+
+@functools.lru_cache(maxsize=8)
+def _derived(passphrase: str) -> tuple[str, Fernet]:
+    """Derive ``(key id, Fernet)`` for *passphrase* via PBKDF2, once per passphrase per process."""
+    started = time.perf_counter()
+    key = derive_key(passphrase)
+    emit_metric("token_key_derivation", round((time.perf_counter() - started) * 1000, 1), unit="Milliseconds")
+    return _key_id(key), Fernet(key)
+
+
+@functools.lru_cache(maxsize=8)
+def _pre_derived(passphrase: str, value: str) -> tuple[str, Fernet] | None:
+    """Parse a TOKEN_ENCRYPTION_DERIVED_KEY *value*; *None* if it does not belong to *passphrase*."""
+    fingerprint, _, key = value.partition(":")
+    if fingerprint != _passphrase_fingerprint(passphrase):
+        _logger.warning("token_encryption_derived_key_mismatch")
+        return None
+    try:
+        fernet = Fernet(key.encode())
+    except ValueError:
+        _logger.warning("token_encryption_derived_key_invalid")
+        return None
+    return _key_id(key.encode()), fernet
+
+
+def _current_key() -> tuple[str, Fernet]:
+    passphrase = os.environ[constants.TOKEN_ENCRYPTION_KEY]
+    pre_derived = os.environ.get(constants.TOKEN_ENCRYPTION_DERIVED_KEY, "").strip()
+    if pre_derived:
+        key = _pre_derived(passphrase, pre_derived)
+        if key is not None:
+            return key
+    return _derived(passphrase)
+
+
+def _keys() -> Iterator[tuple[str, Fernet]]:
+    """Yield the current key, then each previous key (derived on demand)."""
+    yield _current_key()
+    previous = os.environ.get(constants.TOKEN_ENCRYPTION_KEY_PREVIOUS, "")
+    for passphrase in previous.split(","):
+        if passphrase.strip():
+            yield _derived(passphrase.strip())
+
+
+def _envelope(kid: str, token: bytes) -> str:
+    return f"{_ENVELOPE_PREFIX}{kid}:{token.decode()}"
+
+
+def _decrypt(value: str) -> bytes:
+    if value.startswith(_ENVELOPE_PREFIX):
+        kid, _, token = value[len(_ENVELOPE_PREFIX) :].partition(":")
+        for key_id, fernet in _keys():
+            if key_id == kid:
+                return fernet.decrypt(token.encode())
+        raise InvalidToken
+    for _, fernet in _keys():
+        try:
+            return fernet.decrypt(value.encode())
+        except InvalidToken:
+            continue
+    raise InvalidToken
 
 
 def _encryption_enabled() -> bool:
@@ -47,8 +143,36 @@ def encrypt_bot_token(token: str) -> str:
     """Encrypt a bot token before storing it in the database."""
     if not _encryption_enabled():
         return token
-    key = os.environ[constants.TOKEN_ENCRYPTION_KEY]
-    return _get_fernet(key).encrypt(token.encode()).decode()
+    kid, fernet = _current_key()
+    return _envelope(kid, fernet.encrypt(token.encode()))
+
+
+def rotate_token(value: str) -> str | None:
+    """Return stored *value* re-encrypted under the current key, or *None* if it already is.
+
+    Old tokens are decrypted with the key named in their envelope (any key
+    for bare Fernet tokens) and re-encrypted with :class:`MultiFernet`, which
+    keeps their original timestamp.  Plaintext Slack tokens and PEM keys, stored
+    before encryption was enabled, are encrypted.  Raises ``ValueError`` if
+    encryption is disabled or no configured key decrypts *value*.
+    """
+    if not _encryption_enabled():
+        raise ValueError(f"{constants.TOKEN_ENCRYPTION_KEY} is not set; token encryption is disabled")
+    kid, current = _current_key()
+    if value.startswith(_PLAINTEXT_PREFIXES):
+        return _envelope(kid, current.encrypt(value.encode()))
+    if value.startswith(f"{_ENVELOPE_PREFIX}{kid}:"):
+        return None
+    token = value
+    if value.startswith(_ENVELOPE_PREFIX):
+        old_kid, _, token = value[len(_ENVELOPE_PREFIX) :].partition(":")
+        old_keys = [fernet for key_id, fernet in _keys() if key_id == old_kid]
+    else:
+        old_keys = [fernet for _, fernet in _keys()]
+    try:
+        return _envelope(kid, MultiFernet([current, *old_keys]).rotate(token.encode()))
+    except InvalidToken:
+        raise ValueError("no configured key decrypts the stored value") from None
 
 
 def decrypt_bot_token(encrypted: str) -> str:
@@ -58,14 +182,14 @@ def decrypt_bot_token(encrypted: str) -> str:
     """
     if not _encryption_enabled():
         return encrypted
-    key = os.environ[constants.TOKEN_ENCRYPTION_KEY]
     try:
-        return _get_fernet(key).decrypt(encrypted.encode()).decode()
+        return _decrypt(encrypted).decode()
     except InvalidToken:
         _logger.error(
             "Bot token decryption failed — refusing to use the token. "
-            "If you recently enabled encryption, run "
-            "db/migrate_002_encrypt_tokens.py to encrypt existing tokens."
+            "The token may be plaintext (run python -m db.reencrypt_tokens to encrypt stored tokens), "
+            "or encrypted with a key that is neither TOKEN_ENCRYPTION_KEY nor listed in "
+            "TOKEN_ENCRYPTION_KEY_PREVIOUS."
         )
         raise ValueError(
             "Bot token decryption failed. The token may be plaintext (not yet migrated) or tampered with."
@@ -236,6 +236,9 @@ def restore_full_backup(
             DbManager.merge_record(rec)
             if table_name == "workspaces" and rec.team_id:
                 team_ids.append(rec.team_id)
+    from helpers._cache import _cache_delete_namespace
+    _cache_delete_namespace("user_name_index")
+    _cache_delete_namespace("federation_peer")
     return team_ids
 
 
@@ -244,16 +247,17 @@ def restore_full_backup(
 # ---------------------------------------------------------------------------
 
 def invalidate_home_tab_caches_for_team(team_id: str) -> None:
-    """Clear home_tab_hash and home_tab_blocks for a team so next Refresh does full rebuild."""
-    from helpers._cache import _cache_delete_prefix
-    _cache_delete_prefix(f"home_tab_hash:{team_id}")
-    _cache_delete_prefix(f"home_tab_blocks:{team_id}")
+    """Clear cached Home tab hash and blocks for a team so next Refresh does full rebuild."""
+    from helpers._cache import _cache_invalidate_tags
+    from helpers.refresh import home_tab_cache_tag
+    _cache_invalidate_tags(home_tab_cache_tag(team_id))
 
 
 def invalidate_home_tab_caches_for_all_teams(team_ids: list[str]) -> None:
     """Clear home tab caches for each team_id (e.g. after full restore)."""
-    for tid in team_ids:
-        invalidate_home_tab_caches_for_team(tid)
+    from helpers._cache import _cache_invalidate_tags
+    from helpers.refresh import home_tab_cache_tag
+    _cache_invalidate_tags(*(home_tab_cache_tag(tid) for tid in team_ids))
 
 
 def invalidate_sync_list_cache_for_channel(channel_id: str) -> None:
@@ -546,6 +550,8 @@ def import_migration_data(
             normalized_name=u.get("normalized_name"),
             updated_at=datetime.fromisoformat(u["updated_at"].replace("Z", "+00:00")) if u.get("updated_at") else datetime.now(UTC),
         ))
+    from helpers.user_matching import invalidate_user_name_index
+    invalidate_user_name_index(workspace_id)
 
     # user_mappings where both source and target workspace exist on B
     for um in user_mappings_export:
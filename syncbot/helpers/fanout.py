@@ -0,0 +1,74 @@
+"""Bounded concurrent fan-out for per-target sync work.
+
+A synced message is delivered to every channel in its sync.  Each target
+costs a token decrypt, mention resolution and one or more Slack API calls,
+so processing targets one after another makes total latency grow linearly
+with the number of workspaces.  :func:`fan_out` runs the per-target work on
+a small thread pool (bounded by :data:`constants.SYNC_FANOUT_MAX_WORKERS`)
+and returns results in input order so callers can aggregate them exactly as
+they would for a sequential loop.
+
+Worker threads do not share the caller's request-scoped DB session, so each
+running task may hold its own pooled connection.  To keep that bounded when
+several requests fan out at once (container mode serves
+:data:`constants.HTTP_SERVER_WORKERS` requests concurrently), at most
+:data:`constants.SYNC_FANOUT_MAX_WORKERS` tasks run on worker threads across
+the whole process; the DB pool is sized for that (see :func:`db.get_engine`).
+A fan-out started from inside a fan-out task runs inline.
+"""
+
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import constants
+
+_logger = logging.getLogger(__name__)
+
+# Process-wide cap on fan-out tasks running on worker threads.
+_SLOTS = threading.BoundedSemaphore(constants.SYNC_FANOUT_MAX_WORKERS)
+_worker = threading.local()
+
+
+def _call(fn: Callable[[Any], Any], item: Any) -> tuple[Any, Exception | None]:
+    try:
+        return fn(item), None
+    except Exception as exc:
+        return None, exc
+
+
+def _call_in_slot(fn: Callable[[Any], Any], item: Any) -> tuple[Any, Exception | None]:
+    with _SLOTS:
+        _worker.active = True
+        try:
+            return _call(fn, item)
+        finally:
+            _worker.active = False
+
+
+def fan_out(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int | None = None,
+) -> list[tuple[Any, Any, Exception | None]]:
+    """Apply *fn* to every item, in parallel, and return ``(item, result, error)`` tuples.
+
+    Results keep the order of *items*.  An exception raised by *fn* is
+    captured in the ``error`` slot instead of aborting the other targets.
+    With a single item, ``max_workers <= 1``, or when called from a fan-out
+    task, the work runs inline on the calling thread.
+    """
+    items = list(items)
+    workers = min(max_workers or constants.SYNC_FANOUT_MAX_WORKERS, len(items))
+    if getattr(_worker, "active", False):
+        workers = 1
+
+    if workers <= 1:
+        outcomes = [_call(fn, item) for item in items]
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="syncbot-fanout") as pool:
+            outcomes = list(pool.map(lambda item: _call_in_slot(fn, item), items))
+
+    return [(item, result, error) for item, (result, error) in zip(items, outcomes)]
@@ -8,9 +8,11 @@ import time as _time
 import uuid
 from logging import Logger
 
-import requests
 from slack_sdk import WebClient
 
+from helpers.clients import client_for_token
+from helpers.rate_limit import RateLimitExceeded, throttle
+
 _logger = logging.getLogger(__name__)
 
 _DOWNLOAD_TIMEOUT = 30  # seconds
@@ -44,6 +46,8 @@ def _download_to_file(url: str, file_path: str, headers: dict | None = None) ->
 
     Removes the partial file on any failure so /tmp doesn't fill up.
     """
+    import requests
+
     try:
         with requests.get(url, headers=headers, timeout=_DOWNLOAD_TIMEOUT, stream=True) as r:
             r.raise_for_status()
@@ -62,6 +66,8 @@ def _download_to_file(url: str, file_path: str, headers: dict | None = None) ->
 
 def download_public_file(url: str, logger: Logger) -> dict | None:
     """Download a file from a public URL (e.g. GIPHY) to /tmp."""
+    import requests
+
     try:
         content_type = "image/gif"
         file_name = f"attachment_{uuid.uuid4().hex[:8]}.gif"
@@ -123,11 +129,16 @@ def upload_files_to_slack(
     initial_comment: str | None = None,
     thread_ts: str | None = None,
 ) -> tuple[dict | None, str | None]:
-    """Upload one or more local files directly to a Slack channel."""
+    """Upload one or more local files directly to a Slack channel.
+
+    Upload failures, including a throttled upload
+    (:class:`~helpers.rate_limit.RateLimitExceeded`), are logged and return
+    ``(None, None)`` so the caller still records any text it already posted.
+    """
     if not files:
         return None, None
 
-    slack_client = WebClient(bot_token)
+    slack_client = client_for_token(bot_token)
     file_uploads = []
     for f in files:
         file_uploads.append({
@@ -142,6 +153,7 @@ def upload_files_to_slack(
         kwargs["thread_ts"] = thread_ts
 
     try:
+        throttle(bot_token, "files.upload_v2")
         if len(file_uploads) == 1:
             kwargs["file"] = file_uploads[0]["file"]
             kwargs["filename"] = file_uploads[0]["filename"]
@@ -152,6 +164,9 @@ def upload_files_to_slack(
 
         msg_ts = _extract_file_message_ts(slack_client, res, channel_id, thread_ts=thread_ts)
         return res, msg_ts
+    except RateLimitExceeded as e:
+        _logger.warning("upload_files_to_slack_throttled", extra={"channel_id": channel_id, "error": str(e)})
+        return None, None
     except Exception as e:
         _logger.warning(f"upload_files_to_slack: failed for channel {channel_id}: {e}")
         return None, None
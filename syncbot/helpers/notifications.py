@@ -9,8 +9,8 @@ from sqlalchemy.exc import ProgrammingError
 import constants
 from db import DbManager, schemas
 from helpers._cache import _cache_get, _cache_set
+from helpers.clients import get_workspace_client
 from helpers.core import safe_get
-from helpers.encryption import decrypt_bot_token
 
 _logger = logging.getLogger(__name__)
 
@@ -208,7 +208,7 @@ def purge_stale_soft_deletes() -> int:
                     continue
                 notified_ws.add(member.workspace_id)
                 try:
-                    member_client = WebClient(token=decrypt_bot_token(member_ws.bot_token))
+                    member_client = get_workspace_client(member_ws)
                     notify_admins_dm(
                         member_client,
                         f":wastebasket: *{ws_name}* has been permanently removed "
@@ -217,6 +217,7 @@ def purge_stale_soft_deletes() -> int:
                 except Exception as e:
                     _logger.warning(f"purge: failed to notify member {member.workspace_id}: {e}")
 
+        DbManager.delete_records(schemas.UserDirectorySync, [schemas.UserDirectorySync.workspace_id == ws.id])
         DbManager.delete_records(schemas.Workspace, [schemas.Workspace.id == ws.id])
         purged += 1
 
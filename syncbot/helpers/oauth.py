@@ -3,15 +3,19 @@
 Bot scopes: :envvar:`SLACK_BOT_SCOPES` (``slack_manifest_scopes.BOT_SCOPES`` / manifest bot).
 User scopes: :envvar:`SLACK_USER_SCOPES` (defaults to ``USER_SCOPES`` when unset).
 Requesting user scopes that do not match the Slack app manifest causes ``invalid_scope`` on install.
+
+The SQLAlchemy installation and state stores (and their SQLAlchemy table
+definitions) are built on first use, not when the app starts.
 """
 
+import functools
 import logging
 import os
 
 from slack_bolt.oauth import OAuthFlow
 from slack_bolt.oauth.oauth_settings import OAuthSettings
-from slack_sdk.oauth.installation_store.sqlalchemy import SQLAlchemyInstallationStore
-from slack_sdk.oauth.state_store.sqlalchemy import SQLAlchemyOAuthStateStore
+from slack_sdk.oauth.installation_store import InstallationStore
+from slack_sdk.oauth.state_store import OAuthStateStore
 
 import constants
 from slack_manifest_scopes import USER_SCOPES
@@ -21,6 +25,68 @@ _logger = logging.getLogger(__name__)
 _OAUTH_STATE_EXPIRATION_SECONDS = 600
 
 
+class _LazyInstallationStore(InstallationStore):
+    """:class:`SQLAlchemyInstallationStore` on the app engine, created on first use."""
+
+    def __init__(self, client_id: str):
+        self._client_id = client_id
+
+    @functools.cached_property
+    def _store(self) -> InstallationStore:
+        from slack_sdk.oauth.installation_store.sqlalchemy import SQLAlchemyInstallationStore
+
+        from db import get_engine
+
+        return SQLAlchemyInstallationStore(client_id=self._client_id, engine=get_engine())
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self._store.logger
+
+    def save(self, installation):
+        return self._store.save(installation)
+
+    def save_bot(self, bot):
+        return self._store.save_bot(bot)
+
+    def find_bot(self, **kwargs):
+        return self._store.find_bot(**kwargs)
+
+    def find_installation(self, **kwargs):
+        return self._store.find_installation(**kwargs)
+
+    def delete_bot(self, **kwargs):
+        return self._store.delete_bot(**kwargs)
+
+    def delete_installation(self, **kwargs):
+        return self._store.delete_installation(**kwargs)
+
+    def delete_all(self, **kwargs):
+        return self._store.delete_all(**kwargs)
+
+
+class _LazyOAuthStateStore(OAuthStateStore):
+    """:class:`SQLAlchemyOAuthStateStore` on the app engine, created on first use (install flow only)."""
+
+    @functools.cached_property
+    def _store(self) -> OAuthStateStore:
+        from slack_sdk.oauth.state_store.sqlalchemy import SQLAlchemyOAuthStateStore
+
+        from db import get_engine
+
+        return SQLAlchemyOAuthStateStore(expiration_seconds=_OAUTH_STATE_EXPIRATION_SECONDS, engine=get_engine())
+
+    @property
+    def logger(self) -> logging.Logger:
+        return self._store.logger
+
+    def issue(self, *args, **kwargs) -> str:
+        return self._store.issue(*args, **kwargs)
+
+    def consume(self, state: str) -> bool:
+        return self._store.consume(state)
+
+
 def get_oauth_flow():
     """Build the Slack OAuth flow using SQLAlchemy-backed stores.
 
@@ -37,18 +103,6 @@ def get_oauth_flow():
         _logger.info("OAuth credentials not set — running in single-workspace mode")
         return None
 
-    from db import get_engine
-
-    engine = get_engine()
-    installation_store = SQLAlchemyInstallationStore(
-        client_id=client_id,
-        engine=engine,
-    )
-    state_store = SQLAlchemyOAuthStateStore(
-        expiration_seconds=_OAUTH_STATE_EXPIRATION_SECONDS,
-        engine=engine,
-    )
-
     bot_scopes = [s.strip() for s in scopes_raw.split(",") if s.strip()]
     user_scopes = (
         [s.strip() for s in user_scopes_raw.split(",") if s.strip()]
@@ -62,7 +116,7 @@ def get_oauth_flow():
             client_secret=client_secret,
             scopes=bot_scopes,
             user_scopes=user_scopes,
-            installation_store=installation_store,
-            state_store=state_store,
+            installation_store=_LazyInstallationStore(client_id),
+            state_store=_LazyOAuthStateStore(),
         ),
     )
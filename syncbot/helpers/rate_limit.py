@@ -0,0 +1,138 @@
+"""Proactive Slack rate limiting with per-workspace token buckets.
+
+:func:`~helpers.slack_api.slack_retry` only reacts after Slack answers
+``429``, by sleeping for ``Retry-After`` on the request thread.  During a
+busy fan-out that can use up the whole Lambda budget.  :func:`throttle` shapes
+calls *before* they are sent instead.  Each ``(team, method)`` pair gets a
+token bucket sized to Slack's published tier for that method;
+``chat.postMessage`` is limited per channel.  A call waits for a token when
+the bucket is empty, and is rejected with :class:`RateLimitExceeded` when
+the wait would exceed :data:`constants.SLACK_RATE_LIMIT_MAX_WAIT_SECONDS`.
+
+Metrics: ``slack_rate_limit_wait`` (milliseconds waited) and
+``slack_rate_limit_rejected`` (count), with ``team_id`` and ``method``
+dimensions.
+"""
+
+import hashlib
+import threading
+import time as _time
+
+import constants
+from helpers.clients import team_id_for_token
+from logger import emit_metric
+
+# Slack Web API tiers, in calls per minute (https://api.slack.com/apis/rate-limits).
+_TIER_PER_MINUTE = {1: 1, 2: 20, 3: 50, 4: 100}
+
+_METHOD_TIERS = {
+    "chat.delete": 3,
+    "chat.update": 3,
+    "files.upload_v2": 4,
+    "users.info": 4,
+    "users.list": 2,
+    "users.lookupByEmail": 3,
+}
+
+# chat.postMessage: about one message per second per channel, short bursts allowed.
+_POST_MESSAGE_RATE = 1.0
+_POST_MESSAGE_BURST = 3
+
+# Idle buckets are dropped once this many exist (they refill to full anyway).
+_MAX_BUCKETS = 10_000
+_BUCKET_IDLE_SECONDS = 120
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a Slack call would have to wait longer than the configured maximum."""
+
+    def __init__(self, method: str, team_id: str, wait_seconds: float):
+        super().__init__(f"{method} for {team_id} rate-limited locally; would wait {wait_seconds:.1f}s")
+        self.method = method
+        self.team_id = team_id
+        self.wait_seconds = wait_seconds
+
+
+class _TokenBucket:
+    """Token bucket that lets callers reserve a future token (tokens may go negative)."""
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """Take one token and return how long the caller must wait before using it."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def cancel(self) -> None:
+        self.tokens += 1
+
+
+_lock = threading.Lock()
+_buckets: dict[tuple[str, str, str], _TokenBucket] = {}
+
+
+def _limits(method: str) -> tuple[float, float]:
+    """Return ``(tokens per second, burst capacity)`` for *method*."""
+    if method == "chat.postMessage":
+        return _POST_MESSAGE_RATE, _POST_MESSAGE_BURST
+    per_minute = _TIER_PER_MINUTE[_METHOD_TIERS.get(method, 3)]
+    return per_minute / 60.0, per_minute
+
+
+def _team_key(bot_token: str) -> str:
+    team_id = team_id_for_token(bot_token)
+    if team_id:
+        return team_id
+    return "token:" + hashlib.sha256(str(bot_token).encode()).hexdigest()[:12]
+
+
+def _prune(now: float) -> None:
+    idle = [k for k, b in _buckets.items() if now - b.updated > _BUCKET_IDLE_SECONDS]
+    for k in idle:
+        del _buckets[k]
+
+
+def throttle(bot_token: str, method: str, channel_id: str | None = None) -> float:
+    """Wait until *method* may be called for the workspace owning *bot_token*.
+
+    Returns the number of seconds waited.  Raises :class:`RateLimitExceeded`
+    without consuming a token when the wait would exceed
+    :data:`constants.SLACK_RATE_LIMIT_MAX_WAIT_SECONDS`.
+    """
+    team = _team_key(bot_token)
+    scope = (channel_id or "") if method == "chat.postMessage" else ""
+    key = (team, method, scope)
+    now = _time.monotonic()
+
+    with _lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            if len(_buckets) >= _MAX_BUCKETS:
+                _prune(now)
+            bucket = _buckets[key] = _TokenBucket(*_limits(method), now)
+        wait = bucket.reserve(now)
+        if wait > constants.SLACK_RATE_LIMIT_MAX_WAIT_SECONDS:
+            bucket.cancel()
+            rejected = True
+        else:
+            rejected = False
+
+    if rejected:
+        emit_metric("slack_rate_limit_rejected", team_id=team, method=method)
+        raise RateLimitExceeded(method, team, wait)
+    if wait > 0:
+        emit_metric("slack_rate_limit_wait", round(wait * 1000, 1), unit="Milliseconds", team_id=team, method=method)
+        _time.sleep(wait)
+    return wait
+
+
+def reset_rate_limits() -> None:
+    """Forget all bucket state."""
+    with _lock:
+        _buckets.clear()
@@ -5,6 +5,7 @@ and the hash/cache/cooldown check so both handlers stay DRY.
 """
 
 import time
+from collections.abc import Iterable
 from typing import Literal
 
 import constants
@@ -13,6 +14,16 @@ from helpers._cache import _cache_get, _cache_set
 _REFRESH_COOLDOWN_SECONDS = getattr(constants, "REFRESH_COOLDOWN_SECONDS", 60)
 
 
+def home_tab_cache_tag(team_id: str) -> str:
+    """Cache tag for a team's cached Home tab hash, blocks and refresh timestamps."""
+    return f"home_tab:{team_id}"
+
+
+def user_mapping_cache_tag(team_id: str) -> str:
+    """Cache tag for a team's cached User Mapping screen hash, blocks and refresh timestamps."""
+    return f"user_mapping:{team_id}"
+
+
 def cooldown_message_block(remaining_seconds: int) -> dict:
     """Return a Block Kit context block dict for the refresh cooldown message."""
     text = (
@@ -88,10 +99,15 @@ def refresh_after_full(
     current_hash: str,
     block_dicts: list,
     cooldown_seconds: int | None = None,
+    tags: Iterable[str] = (),
 ) -> None:
-    """Store hash, blocks, and refresh timestamp after a full refresh."""
+    """Store hash, blocks, and refresh timestamp after a full refresh.
+
+    *tags* are attached to all three entries so they can be dropped together
+    with :func:`~helpers._cache._cache_invalidate_tags`.
+    """
     cooldown_sec = cooldown_seconds if cooldown_seconds is not None else _REFRESH_COOLDOWN_SECONDS
 
-    _cache_set(hash_key, current_hash, ttl=3600)
-    _cache_set(blocks_key, block_dicts, ttl=3600)
-    _cache_set(refresh_at_key, time.monotonic(), ttl=cooldown_sec * 2)
+    _cache_set(hash_key, current_hash, ttl=3600, tags=tags)
+    _cache_set(blocks_key, block_dicts, ttl=3600, tags=tags)
+    _cache_set(refresh_at_key, time.monotonic(), ttl=cooldown_sec * 2, tags=tags)
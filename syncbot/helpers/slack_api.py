@@ -7,10 +7,14 @@ from functools import wraps
 
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
 
 from db import DbManager, schemas
 from helpers._cache import _USER_INFO_CACHE_TTL, _cache_get, _cache_set
+from helpers.clients import client_for_token
 from helpers.core import safe_get
+from helpers.rate_limit import RateLimitExceeded, throttle
 
 _logger = logging.getLogger(__name__)
 
@@ -54,6 +58,7 @@ def slack_retry(fn):
 @slack_retry
 def _users_info(client: WebClient, user_id: str) -> dict:
     """Low-level wrapper so the retry decorator can catch SlackApiError."""
+    throttle(client.token, "users.info")
     return client.users_info(user=user_id)
 
 
@@ -106,7 +111,7 @@ def get_user_info(client: WebClient, user_id: str) -> tuple[str | None, str | No
 
     try:
         res = _users_info(client, user_id)
-    except SlackApiError as exc:
+    except (SlackApiError, RateLimitExceeded) as exc:
         _logger.debug(f"get_user_info: failed to look up user {user_id}: {exc}")
         return None, None
 
@@ -133,7 +138,7 @@ def post_message(
     blocks: list[dict] | None = None,
 ) -> dict:
     """Post or update a message in a Slack channel."""
-    slack_client = WebClient(bot_token)
+    slack_client = client_for_token(bot_token)
     posted_from = f"({workspace_name})" if workspace_name else "(via SyncBot)"
     if blocks:
         if msg_text.strip():
@@ -145,6 +150,7 @@ def post_message(
         all_blocks = []
     fallback_text = msg_text if msg_text.strip() else "Shared an image"
     if update_ts:
+        throttle(bot_token, "chat.update")
         res = slack_client.chat_update(
             channel=channel_id,
             text=fallback_text,
@@ -152,6 +158,7 @@ def post_message(
             blocks=all_blocks,
         )
     else:
+        throttle(bot_token, "chat.postMessage", channel_id)
         res = slack_client.chat_postMessage(
             channel=channel_id,
             text=fallback_text,
@@ -164,23 +171,27 @@ def post_message(
 
 
 def get_post_records(thread_ts: str) -> list[tuple[schemas.PostMeta, schemas.SyncChannel, schemas.Workspace]]:
-    """Look up all PostMeta records that share the same ``post_id``."""
-    post = DbManager.find_records(schemas.PostMeta, [schemas.PostMeta.ts == float(thread_ts)])
-    if post:
-        post_records = DbManager.find_join_records3(
-            left_cls=schemas.PostMeta,
-            right_cls1=schemas.SyncChannel,
-            right_cls2=schemas.Workspace,
-            filters=[
-                schemas.PostMeta.post_id == post[0].post_id,
-                schemas.SyncChannel.status == "active",
-                schemas.SyncChannel.deleted_at.is_(None),
-            ],
-        )
-    else:
-        post_records = []
-
-    post_records.sort(key=lambda row: row[0].id)
+    """Look up all PostMeta records that share the same ``post_id`` as the message at *thread_ts*.
+
+    The ts → ``post_id`` resolution runs as a scalar subquery so the whole
+    lookup is a single round trip; rows come back ordered by ``PostMeta.id``
+    so the primary (text) row of a split text+file post wins deduplication.
+    """
+    anchor = aliased(schemas.PostMeta)
+    anchor_post_id = (
+        select(anchor.post_id).where(anchor.ts == float(thread_ts)).order_by(anchor.id).limit(1).scalar_subquery()
+    )
+    post_records = DbManager.find_join_records3(
+        left_cls=schemas.PostMeta,
+        right_cls1=schemas.SyncChannel,
+        right_cls2=schemas.Workspace,
+        filters=[
+            schemas.PostMeta.post_id == anchor_post_id,
+            schemas.SyncChannel.status == "active",
+            schemas.SyncChannel.deleted_at.is_(None),
+        ],
+        order_by=schemas.PostMeta.id,
+    )
 
     seen: set[tuple[int, str]] = set()
     deduped: list[tuple[schemas.PostMeta, schemas.SyncChannel, schemas.Workspace]] = []
@@ -195,7 +206,8 @@ def get_post_records(thread_ts: str) -> list[tuple[schemas.PostMeta, schemas.Syn
 @slack_retry
 def delete_message(bot_token: str, channel_id: str, ts: str) -> dict:
     """Delete a message from a Slack channel."""
-    slack_client = WebClient(bot_token)
+    slack_client = client_for_token(bot_token)
+    throttle(bot_token, "chat.delete")
     res = slack_client.chat_delete(
         channel=channel_id,
         ts=ts,
@@ -2,22 +2,29 @@
 
 import logging
 import re
+import time as _time
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
 from typing import Any
 
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
+from sqlalchemy import case
+from sqlalchemy.exc import IntegrityError
 
 import constants
 from db import DbManager, schemas
-from helpers._cache import _CACHE, _USER_INFO_CACHE_TTL, _cache_get, _cache_set
+from helpers._cache import _CACHE, _USER_INFO_CACHE_TTL, _cache_delete, _cache_get, _cache_set
+from helpers.clients import get_workspace_client
 from helpers.core import safe_get
-from helpers.encryption import decrypt_bot_token
+from helpers.fanout import fan_out
+from helpers.rate_limit import RateLimitExceeded, throttle
 from helpers.slack_api import _users_info, get_user_info, slack_retry
 from helpers.workspace import (
     get_workspace_by_id,
     resolve_workspace_name,
 )
+from logger import emit_metric
 
 _logger = logging.getLogger(__name__)
 
@@ -31,7 +38,7 @@ def _get_user_profile(client: WebClient, user_id: str) -> dict[str, Any] | None:
 
     try:
         res = _users_info(client, user_id)
-    except SlackApiError as exc:
+    except (SlackApiError, RateLimitExceeded) as exc:
         _logger.warning(f"Failed to look up user {user_id}: {exc}")
         return None
 
@@ -78,60 +85,293 @@ def _is_mapping_fresh(mapping: schemas.UserMapping) -> bool:
     return age < ttl
 
 
+@dataclass
+class _NameIndex:
+    """Active directory users of one workspace, keyed by lowercased name fields.
+
+    Only users with a ``real_name`` are indexed; both name-match rules require one.
+    """
+
+    by_name_and_real: dict[tuple[str, str], list[str]] = field(default_factory=dict)
+    by_real: dict[str, list[str]] = field(default_factory=dict)
+
+
+def _name_index(workspace_id: int) -> _NameIndex:
+    """Return the name-match index for *workspace_id*, building it from one directory query if needed."""
+    cache_key = f"user_name_index:{workspace_id}"
+    index = _cache_get(cache_key)
+    if index is not None:
+        return index
+
+    index = _NameIndex()
+    entries = DbManager.find_records(
+        schemas.UserDirectory,
+        [
+            schemas.UserDirectory.workspace_id == workspace_id,
+            schemas.UserDirectory.deleted_at.is_(None),
+        ],
+    )
+    for entry in entries:
+        if not entry.real_name:
+            continue
+        real = entry.real_name.lower()
+        index.by_real.setdefault(real, []).append(entry.slack_user_id)
+        if entry.normalized_name:
+            index.by_name_and_real.setdefault((entry.normalized_name.lower(), real), []).append(entry.slack_user_id)
+
+    _cache_set(cache_key, index, ttl=constants.USER_DIR_REFRESH_TTL)
+    return index
+
+
+def invalidate_user_name_index(workspace_id: int) -> None:
+    """Drop the name-match index for *workspace_id* after its user directory changed."""
+    _cache_delete(f"user_name_index:{workspace_id}")
+
+
 @slack_retry
 def _users_list_page(client: WebClient, cursor: str = "") -> dict:
     """Fetch one page of users.list (with retry on rate-limit)."""
+    throttle(client.token, "users.list")
     return client.users_list(limit=200, cursor=cursor)
 
 
-def _refresh_user_directory(client: WebClient, workspace_id: int) -> None:
-    """Crawl users.list for a workspace and upsert into user_directory.
+def _directory_sync_state(workspace_id: int) -> schemas.UserDirectorySync | None:
+    return DbManager.get_record(schemas.UserDirectorySync, workspace_id)
+
+
+def _full_sync_due(state: schemas.UserDirectorySync | None, now: datetime) -> bool:
+    """Return True if a workspace's directory needs a full ``users.list`` crawl.
+
+    Never crawled: due.  Otherwise due once the last crawl is older than
+    :data:`constants.USER_DIR_REFRESH_TTL` and user events arrived after it,
+    or older than :data:`constants.USER_DIR_FULL_SYNC_MAX_AGE_SECONDS`.
+    """
+    if state is None or state.last_full_sync_at is None:
+        return True
+    last_sync = state.last_full_sync_at.replace(tzinfo=UTC)
+    age = (now - last_sync).total_seconds()
+    if age >= constants.USER_DIR_FULL_SYNC_MAX_AGE_SECONDS:
+        return True
+    changed = state.last_event_at is not None and state.last_event_at.replace(tzinfo=UTC) > last_sync
+    return changed and age >= constants.USER_DIR_REFRESH_TTL
+
+
+def _set_directory_watermark(workspace_id: int, field_name: str, at: datetime) -> None:
+    """Upsert one watermark column of a workspace's ``user_directory_sync`` row.
 
-    Active users are upserted normally.  Deactivated users
-    (``member["deleted"] == True``) are soft-deleted via
-    ``_upsert_single_user_to_directory``.  Users that were previously
-    in the directory but no longer appear in ``users.list`` at all are
-    hard-deleted along with their mappings.
+    Concurrent user events (or an event during a crawl) can both find the row
+    missing; the insert that loses the race on the primary key updates instead.
     """
-    cache_key = f"dir_refresh:{workspace_id}"
-    if _cache_get(cache_key):
+    filters = [schemas.UserDirectorySync.workspace_id == workspace_id]
+    values = {getattr(schemas.UserDirectorySync, field_name): at}
+    if DbManager.update_records(schemas.UserDirectorySync, filters, values):
         return
+    try:
+        DbManager.create_record(schemas.UserDirectorySync(workspace_id=workspace_id, **{field_name: at}))
+    except IntegrityError:
+        DbManager.update_records(schemas.UserDirectorySync, filters, values)
+
+
+def _refresh_user_directory(client: WebClient, workspace_id: int, force: bool = False) -> bool:
+    """Crawl users.list for a workspace and sync it into user_directory.
+
+    Skipped (returns False) unless *force* is set or :func:`_full_sync_due`
+    says the workspace's watermark is stale.  The workspace's directory is
+    loaded once; each ``users.list`` page is diffed against that snapshot and
+    applied with batched statements by :func:`_sync_directory_page`.
+    Deactivated users (``member["deleted"] == True``) are soft-deleted.  Users
+    that were previously in the directory but no longer appear in
+    ``users.list`` at all are hard-deleted along with their mappings.
+    """
+    started_at = datetime.now(UTC)
+    if not force and not _full_sync_due(_directory_sync_state(workspace_id), started_at):
+        return False
 
     _logger.info("user_directory_refresh_start", extra={"workspace_id": workspace_id})
+    snapshot = {
+        entry.slack_user_id: entry
+        for entry in DbManager.find_records(
+            schemas.UserDirectory,
+            [schemas.UserDirectory.workspace_id == workspace_id],
+        )
+    }
     cursor = ""
     count = 0
     seen_user_ids: set[str] = set()
 
     while True:
         res = _users_list_page(client, cursor=cursor)
-        members = safe_get(res, "members") or []
-
-        for member in members:
-            if member.get("is_bot") or member.get("id") == "USLACKBOT":
-                continue
-            seen_user_ids.add(member["id"])
-            _upsert_single_user_to_directory(member, workspace_id)
-            count += 1
+        members = [
+            m
+            for m in safe_get(res, "members") or []
+            if not m.get("is_bot") and m.get("id") != "USLACKBOT"
+        ]
+        seen_user_ids.update(m["id"] for m in members)
+        _sync_directory_page(members, workspace_id, snapshot)
+        count += len(members)
 
         cursor = safe_get(res, "response_metadata", "next_cursor") or ""
         if not cursor:
             break
 
     if seen_user_ids:
-        all_entries = DbManager.find_records(
-            schemas.UserDirectory,
-            [schemas.UserDirectory.workspace_id == workspace_id],
+        gone = [entry for uid, entry in snapshot.items() if uid not in seen_user_ids]
+        if gone:
+            _purge_mappings_for_users([e.slack_user_id for e in gone], workspace_id)
+            for chunk in _chunks([e.id for e in gone]):
+                DbManager.delete_records(schemas.UserDirectory, [schemas.UserDirectory.id.in_(chunk)])
+
+    invalidate_user_name_index(workspace_id)
+    _set_directory_watermark(workspace_id, "last_full_sync_at", started_at)
+    _logger.info("user_directory_refresh_done", extra={"workspace_id": workspace_id, "count": count})
+    emit_metric("user_directory_full_sync", count, workspace_id=str(workspace_id))
+    return True
+
+
+def run_directory_maintenance(max_workspaces: int | None = None) -> int:
+    """Run due full directory crawls, out of the request path. Returns the number of workspaces crawled.
+
+    Called from scheduled invocations (see :func:`app.handler`) and the
+    container-mode maintenance thread.  At most *max_workspaces*
+    (:data:`constants.USER_DIR_SYNC_WORKSPACES_PER_RUN` by default) are
+    crawled, least recently synced first; each crawl is followed by an
+    auto-match pass so ``match_method='none'`` mappings pick up new users.
+    """
+    limit = max_workspaces or constants.USER_DIR_SYNC_WORKSPACES_PER_RUN
+    now = datetime.now(UTC)
+    workspaces = DbManager.find_records(
+        schemas.Workspace,
+        [schemas.Workspace.deleted_at.is_(None), schemas.Workspace.bot_token.isnot(None)],
+    )
+    if not workspaces:
+        return 0
+    states = {
+        s.workspace_id: s
+        for s in DbManager.find_records(
+            schemas.UserDirectorySync,
+            [schemas.UserDirectorySync.workspace_id.in_([ws.id for ws in workspaces])],
         )
-        for entry in all_entries:
-            if entry.slack_user_id not in seen_user_ids:
-                _purge_mappings_for_user(entry.slack_user_id, workspace_id)
-                DbManager.delete_records(
-                    schemas.UserDirectory,
-                    [schemas.UserDirectory.id == entry.id],
-                )
+    }
+    due = [ws for ws in workspaces if _full_sync_due(states.get(ws.id), now)]
 
-    _logger.info("user_directory_refresh_done", extra={"workspace_id": workspace_id, "count": count})
-    _cache_set(cache_key, True, ttl=constants.USER_DIR_REFRESH_TTL)
+    def _last_synced(ws: schemas.Workspace) -> datetime:
+        last = getattr(states.get(ws.id), "last_full_sync_at", None)
+        return last.replace(tzinfo=None) if last else datetime.min
+
+    due.sort(key=_last_synced)
+
+    crawled = 0
+    for workspace in due[:limit]:
+        try:
+            client = get_workspace_client(workspace)
+            _refresh_user_directory(client, workspace.id, force=True)
+            run_auto_match_for_workspace(client, workspace.id)
+            crawled += 1
+        except Exception as exc:
+            _logger.warning(f"Directory maintenance failed for workspace {workspace.id}: {exc}")
+    return crawled
+
+
+_IN_CLAUSE_CHUNK = 500
+
+
+def _chunks(values: list, size: int = _IN_CLAUSE_CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
+
+
+def _directory_fields(member: dict) -> dict[str, Any]:
+    profile = member.get("profile", {})
+    display_name = profile.get("display_name") or ""
+    real_name = profile.get("real_name") or ""
+    return {
+        "email": profile.get("email"),
+        "real_name": real_name,
+        "display_name": display_name,
+        "normalized_name": _normalize_name(display_name) if display_name else _normalize_name(real_name),
+    }
+
+
+def _sync_directory_page(
+    members: list[dict],
+    workspace_id: int,
+    snapshot: dict[str, schemas.UserDirectory],
+) -> None:
+    """Apply one ``users.list`` page to user_directory, diffed against *snapshot*.
+
+    New users are inserted with one multi-row ``INSERT`` and changed or
+    deactivated users updated with one batched ``UPDATE``; unchanged users
+    cost nothing.  Mappings of deactivated users are purged and renamed
+    users' ``UserMapping.source_display_name`` is updated with set-based
+    statements.
+    """
+    now = datetime.now(UTC)
+    inserts: list[dict[str, Any]] = []
+    updates: list[dict[str, Any]] = []
+    deactivated: list[str] = []
+    renamed: dict[str, str] = {}
+
+    for member in members:
+        uid = member["id"]
+        entry = snapshot.get(uid)
+
+        if member.get("deleted", False):
+            deactivated.append(uid)
+            if entry is not None and entry.deleted_at is None:
+                updates.append({"id": entry.id, "deleted_at": now, "updated_at": now})
+            continue
+
+        fields = _directory_fields(member)
+        current_name = fields["display_name"] or fields["real_name"]
+        if entry is None:
+            inserts.append({"workspace_id": workspace_id, "slack_user_id": uid, "updated_at": now, **fields})
+            previous_name = None
+        elif entry.deleted_at is not None or any(getattr(entry, k) != v for k, v in fields.items()):
+            updates.append({"id": entry.id, **fields, "updated_at": now, "deleted_at": None})
+            previous_name = entry.display_name or entry.real_name
+        else:
+            continue
+        if current_name and current_name != previous_name:
+            renamed[uid] = current_name
+        _CACHE.pop(f"user_info:{uid}", None)
+
+    DbManager.insert_rows(schemas.UserDirectory, inserts)
+    DbManager.update_rows(schemas.UserDirectory, updates)
+
+    if deactivated:
+        _purge_mappings_for_users(deactivated, workspace_id)
+        for uid in deactivated:
+            _CACHE.pop(f"user_info:{uid}", None)
+
+    if renamed:
+        DbManager.update_records(
+            schemas.UserMapping,
+            [
+                schemas.UserMapping.source_workspace_id == workspace_id,
+                schemas.UserMapping.source_user_id.in_(list(renamed)),
+            ],
+            {schemas.UserMapping.source_display_name: case(renamed, value=schemas.UserMapping.source_user_id)},
+        )
+
+
+def upsert_directory_users(members: list[dict], workspace_id: int) -> None:
+    """Bulk insert/update ``users.list``-shaped *members* for one workspace.
+
+    Only the directory rows of these members are loaded; the batch is then
+    applied like a ``users.list`` page (see :func:`_sync_directory_page`).
+    """
+    if not members:
+        return
+    uids = list({m["id"] for m in members})
+    snapshot: dict[str, schemas.UserDirectory] = {}
+    for chunk in _chunks(uids):
+        for entry in DbManager.find_records(
+            schemas.UserDirectory,
+            [schemas.UserDirectory.workspace_id == workspace_id, schemas.UserDirectory.slack_user_id.in_(chunk)],
+        ):
+            snapshot[entry.slack_user_id] = entry
+    _sync_directory_page(members, workspace_id, snapshot)
+    invalidate_user_name_index(workspace_id)
 
 
 def _upsert_single_user_to_directory(member: dict, workspace_id: int) -> None:
@@ -149,6 +389,8 @@ def _upsert_single_user_to_directory(member: dict, workspace_id: int) -> None:
     current_name = display_name or real_name
     is_deleted = member.get("deleted", False)
 
+    invalidate_user_name_index(workspace_id)
+
     existing = DbManager.find_records(
         schemas.UserDirectory,
         [
@@ -166,6 +408,7 @@ def _upsert_single_user_to_directory(member: dict, workspace_id: int) -> None:
             )
         _purge_mappings_for_user(member["id"], workspace_id)
         _CACHE.pop(f"user_info:{member['id']}", None)
+        _set_directory_watermark(workspace_id, "last_event_at", now)
         return
 
     if existing:
@@ -213,33 +456,64 @@ def _upsert_single_user_to_directory(member: dict, workspace_id: int) -> None:
                 )
 
     _CACHE.pop(f"user_info:{member['id']}", None)
+    _set_directory_watermark(workspace_id, "last_event_at", now)
 
 
 def _purge_mappings_for_user(slack_user_id: str, workspace_id: int) -> None:
     """Hard-delete all user mappings where this user is source or target."""
-    DbManager.delete_records(
-        schemas.UserMapping,
-        [
-            schemas.UserMapping.source_workspace_id == workspace_id,
-            schemas.UserMapping.source_user_id == slack_user_id,
-        ],
-    )
-    DbManager.delete_records(
-        schemas.UserMapping,
-        [
-            schemas.UserMapping.target_workspace_id == workspace_id,
-            schemas.UserMapping.target_user_id == slack_user_id,
-        ],
-    )
+    _purge_mappings_for_users([slack_user_id], workspace_id)
+
+
+def _purge_mappings_for_users(slack_user_ids: list[str], workspace_id: int) -> None:
+    """Hard-delete all user mappings where any of these users is source or target."""
+    for chunk in _chunks(slack_user_ids):
+        DbManager.delete_records(
+            schemas.UserMapping,
+            [
+                schemas.UserMapping.source_workspace_id == workspace_id,
+                schemas.UserMapping.source_user_id.in_(chunk),
+            ],
+        )
+        DbManager.delete_records(
+            schemas.UserMapping,
+            [
+                schemas.UserMapping.target_workspace_id == workspace_id,
+                schemas.UserMapping.target_user_id.in_(chunk),
+            ],
+        )
 
 
 @slack_retry
 def _lookup_user_by_email(client: WebClient, email: str) -> str | None:
     """Resolve a user ID from an email address in the target workspace."""
+    throttle(client.token, "users.lookupByEmail")
     res = client.users_lookupByEmail(email=email)
     return safe_get(res, "user", "id")
 
 
+def _find_name_match(source_profile: dict[str, Any], target_workspace_id: int) -> str | None:
+    """Return the target user whose directory names uniquely match *source_profile*, if any."""
+    source_real = source_profile.get("real_name", "")
+    source_display = source_profile.get("display_name", "")
+    source_normalized = _normalize_name(source_display) if source_display else _normalize_name(source_real)
+
+    if not source_normalized or not source_real:
+        return None
+
+    index = _name_index(target_workspace_id)
+    real = source_real.lower()
+
+    name_matches = index.by_name_and_real.get((source_normalized.lower(), real), [])
+    if len(name_matches) == 1:
+        return name_matches[0]
+
+    real_only = index.by_real.get(real, [])
+    if len(real_only) == 1:
+        return real_only[0]
+
+    return None
+
+
 def _find_user_match(
     source_user_id: str,
     source_profile: dict[str, Any],
@@ -254,48 +528,24 @@ def _find_user_match(
             target_uid = _lookup_user_by_email(target_client, email)
             if target_uid:
                 return target_uid, "email"
-        except SlackApiError as exc:
+        except (SlackApiError, RateLimitExceeded) as exc:
             _logger.debug(f"match_user: email lookup failed for {email}: {exc}")
 
-    _refresh_user_directory(target_client, target_workspace_id)
-
-    source_real = source_profile.get("real_name", "")
-    source_display = source_profile.get("display_name", "")
-    source_normalized = _normalize_name(source_display) if source_display else _normalize_name(source_real)
-
-    if not source_normalized:
-        return None, "none"
-
-    candidates = DbManager.find_records(
-        schemas.UserDirectory,
-        [
-            schemas.UserDirectory.workspace_id == target_workspace_id,
-            schemas.UserDirectory.deleted_at.is_(None),
-        ],
-    )
-
-    name_matches = [
-        c
-        for c in candidates
-        if c.normalized_name
-        and c.normalized_name.lower() == source_normalized.lower()
-        and c.real_name
-        and source_real
-        and c.real_name.lower() == source_real.lower()
-    ]
-    if len(name_matches) == 1:
-        return name_matches[0].slack_user_id, "name"
-
-    if source_real:
-        real_only = [c for c in candidates if c.real_name and c.real_name.lower() == source_real.lower()]
-        if len(real_only) == 1:
-            return real_only[0].slack_user_id, "name"
-
+    target_uid = _find_name_match(source_profile, target_workspace_id)
+    if target_uid:
+        return target_uid, "name"
     return None, "none"
 
 
-def _get_source_profile_full(client: WebClient, user_id: str) -> dict[str, Any] | None:
-    """Fetch full profile fields needed for matching."""
+def _get_source_profile_full(
+    client: WebClient, user_id: str, *, raise_throttled: bool = False
+) -> dict[str, Any] | None:
+    """Fetch full profile fields needed for matching.
+
+    Returns *None* if the lookup fails.  A throttled lookup
+    (:class:`RateLimitExceeded`) is re-raised when *raise_throttled* is set,
+    so batch matching can defer the mapping instead of recording no match.
+    """
     cache_key = f"user_profile_full:{user_id}"
     cached = _cache_get(cache_key)
     if cached is not None:
@@ -306,6 +556,11 @@ def _get_source_profile_full(client: WebClient, user_id: str) -> dict[str, Any]
     except SlackApiError as exc:
         _logger.warning(f"Failed to look up user {user_id}: {exc}")
         return None
+    except RateLimitExceeded as exc:
+        if raise_throttled:
+            raise
+        _logger.warning(f"Failed to look up user {user_id}: {exc}")
+        return None
 
     profile = safe_get(res, "user", "profile") or {}
     result: dict[str, Any] = {
@@ -361,50 +616,35 @@ def get_display_name_and_icon_for_synced_message(
     return normalize_display_name(source_display_name), source_icon_url
 
 
-def resolve_mention_for_workspace(
+def _unmapped_label(name: str, source_ws_name: str | None) -> str:
+    if source_ws_name:
+        return f"`[@{name} ({source_ws_name})]`"
+    return f"`[@{name}]`"
+
+
+def _match_and_record_mention(
     source_client: WebClient,
     source_user_id: str,
     source_workspace_id: int,
     target_client: WebClient,
     target_workspace_id: int,
+    existing: schemas.UserMapping | None,
+    source_ws_name: str | None,
 ) -> str:
-    """Resolve a single @mention from source workspace to target workspace."""
-    source_ws = get_workspace_by_id(source_workspace_id)
-    source_ws_name = resolve_workspace_name(source_ws) if source_ws else None
-
-    def _unmapped_label(name: str) -> str:
-        if source_ws_name:
-            return f"`[@{name} ({source_ws_name})]`"
-        return f"`[@{name}]`"
-
-    mappings = DbManager.find_records(
-        schemas.UserMapping,
-        [
-            schemas.UserMapping.source_workspace_id == source_workspace_id,
-            schemas.UserMapping.source_user_id == source_user_id,
-            schemas.UserMapping.target_workspace_id == target_workspace_id,
-        ],
-    )
-
-    if mappings and _is_mapping_fresh(mappings[0]):
-        mapping = mappings[0]
-        if mapping.target_user_id:
-            return f"<@{mapping.target_user_id}>"
-        return _unmapped_label(mapping.source_display_name or source_user_id)
-
+    """Run matching for one (user, target workspace) pair and store the resulting mapping."""
     source_profile = _get_source_profile_full(source_client, source_user_id)
     if not source_profile:
-        return _unmapped_label(source_user_id)
+        return _unmapped_label(source_user_id, source_ws_name)
 
     target_uid, method = _find_user_match(source_user_id, source_profile, target_client, target_workspace_id)
 
     display = source_profile.get("display_name") or source_profile.get("real_name") or source_user_id
     now = datetime.now(UTC)
 
-    if mappings:
+    if existing is not None:
         DbManager.update_records(
             schemas.UserMapping,
-            [schemas.UserMapping.id == mappings[0].id],
+            [schemas.UserMapping.id == existing.id],
             {
                 schemas.UserMapping.target_user_id: target_uid,
                 schemas.UserMapping.match_method: method,
@@ -428,7 +668,103 @@ def resolve_mention_for_workspace(
 
     if target_uid:
         return f"<@{target_uid}>"
-    return _unmapped_label(display)
+    return _unmapped_label(display, source_ws_name)
+
+
+def resolve_mentions_bulk(
+    source_client: WebClient,
+    source_workspace_id: int,
+    source_user_ids: list[str],
+    target_clients: dict[int, WebClient],
+) -> dict[int, dict[str, str]]:
+    """Resolve @mentions of *source_user_ids* for every target workspace at once.
+
+    *target_clients* maps each target ``Workspace.id`` to its client.  All
+    relevant ``UserMapping`` rows are loaded in one query; matching (and the
+    mapping write) only runs for pairs without a fresh mapping.  Returns
+    ``{target_workspace_id: {source_user_id: replacement_text}}``.  A pair whose
+    matching fails is logged and left out, so callers fall back to a label.
+    """
+    user_ids = list(dict.fromkeys(source_user_ids))
+    table: dict[int, dict[str, str]] = {ws_id: {} for ws_id in target_clients}
+    if not user_ids or not target_clients:
+        return table
+
+    source_ws = get_workspace_by_id(source_workspace_id)
+    source_ws_name = resolve_workspace_name(source_ws) if source_ws else None
+
+    rows = DbManager.find_records(
+        schemas.UserMapping,
+        [
+            schemas.UserMapping.source_workspace_id == source_workspace_id,
+            schemas.UserMapping.source_user_id.in_(user_ids),
+            schemas.UserMapping.target_workspace_id.in_(list(target_clients)),
+        ],
+    )
+    mappings: dict[tuple[str, int], schemas.UserMapping] = {}
+    for row in rows:
+        mappings.setdefault((row.source_user_id, row.target_workspace_id), row)
+
+    for target_workspace_id, target_client in target_clients.items():
+        resolved = table[target_workspace_id]
+        for uid in user_ids:
+            mapping = mappings.get((uid, target_workspace_id))
+            if mapping is not None and _is_mapping_fresh(mapping):
+                if mapping.target_user_id:
+                    resolved[uid] = f"<@{mapping.target_user_id}>"
+                else:
+                    resolved[uid] = _unmapped_label(mapping.source_display_name or uid, source_ws_name)
+                continue
+            try:
+                resolved[uid] = _match_and_record_mention(
+                    source_client,
+                    uid,
+                    source_workspace_id,
+                    target_client,
+                    target_workspace_id,
+                    mapping,
+                    source_ws_name,
+                )
+            except Exception as exc:
+                _logger.error(f"Failed to resolve mention for user {uid} in workspace {target_workspace_id}: {exc}")
+    return table
+
+
+def resolve_mention_for_workspace(
+    source_client: WebClient,
+    source_user_id: str,
+    source_workspace_id: int,
+    target_client: WebClient,
+    target_workspace_id: int,
+) -> str:
+    """Resolve a single @mention from source workspace to target workspace."""
+    source_ws = get_workspace_by_id(source_workspace_id)
+    source_ws_name = resolve_workspace_name(source_ws) if source_ws else None
+
+    mappings = DbManager.find_records(
+        schemas.UserMapping,
+        [
+            schemas.UserMapping.source_workspace_id == source_workspace_id,
+            schemas.UserMapping.source_user_id == source_user_id,
+            schemas.UserMapping.target_workspace_id == target_workspace_id,
+        ],
+    )
+
+    if mappings and _is_mapping_fresh(mappings[0]):
+        mapping = mappings[0]
+        if mapping.target_user_id:
+            return f"<@{mapping.target_user_id}>"
+        return _unmapped_label(mapping.source_display_name or source_user_id, source_ws_name)
+
+    return _match_and_record_mention(
+        source_client,
+        source_user_id,
+        source_workspace_id,
+        target_client,
+        target_workspace_id,
+        mappings[0] if mappings else None,
+        source_ws_name,
+    )
 
 
 _MAX_MENTIONS = 50
@@ -457,33 +793,40 @@ def apply_mentioned_users(
     mentioned_user_info: list[dict[str, Any]],
     source_workspace_id: int,
     target_workspace_id: int,
+    resolved: dict[str, str] | None = None,
 ) -> str:
-    """Re-map @mentions from the source workspace to the target workspace."""
+    """Re-map @mentions from the source workspace to the target workspace.
+
+    *resolved* is this target's entry from :func:`resolve_mentions_bulk`; when
+    omitted the mentions are resolved here for this target alone.
+    """
     msg_text = msg_text or ""
     if not mentioned_user_info:
         return msg_text
 
+    if resolved is None:
+        try:
+            resolved = resolve_mentions_bulk(
+                source_client,
+                source_workspace_id,
+                [u.get("user_id", "") for u in mentioned_user_info],
+                {target_workspace_id: target_client},
+            )[target_workspace_id]
+        except Exception as exc:
+            _logger.error(f"Failed to resolve mentions for workspace {target_workspace_id}: {exc}")
+            resolved = {}
+
+    ws_label: str | None = None
     replace_list: list[str] = []
     for user_info in mentioned_user_info:
         uid = user_info.get("user_id", "")
-        try:
-            resolved = resolve_mention_for_workspace(
-                source_client=source_client,
-                source_user_id=uid,
-                source_workspace_id=source_workspace_id,
-                target_client=target_client,
-                target_workspace_id=target_workspace_id,
-            )
-            replace_list.append(resolved)
-        except Exception as exc:
-            _logger.error(f"Failed to resolve mention for user {uid}: {exc}")
-            fallback = user_info.get("user_name") or uid
+        if uid in resolved:
+            replace_list.append(resolved[uid])
+            continue
+        if ws_label is None:
             source_ws = get_workspace_by_id(source_workspace_id) if source_workspace_id else None
-            ws_label = resolve_workspace_name(source_ws) if source_ws else None
-            if ws_label:
-                replace_list.append(f"`[@{fallback} ({ws_label})]`")
-            else:
-                replace_list.append(f"`[@{fallback}]`")
+            ws_label = (resolve_workspace_name(source_ws) if source_ws else None) or ""
+        replace_list.append(_unmapped_label(user_info.get("user_name") or uid, ws_label))
 
     replace_iter = iter(replace_list)
     return re.sub(r"<@\w+>", lambda _: next(replace_iter), msg_text)
@@ -675,8 +1018,116 @@ def seed_user_mappings(source_workspace_id: int, target_workspace_id: int, group
     return created
 
 
-def run_auto_match_for_workspace(target_client: WebClient, target_workspace_id: int) -> tuple[int, int]:
-    """Re-run auto-matching for all unmatched mappings targeting a workspace."""
+def _auto_match_batch(
+    batch: list[schemas.UserMapping],
+    target_client: WebClient,
+    target_workspace_id: int,
+) -> tuple[int, int, bool]:
+    """Match one batch of unmatched mappings. Returns ``(matched, unmatched, deferred)``.
+
+    Source profiles (``users.info``) and target email lookups
+    (``users.lookupByEmail``) are fetched concurrently under the rate
+    limiter; results are written with one batched update.  Mappings whose
+    lookups failed (e.g. :class:`RateLimitExceeded`) are left untouched and
+    *deferred* is True so the caller can stop and resume later.
+    """
+    source_clients: dict[int, WebClient | None] = {}
+    for ws_id in {m.source_workspace_id for m in batch}:
+        source_ws = get_workspace_by_id(ws_id)
+        try:
+            source_clients[ws_id] = get_workspace_client(source_ws) if source_ws else None
+        except Exception as exc:
+            _logger.warning(f"auto_match: no client for source workspace {ws_id}: {exc}")
+            source_clients[ws_id] = None
+
+    profile_keys = list(
+        {(m.source_workspace_id, m.source_user_id) for m in batch if source_clients.get(m.source_workspace_id)}
+    )
+    profiles: dict[tuple[int, str], dict[str, Any] | None] = {}
+    failed_keys: set[tuple[int, str]] = set()
+    for key, profile, error in fan_out(
+        lambda k: _get_source_profile_full(source_clients[k[0]], k[1], raise_throttled=True),
+        profile_keys,
+        max_workers=constants.USER_MATCH_MAX_WORKERS,
+    ):
+        if error is not None:
+            failed_keys.add(key)
+        else:
+            profiles[key] = profile
+
+    emails = list({p["email"] for p in profiles.values() if p and p.get("email")})
+    email_matches: dict[str, str | None] = {}
+    failed_emails: set[str] = set()
+    for email, target_uid, error in fan_out(
+        lambda e: _lookup_user_by_email(target_client, e),
+        emails,
+        max_workers=constants.USER_MATCH_MAX_WORKERS,
+    ):
+        if isinstance(error, SlackApiError):
+            email_matches[email] = None
+        elif error is not None:
+            failed_emails.add(email)
+        else:
+            email_matches[email] = target_uid
+
+    now = datetime.now(UTC)
+    updates: list[dict[str, Any]] = []
+    matched = unmatched = 0
+    deferred = False
+    for mapping in batch:
+        key = (mapping.source_workspace_id, mapping.source_user_id)
+        profile = profiles.get(key)
+        email = profile.get("email") if profile else None
+        if key in failed_keys or (email and email in failed_emails):
+            deferred = True
+            continue
+
+        target_uid, method = None, "none"
+        if profile:
+            if email and email_matches.get(email):
+                target_uid, method = email_matches[email], "email"
+            else:
+                target_uid = _find_name_match(profile, target_workspace_id)
+                method = "name" if target_uid else "none"
+
+        if target_uid:
+            display = profile.get("display_name") or profile.get("real_name") or mapping.source_user_id
+            updates.append(
+                {
+                    "id": mapping.id,
+                    "target_user_id": target_uid,
+                    "match_method": method,
+                    "source_display_name": display,
+                    "matched_at": now,
+                }
+            )
+            matched += 1
+        else:
+            updates.append({"id": mapping.id, "matched_at": now})
+            unmatched += 1
+
+    DbManager.update_rows(schemas.UserMapping, updates)
+    return matched, unmatched, deferred
+
+
+def run_auto_match_for_workspace(
+    target_client: WebClient,
+    target_workspace_id: int,
+    time_budget_seconds: float | None = None,
+) -> tuple[int, int]:
+    """Re-run auto-matching for all unmatched mappings targeting a workspace.
+
+    Mappings are processed least recently checked first, in batches of
+    :data:`constants.USER_MATCH_BATCH_SIZE` (see :func:`_auto_match_batch`).
+    Each checked mapping is written back with a new ``matched_at``, so when
+    a run stops early — time budget
+    (:data:`constants.USER_MATCH_TIME_BUDGET_SECONDS`) spent, Slack rate limit
+    reached, or the invocation cut off — the next run resumes with the
+    mappings this one did not reach.  Returns ``(newly_matched,
+    still_unmatched)``; mappings not reached count as still unmatched.
+    """
+    budget = time_budget_seconds if time_budget_seconds is not None else constants.USER_MATCH_TIME_BUDGET_SECONDS
+    deadline = _time.monotonic() + budget
     unmatched = DbManager.find_records(
         schemas.UserMapping,
         [
@@ -684,42 +1135,22 @@ def run_auto_match_for_workspace(target_client: WebClient, target_workspace_id:
             schemas.UserMapping.match_method == "none",
         ],
     )
-
-    _refresh_user_directory(target_client, target_workspace_id)
+    unmatched.sort(key=lambda m: (m.matched_at.replace(tzinfo=None) if m.matched_at else datetime.min, m.id))
 
     newly_matched = 0
-    still_unmatched = 0
-
-    for mapping in unmatched:
-        source_workspace = get_workspace_by_id(mapping.source_workspace_id)
-        if not source_workspace:
-            still_unmatched += 1
-            continue
-
-        source_client = WebClient(token=decrypt_bot_token(source_workspace.bot_token))
-        source_profile = _get_source_profile_full(source_client, mapping.source_user_id)
-        if not source_profile:
-            still_unmatched += 1
-            continue
+    checked = 0
+    for batch in _chunks(unmatched, constants.USER_MATCH_BATCH_SIZE):
+        if _time.monotonic() >= deadline:
+            break
+        matched, _still, deferred = _auto_match_batch(batch, target_client, target_workspace_id)
+        newly_matched += matched
+        checked += matched + _still
+        if deferred:
+            break
 
-        target_uid, method = _find_user_match(
-            mapping.source_user_id, source_profile, target_client, target_workspace_id
+    if checked < len(unmatched):
+        _logger.info(
+            "auto_match_incomplete",
+            extra={"workspace_id": target_workspace_id, "checked": checked, "remaining": len(unmatched) - checked},
         )
-
-        if target_uid:
-            display = source_profile.get("display_name") or source_profile.get("real_name") or mapping.source_user_id
-            DbManager.update_records(
-                schemas.UserMapping,
-                [schemas.UserMapping.id == mapping.id],
-                {
-                    schemas.UserMapping.target_user_id: target_uid,
-                    schemas.UserMapping.match_method: method,
-                    schemas.UserMapping.source_display_name: display,
-                    schemas.UserMapping.matched_at: datetime.now(UTC),
-                },
-            )
-            newly_matched += 1
-        else:
-            still_unmatched += 1
-
-    return newly_matched, still_unmatched
+    return newly_matched, len(unmatched) - newly_matched
@@ -6,8 +6,9 @@ from slack_sdk import WebClient
 
 from db import DbManager, schemas
 from helpers._cache import _cache_get, _cache_set
+from helpers.clients import get_bot_token, get_workspace_client, invalidate_workspace_client
 from helpers.core import safe_get
-from helpers.encryption import decrypt_bot_token, encrypt_bot_token
+from helpers.encryption import encrypt_bot_token
 
 _logger = logging.getLogger(__name__)
 
@@ -129,19 +130,28 @@ def get_workspace_record(team_id: str, body: dict, context: dict, client: WebCli
 
 
 def _maybe_refresh_bot_token(workspace_record: schemas.Workspace, context: dict) -> None:
-    """Update the stored bot token if the OAuth flow provided a newer one."""
+    """Update the stored bot token if the OAuth flow provided a newer one.
+
+    Compares plaintext tokens: Fernet ciphertexts differ on every encryption,
+    so comparing those would rewrite the row on every request.
+    """
     new_token = safe_get(context, "bot_token")
     if not new_token:
         return
 
-    encrypted_new = encrypt_bot_token(new_token)
-    if encrypted_new != workspace_record.bot_token:
+    try:
+        unchanged = get_bot_token(workspace_record) == new_token
+    except ValueError:
+        unchanged = False
+    if not unchanged:
+        encrypted_new = encrypt_bot_token(new_token)
         DbManager.update_records(
             schemas.Workspace,
             [schemas.Workspace.id == workspace_record.id],
             {schemas.Workspace.bot_token: encrypted_new},
         )
         workspace_record.bot_token = encrypted_new
+        invalidate_workspace_client(workspace_record.id)
         _logger.info(
             "bot_token_refreshed",
             extra={"workspace_id": workspace_record.id, "team_id": workspace_record.team_id},
@@ -195,6 +205,7 @@ def _restore_workspace(
         [schemas.Workspace.id == workspace_record.id],
         update_fields,
     )
+    invalidate_workspace_client(workspace_record.id)
 
     workspace_record = DbManager.get_record(schemas.Workspace, id=workspace_record.team_id)
 
@@ -256,7 +267,7 @@ def _restore_workspace(
                 continue
             notified_ws.add(m.workspace_id)
             try:
-                member_client = WebClient(token=decrypt_bot_token(member_ws.bot_token))
+                member_client = get_workspace_client(member_ws)
                 notify_admins_dm(
                     member_client,
                     f":arrow_forward: *{ws_name}* has been restored. Group syncing will resume.",
@@ -351,7 +362,7 @@ def resolve_workspace_name(workspace: schemas.Workspace) -> str:
 
     if workspace.bot_token:
         try:
-            ws_client = WebClient(token=decrypt_bot_token(workspace.bot_token))
+            ws_client = get_workspace_client(workspace)
             team_info = ws_client.team_info()
             name = safe_get(team_info, "team", "name")
             if name:
@@ -389,7 +400,7 @@ def resolve_channel_name(channel_id: str, workspace=None) -> str:
     if workspace and hasattr(workspace, "bot_token") and workspace.bot_token:
         ws_name = getattr(workspace, "workspace_name", None)
         try:
-            ws_client = WebClient(token=decrypt_bot_token(workspace.bot_token))
+            ws_client = get_workspace_client(workspace)
             info = ws_client.conversations_info(channel=channel_id)
             ch_name = safe_get(info, "channel", "name") or channel_id
         except Exception as exc:
@@ -12,14 +12,21 @@ Provides:
 * **Metrics helpers** — Lightweight functions that emit metric events as
   structured log entries.  CloudWatch Logs Insights or a metric filter
   can aggregate these into numeric dashboards.
+* **Lazy log values** — :class:`LazyLogValue` defers building an expensive
+  ``extra=`` value (e.g. a serialized request body) until a handler formats
+  the record, so it costs nothing when the level is disabled.
+* **Cold-start profile** — :func:`mark_cold_start_phase` times the import
+  and initialization phases of :mod:`app`; :func:`emit_cold_start_profile`
+  emits them once per process (container / Lambda execution environment).
 
 Usage::
 
-    from logger import configure_logging, set_correlation_id, emit_metric
+    from logger import LazyLogValue, configure_logging, set_correlation_id, emit_metric
 
     configure_logging()          # call once at module level
     set_correlation_id()         # call at the start of each request
     emit_metric("messages_synced", 3, sync_id="abc")
+    _logger.debug("request_body", extra={"body": LazyLogValue(json.dumps, body)})
 """
 
 import json
@@ -61,6 +68,48 @@ def get_request_duration_ms() -> float:
     return (_time.monotonic() - _request_start) * 1000
 
 
+# ---------------------------------------------------------------------------
+# Lazy log values
+# ---------------------------------------------------------------------------
+
+
+class LazyLogValue:
+    """An ``extra=`` value computed as ``func(*args, **kwargs)`` only when logged.
+
+    ``logger.debug(...)`` drops the record before any formatting when DEBUG is
+    disabled, so wrapping an expensive payload in a :class:`LazyLogValue`
+    skips the work entirely.  :class:`StructuredFormatter` and
+    :class:`DevFormatter` call :meth:`resolve`; any other
+    formatter gets the value through :func:`str`.  The result is computed at
+    most once, even if several handlers format the record.
+    """
+
+    __slots__ = ("_func", "_args", "_kwargs", "_value", "_resolved")
+
+    def __init__(self, func, /, *args: Any, **kwargs: Any) -> None:
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._resolved = False
+        self._value = None
+
+    def resolve(self) -> Any:
+        if not self._resolved:
+            self._value = self._func(*self._args, **self._kwargs)
+            self._resolved = True
+        return self._value
+
+    def __str__(self) -> str:
+        return str(self.resolve())
+
+    def __repr__(self) -> str:
+        return f"LazyLogValue({self._func.__qualname__})"
+
+
+def _extra_value(val: Any) -> Any:
+    return val.resolve() if isinstance(val, LazyLogValue) else val
+
+
 # ---------------------------------------------------------------------------
 # Structured JSON formatter
 # ---------------------------------------------------------------------------
@@ -79,7 +128,8 @@ class StructuredFormatter(logging.Formatter):
     * ``message`` — the formatted log message
 
     Extra keys passed via ``logging.info("msg", extra={...})`` are merged
-    into the top-level JSON object.
+    into the top-level JSON object; :class:`LazyLogValue` extras are resolved
+    first.
     """
 
     # Keys that belong to the stdlib LogRecord and should not be forwarded.
@@ -101,7 +151,7 @@ class StructuredFormatter(logging.Formatter):
         # Merge any extra fields the caller passed.
         for key, val in record.__dict__.items():
             if key not in self._RESERVED and key not in entry:
-                entry[key] = val
+                entry[key] = _extra_value(val)
 
         return json.dumps(entry, default=str)
 
@@ -159,7 +209,7 @@ class DevFormatter(logging.Formatter):
         extras = {}
         for key, val in record.__dict__.items():
             if key not in self._RESERVED and key not in ("message", "correlation_id"):
-                extras[key] = val
+                extras[key] = _extra_value(val)
 
         if extras:
             pairs = "  ".join(f"{k}={v}" for k, v in extras.items())
@@ -259,3 +309,55 @@ def emit_metric(
             **dimensions,
         },
     )
+
+
+# ---------------------------------------------------------------------------
+# Cold-start profile
+# ---------------------------------------------------------------------------
+
+# The profile clock starts when this module is first imported, which is the
+# first thing :mod:`app` does.
+_cold_start_began = _time.perf_counter()
+_cold_start_mark = _cold_start_began
+_cold_start_phases: list[tuple[str, float]] = []
+_cold_start_emitted = False
+
+
+def mark_cold_start_phase(phase: str) -> float:
+    """End the current cold-start phase, naming it *phase*; returns its duration in ms.
+
+    A phase runs from the previous mark (or from the first import of this
+    module) to now, so marks placed after each import block of :mod:`app`
+    time the imports in between.
+    """
+    global _cold_start_mark
+    now = _time.perf_counter()
+    elapsed_ms = round((now - _cold_start_mark) * 1000, 1)
+    _cold_start_mark = now
+    _cold_start_phases.append((phase, elapsed_ms))
+    return elapsed_ms
+
+
+def cold_start_phases() -> list[tuple[str, float]]:
+    """Return the ``(phase, milliseconds)`` pairs recorded so far, in order."""
+    return list(_cold_start_phases)
+
+
+def emit_cold_start_profile() -> None:
+    """Emit the recorded phases as metrics, once per process.
+
+    One ``cold_start_phase`` metric per phase (``Milliseconds``, dimension
+    ``phase``) and a ``cold_start_total`` metric from the first import of this
+    module to the last mark.  Later calls are no-ops.
+    """
+    global _cold_start_emitted
+    if _cold_start_emitted:
+        return
+    _cold_start_emitted = True
+    for phase, elapsed_ms in _cold_start_phases:
+        emit_metric("cold_start_phase", elapsed_ms, unit="Milliseconds", phase=phase)
+    emit_metric(
+        "cold_start_total",
+        round((_cold_start_mark - _cold_start_began) * 1000, 1),
+        unit="Milliseconds",
+    )
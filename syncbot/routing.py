@@ -6,6 +6,8 @@ Maps incoming Slack request types to handler functions.  The
 the specific identifier (action ID, event type, or callback ID).
 
 :func:`~app.main_response` uses these tables to dispatch every request.
+Handlers that :mod:`handlers` imports lazily are registered through
+:func:`_deferred`, so building these tables does not import them.
 :data:`VIEW_ACK_MAPPER` lists view submission callback IDs handled by the fast ack
 path in :mod:`app` (``view_ack``) before lazy work runs in :func:`~app.main_response`.
 """
@@ -14,6 +16,17 @@ import builders
 import handlers
 from slack import actions
 
+
+def _deferred(name: str):
+    """Return a handler that resolves ``handlers.<name>`` on its first call."""
+
+    def run(*args, **kwargs):
+        return getattr(handlers, name)(*args, **kwargs)
+
+    run.__name__ = name
+    return run
+
+
 ACTION_MAPPER = {
     actions.CONFIG_JOIN_EXISTING_SYNC: builders.build_join_sync_form,
     actions.CONFIG_CREATE_NEW_SYNC: builders.build_new_sync_form,
@@ -37,17 +50,17 @@ ACTION_MAPPER = {
     actions.CONFIG_STOP_SYNC: handlers.handle_stop_sync,
     actions.CONFIG_SUBSCRIBE_CHANNEL: handlers.handle_subscribe_channel,
     actions.CONFIG_REFRESH_HOME: handlers.handle_refresh_home,
-    actions.CONFIG_BACKUP_RESTORE: handlers.handle_backup_restore,
-    actions.CONFIG_BACKUP_DOWNLOAD: handlers.handle_backup_download,
-    actions.CONFIG_BACKUP_RESTORE_PROCEED: handlers.handle_backup_restore_proceed,
-    actions.CONFIG_DATA_MIGRATION: handlers.handle_data_migration,
-    actions.CONFIG_DATA_MIGRATION_EXPORT: handlers.handle_data_migration_export,
-    actions.CONFIG_DATA_MIGRATION_PROCEED: handlers.handle_data_migration_proceed,
+    actions.CONFIG_BACKUP_RESTORE: _deferred("handle_backup_restore"),
+    actions.CONFIG_BACKUP_DOWNLOAD: _deferred("handle_backup_download"),
+    actions.CONFIG_BACKUP_RESTORE_PROCEED: _deferred("handle_backup_restore_proceed"),
+    actions.CONFIG_DATA_MIGRATION: _deferred("handle_data_migration"),
+    actions.CONFIG_DATA_MIGRATION_EXPORT: _deferred("handle_data_migration_export"),
+    actions.CONFIG_DATA_MIGRATION_PROCEED: _deferred("handle_data_migration_proceed"),
     actions.CONFIG_DB_RESET: handlers.handle_db_reset,
     actions.CONFIG_DB_RESET_PROCEED: handlers.handle_db_reset_proceed,
-    actions.CONFIG_GENERATE_FEDERATION_CODE: handlers.handle_generate_federation_code,
-    actions.CONFIG_ENTER_FEDERATION_CODE: handlers.handle_enter_federation_code,
-    actions.CONFIG_REMOVE_FEDERATION_CONNECTION: handlers.handle_remove_federation_connection,
+    actions.CONFIG_GENERATE_FEDERATION_CODE: _deferred("handle_generate_federation_code"),
+    actions.CONFIG_ENTER_FEDERATION_CODE: _deferred("handle_enter_federation_code"),
+    actions.CONFIG_REMOVE_FEDERATION_CONNECTION: _deferred("handle_remove_federation_connection"),
 }
 """Block-action ``action_id`` -> handler."""
 
@@ -74,18 +87,18 @@ VIEW_MAPPER = {
     actions.CONFIG_PUBLISH_CHANNEL_SUBMIT: handlers.handle_publish_channel_submit_work,
     actions.CONFIG_SUBSCRIBE_CHANNEL_SUBMIT: handlers.handle_subscribe_channel_submit,
     actions.CONFIG_STOP_SYNC_CONFIRM: handlers.handle_stop_sync_confirm,
-    actions.CONFIG_FEDERATION_CODE_SUBMIT: handlers.handle_federation_code_submit,
-    actions.CONFIG_FEDERATION_LABEL_SUBMIT: handlers.handle_federation_label_submit,
-    actions.CONFIG_BACKUP_RESTORE_SUBMIT: handlers.handle_backup_restore_submit_work,
-    actions.CONFIG_DATA_MIGRATION_SUBMIT: handlers.handle_data_migration_submit_work,
+    actions.CONFIG_FEDERATION_CODE_SUBMIT: _deferred("handle_federation_code_submit"),
+    actions.CONFIG_FEDERATION_LABEL_SUBMIT: _deferred("handle_federation_label_submit"),
+    actions.CONFIG_BACKUP_RESTORE_SUBMIT: _deferred("handle_backup_restore_submit_work"),
+    actions.CONFIG_DATA_MIGRATION_SUBMIT: _deferred("handle_data_migration_submit_work"),
 }
 """View submission ``callback_id`` -> lazy work handler (after HTTP ack)."""
 
 VIEW_ACK_MAPPER = {
     actions.CONFIG_PUBLISH_MODE_SUBMIT: handlers.handle_publish_mode_submit_ack,
     actions.CONFIG_PUBLISH_CHANNEL_SUBMIT: handlers.handle_publish_channel_submit_ack,
-    actions.CONFIG_BACKUP_RESTORE_SUBMIT: handlers.handle_backup_restore_submit_ack,
-    actions.CONFIG_DATA_MIGRATION_SUBMIT: handlers.handle_data_migration_submit_ack,
+    actions.CONFIG_BACKUP_RESTORE_SUBMIT: _deferred("handle_backup_restore_submit_ack"),
+    actions.CONFIG_DATA_MIGRATION_SUBMIT: _deferred("handle_data_migration_submit_ack"),
 }
 """Deferred-ack view submissions: fast ack handler (``dict`` or ``None`` for Slack ``ack()``)."""
 
@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 from helpers import safe_get
+from logger import LazyLogValue
 
 logger = logging.getLogger(__name__)
 
@@ -536,7 +537,7 @@ class BlockView:
                 "modal_open_or_push_failed",
                 extra={"callback_id": callback_id, "mode": new_or_add, "error": str(e)},
             )
-            logger.debug("modal_view_payload", extra={"view": json.dumps(view, indent=2)})
+            logger.debug("modal_view_payload", extra={"view": LazyLogValue(json.dumps, view, indent=2)})
 
     def publish_home_tab(self, client: Any, user_id: str):
         """Publish a Home tab view for the given user."""
@@ -2,6 +2,8 @@
 
 import os
 
+import pytest
+
 # In-memory SQLite so importing `app` (which calls initialize_database) works without MySQL.
 os.environ.setdefault("DATABASE_BACKEND", "sqlite")
 os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
@@ -10,3 +12,30 @@ os.environ.setdefault("DATABASE_USER", "root")
 os.environ.setdefault("DATABASE_PASSWORD", "test")
 os.environ.setdefault("DATABASE_SCHEMA", "syncbot")
 os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-0-0")
+
+
+@pytest.fixture
+def migrated_sqlite_db(tmp_path, monkeypatch):
+    """Point the global engine at a fresh SQLite file migrated to Alembic head; yields the engine."""
+    import db as db_mod
+
+    monkeypatch.setenv("DATABASE_BACKEND", "sqlite")
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'syncbot_test.db'}")
+    monkeypatch.setattr(db_mod, "GLOBAL_ENGINE", None)
+    monkeypatch.setattr(db_mod, "GLOBAL_SCHEMA", None)
+    db_mod.initialize_database()
+    engine = db_mod.get_engine()
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip ``@pytest.mark.benchmark`` tests unless ``SYNCBOT_BENCHMARKS=1``."""
+    if os.environ.get("SYNCBOT_BENCHMARKS") == "1":
+        return
+    skip = pytest.mark.skip(reason="benchmark: set SYNCBOT_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
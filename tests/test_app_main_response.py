@@ -1,5 +1,7 @@
 """Unit tests for syncbot.app.view_ack and main_response (ack + lazy work)."""
 
+import json
+import logging
 import os
 from unittest.mock import MagicMock, patch
 
@@ -10,6 +12,7 @@ os.environ.setdefault("DATABASE_SCHEMA", "syncbot")
 os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-0-0")
 
 import app as app_module  # noqa: E402
+import logger  # noqa: E402
 from slack import actions  # noqa: E402
 
 
@@ -118,3 +121,94 @@ class TestMainResponseProdViewSubmission:
             app_module.main_response(_body_view_submit(cid), MagicMock(), MagicMock(), ack, context)
 
         ack.assert_not_called()
+
+
+class TestMainResponseRequestSession:
+    """main_response runs the handler inside a request-scoped DB session."""
+
+    def test_handler_runs_inside_request_session(self):
+        import db
+
+        seen = []
+
+        def handler(b, c, log, ctx):
+            seen.append(db._REQUEST_SCOPE.get())
+
+        body = {"type": "event_callback", "team_id": "T001", "event": {"type": "team_join"}}
+        request_type, request_id = app_module.get_request_type(body)
+        with (
+            patch.object(app_module, "MAIN_MAPPER", {request_type: {request_id: handler}}),
+            patch.object(app_module, "emit_metric"),
+        ):
+            app_module.main_response(body, MagicMock(), MagicMock(), MagicMock(), {})
+
+        assert seen and seen[0] is not None
+        assert db._REQUEST_SCOPE.get() is None
+
+
+class TestRequestBodyDebugLog:
+    """The redacted request body is only serialized when DEBUG is enabled."""
+
+    def _view_ack(self, level):
+        app_logger = logging.getLogger(app_module.__name__)
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        previous = app_logger.level
+        app_logger.addHandler(handler)
+        app_logger.setLevel(level)
+        try:
+            with patch.object(app_module, "VIEW_ACK_MAPPER", {}):
+                body = {**_body_view_submit("unknown_callback"), "token": "secret"}
+                app_module.view_ack(body, MagicMock(), MagicMock(), MagicMock(), {})
+        finally:
+            app_logger.setLevel(previous)
+            app_logger.removeHandler(handler)
+        return [r for r in records if r.getMessage() == "request_body"]
+
+    def test_body_not_serialized_at_info(self):
+        with patch.object(app_module, "_redact_sensitive") as redact:
+            assert self._view_ack(logging.INFO) == []
+        redact.assert_not_called()
+
+    def test_body_redacted_when_formatted_at_debug(self):
+        (record,) = self._view_ack(logging.DEBUG)
+
+        entry = json.loads(logger.StructuredFormatter().format(record))
+        assert json.loads(entry["body"])["token"] == "[REDACTED]"
+        assert "[REDACTED]" in logger.DevFormatter().format(record)
+
+
+class TestScheduledInvocation:
+    """Scheduled (keep-warm) Lambda invocations run background maintenance instead of Bolt."""
+
+    def test_scheduled_event_runs_maintenance(self):
+        event = {"source": "aws.scheduler", "detail-type": "Scheduled Event", "detail": {}}
+        with (
+            patch.object(app_module, "run_directory_maintenance", return_value=1) as maintenance,
+            patch("slack_bolt.adapter.aws_lambda.SlackRequestHandler") as bolt,
+        ):
+            resp = app_module.handler(event, MagicMock())
+
+        maintenance.assert_called_once_with()
+        bolt.assert_not_called()
+        assert resp["statusCode"] == 200
+
+    def test_api_gateway_event_is_not_scheduled(self):
+        assert not app_module._is_scheduled_invocation({"path": "/slack/events", "requestContext": {}})
+        assert not app_module._is_scheduled_invocation({"rawPath": "/slack/events"})
+
+    def test_maintenance_can_leave_the_outbox_to_its_own_thread(self):
+        with (
+            patch.object(app_module, "run_outbox_delivery") as outbox,
+            patch.object(app_module, "run_directory_maintenance") as directory,
+        ):
+            app_module.run_scheduled_maintenance(outbox=False)
+            outbox.assert_not_called()
+            app_module.run_scheduled_maintenance()
+            outbox.assert_called_once_with()
+        assert directory.call_count == 2
+
+    def test_maintenance_errors_are_contained(self):
+        with patch.object(app_module, "run_directory_maintenance", side_effect=RuntimeError("db down")):
+            app_module.run_scheduled_maintenance()
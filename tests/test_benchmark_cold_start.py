@@ -0,0 +1,38 @@
+"""Benchmark: ``import app`` time in a fresh interpreter (container / Lambda cold start).
+
+Opt-in (``SYNCBOT_BENCHMARKS=1``).  Imports :mod:`app` ``SYNCBOT_BENCHMARK_IMPORT_RUNS``
+times (default 5) against a SQLite schema already at head, and again with the
+lazily imported modules (federation, export/import, Alembic, Bolt's Lambda
+adapter, ...) imported up front, as they used to be.  Fails if the median
+import time exceeds ``SYNCBOT_BENCHMARK_IMPORT_BUDGET_MS`` (default 1500).
+"""
+
+import os
+import statistics
+
+import pytest
+
+from tests.test_cold_start import LAZY_MODULES, import_app_in_subprocess
+
+pytestmark = pytest.mark.benchmark
+
+_RUNS = int(os.environ.get("SYNCBOT_BENCHMARK_IMPORT_RUNS", "5"))
+_BUDGET_MS = float(os.environ.get("SYNCBOT_BENCHMARK_IMPORT_BUDGET_MS", "1500"))
+
+
+def _median_import(tmp_path, preload=()) -> tuple[float, dict[str, float]]:
+    runs = [import_app_in_subprocess(tmp_path, preload) for _ in range(_RUNS)]
+    phases = {phase: statistics.median(dict(run["phases"])[phase] for run in runs) for phase, _ in runs[0]["phases"]}
+    return statistics.median(run["elapsed_ms"] for run in runs), phases
+
+
+def test_import_time_stays_within_budget(tmp_path):
+    import_app_in_subprocess(tmp_path)  # migrate the schema once, as the first boot of a release would
+    lazy_ms, phases = _median_import(tmp_path)
+    eager_ms, _ = _median_import(tmp_path, LAZY_MODULES)
+
+    print(f"\nimport app, median of {_RUNS} runs: {lazy_ms:.0f} ms (all modules eager: {eager_ms:.0f} ms)")
+    for phase, ms in phases.items():
+        print(f"  {phase:<12} {ms:7.1f} ms")
+    assert lazy_ms < eager_ms
+    assert lazy_ms < _BUDGET_MS
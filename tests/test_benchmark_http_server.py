@@ -0,0 +1,75 @@
+"""Load test: container HTTP server throughput by worker count.
+
+Opt-in (``SYNCBOT_BENCHMARKS=1``).  Runs :class:`app._PooledHTTPServer` with a
+handler that spends ``SYNCBOT_BENCHMARK_LATENCY_MS`` (default 20) waiting, the
+way a Slack event waits on Slack, the DB or a federated peer, and drives it
+with ``SYNCBOT_BENCHMARK_CLIENTS`` concurrent clients (default 32) for each
+worker count.  With a single worker requests are served one at a time (the
+old ``HTTPServer``); throughput should grow roughly with the worker count
+until the clients are saturated.
+"""
+
+import http.client
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+
+import pytest
+
+from app import _PooledHTTPServer
+
+pytestmark = pytest.mark.benchmark
+
+_LATENCY = int(os.environ.get("SYNCBOT_BENCHMARK_LATENCY_MS", "20")) / 1000
+_CLIENTS = int(os.environ.get("SYNCBOT_BENCHMARK_CLIENTS", "32"))
+_REQUESTS = 400
+_WORKER_COUNTS = (1, 4, 16)
+
+
+class _IOBoundHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(_LATENCY)
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def _post(port: int) -> int:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        conn.request("POST", "/slack/events", body=b"{}")
+        return conn.getresponse().status
+    finally:
+        conn.close()
+
+
+def _throughput(workers: int) -> float:
+    server = _PooledHTTPServer(("127.0.0.1", 0), _IOBoundHandler, workers=workers, max_in_flight=_REQUESTS)
+    threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True).start()
+    try:
+        with ThreadPoolExecutor(max_workers=_CLIENTS) as clients:
+            start = time.perf_counter()
+            statuses = list(clients.map(lambda _: _post(server.server_port), range(_REQUESTS)))
+            elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.drain(5)
+        server.server_close()
+    assert statuses == [200] * _REQUESTS
+    return _REQUESTS / elapsed
+
+
+def test_throughput_scales_with_workers():
+    results = {workers: _throughput(workers) for workers in _WORKER_COUNTS}
+
+    print(f"\nhttp server, {_REQUESTS} requests, {_LATENCY * 1000:.0f} ms handler latency, {_CLIENTS} clients:")
+    for workers, rps in results.items():
+        print(f"  workers={workers:>2}: {rps:7.1f} req/s ({rps / results[1]:.1f}x)")
+    assert results[4] > 2.5 * results[1]
+    assert results[16] > results[4]
@@ -0,0 +1,95 @@
+"""Benchmark: ``get_post_records`` round trips on a large ``post_meta`` table.
+
+Opt-in (``SYNCBOT_BENCHMARKS=1``).  Seeds ``SYNCBOT_BENCHMARK_ROWS`` PostMeta
+rows (default one million) into SQLite and compares the single-query lookup
+with the previous two-query version (ts lookup, then a join on ``post_id``).
+"""
+
+import os
+import time
+from datetime import UTC, datetime
+
+import pytest
+from sqlalchemy import event, insert
+
+from db import DbManager, schemas
+from helpers.slack_api import get_post_records
+
+pytestmark = pytest.mark.benchmark
+
+_ROWS = int(os.environ.get("SYNCBOT_BENCHMARK_ROWS", "1000000"))
+_CHANNELS = 10
+_LOOKUPS = 200
+
+
+def _legacy_get_post_records(thread_ts: str) -> list:
+    post = DbManager.find_records(schemas.PostMeta, [schemas.PostMeta.ts == float(thread_ts)])
+    if not post:
+        return []
+    return DbManager.find_join_records3(
+        left_cls=schemas.PostMeta,
+        right_cls1=schemas.SyncChannel,
+        right_cls2=schemas.Workspace,
+        filters=[
+            schemas.PostMeta.post_id == post[0].post_id,
+            schemas.SyncChannel.status == "active",
+            schemas.SyncChannel.deleted_at.is_(None),
+        ],
+    )
+
+
+def _seed(engine) -> None:
+    now = datetime.now(UTC)
+    with engine.begin() as conn:
+        conn.execute(insert(schemas.Workspace), [{"id": 1, "team_id": "T1", "workspace_name": "WS", "bot_token": "x"}])
+        conn.execute(insert(schemas.Sync), [{"id": 1, "title": "bench"}])
+        conn.execute(
+            insert(schemas.SyncChannel),
+            [
+                {"id": c, "sync_id": 1, "workspace_id": 1, "channel_id": f"C{c}", "status": "active", "created_at": now}
+                for c in range(1, _CHANNELS + 1)
+            ],
+        )
+        batch: list[dict] = []
+        for i in range(_ROWS):
+            batch.append({"post_id": f"p{i // _CHANNELS}", "sync_channel_id": i % _CHANNELS + 1, "ts": 1e9 + i})
+            if len(batch) == 50_000:
+                conn.execute(insert(schemas.PostMeta), batch)
+                batch = []
+        if batch:
+            conn.execute(insert(schemas.PostMeta), batch)
+
+
+def _measure(engine, fn, timestamps: list[str]) -> tuple[int, float]:
+    statements = 0
+
+    def count(*_args):
+        nonlocal statements
+        statements += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        start = time.perf_counter()
+        for ts in timestamps:
+            assert fn(ts)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return statements, elapsed
+
+
+def test_single_query_lookup_uses_fewer_round_trips(migrated_sqlite_db):
+    _seed(migrated_sqlite_db)
+    step = max(1, _ROWS // _LOOKUPS)
+    timestamps = [f"{1e9 + i:.6f}" for i in range(0, _ROWS, step)][:_LOOKUPS]
+
+    legacy_trips, legacy_s = _measure(migrated_sqlite_db, _legacy_get_post_records, timestamps)
+    new_trips, new_s = _measure(migrated_sqlite_db, get_post_records, timestamps)
+
+    print(
+        f"\npost_meta rows={_ROWS} lookups={len(timestamps)}: "
+        f"legacy {legacy_trips} queries / {legacy_s * 1000:.1f} ms, "
+        f"single-query {new_trips} queries / {new_s * 1000:.1f} ms"
+    )
+    assert new_trips == len(timestamps)
+    assert legacy_trips == 2 * len(timestamps)
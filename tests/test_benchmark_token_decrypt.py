@@ -0,0 +1,49 @@
+"""Benchmark: latency of the first bot-token decrypt in a process.
+
+Opt-in (``SYNCBOT_BENCHMARKS=1``).  The first :func:`helpers.decrypt_bot_token`
+after a cold start derives the Fernet key with PBKDF2 (600,000 iterations)
+unless ``TOKEN_ENCRYPTION_DERIVED_KEY`` supplies it.  Each run clears the
+per-process key caches and times one decrypt, with and without the
+pre-derived key, ``_RUNS`` times.
+"""
+
+import os
+import statistics
+import time
+from unittest.mock import patch
+
+import pytest
+
+import helpers
+from helpers import encryption
+
+pytestmark = pytest.mark.benchmark
+
+_RUNS = 5
+_PASSPHRASE = "benchmark-passphrase-0123456789"
+
+
+def _first_decrypt_ms(env: dict, ciphertext: str) -> float:
+    timings = []
+    with patch.dict(os.environ, env):
+        for _ in range(_RUNS):
+            encryption._derived.cache_clear()
+            encryption._pre_derived.cache_clear()
+            start = time.perf_counter()
+            assert helpers.decrypt_bot_token(ciphertext) == "xoxb-0-0"
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def test_pre_derived_key_removes_the_kdf_from_the_first_decrypt():
+    with patch.dict(os.environ, {"TOKEN_ENCRYPTION_KEY": _PASSPHRASE}):
+        ciphertext = helpers.encrypt_bot_token("xoxb-0-0")
+    derived = encryption.format_derived_key(_PASSPHRASE)
+
+    kdf_ms = _first_decrypt_ms({"TOKEN_ENCRYPTION_KEY": _PASSPHRASE}, ciphertext)
+    pre_derived_ms = _first_decrypt_ms(
+        {"TOKEN_ENCRYPTION_KEY": _PASSPHRASE, "TOKEN_ENCRYPTION_DERIVED_KEY": derived}, ciphertext
+    )
+
+    print(f"\nfirst decrypt, median of {_RUNS}: PBKDF2 {kdf_ms:.1f} ms, pre-derived key {pre_derived_ms:.2f} ms")
+    assert pre_derived_ms * 20 < kdf_ms
@@ -0,0 +1,98 @@
+"""Cold start: lazily imported modules stay out of ``import app``, and the startup profile."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import logger
+
+SYNCBOT_DIR = Path(__file__).resolve().parents[1] / "syncbot"
+
+# Imported on first use only (see the comment above the Bolt imports in app.py).
+LAZY_MODULES = (
+    "alembic",
+    "boto3",
+    "federation.api",
+    "federation.core",
+    "handlers.export_import",
+    "handlers.federation_cmds",
+    "helpers.export_import",
+    "requests",
+    "slack_bolt.adapter.aws_lambda",
+    "slack_sdk.oauth.installation_store.sqlalchemy",
+)
+
+_PROBE = """
+import importlib, json, sys, time
+started = time.perf_counter()
+for name in %r:
+    importlib.import_module(name)
+import app
+elapsed_ms = (time.perf_counter() - started) * 1000
+import logger
+print(json.dumps({
+    "elapsed_ms": elapsed_ms,
+    "loaded": [m for m in %r if m in sys.modules],
+    "phases": logger.cold_start_phases(),
+}))
+"""
+
+
+def import_app_in_subprocess(tmp_path: Path, preload: tuple[str, ...] = ()) -> dict:
+    """Import :mod:`app` in a fresh interpreter; returns its import time, lazy modules loaded and profile.
+
+    Modules in *preload* are imported first, inside the timed window.
+    """
+    env = {
+        **os.environ,
+        "DATABASE_BACKEND": "sqlite",
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'cold_start.db'}",
+        "SLACK_BOT_TOKEN": "xoxb-0-0",
+        "LOG_LEVEL": "ERROR",
+    }
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE % (preload, LAZY_MODULES)],
+        cwd=SYNCBOT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_import_app_leaves_lazy_modules_unloaded(tmp_path):
+    import_app_in_subprocess(tmp_path)  # first boot of a release: migrates the schema (loads Alembic)
+    result = import_app_in_subprocess(tmp_path)
+
+    assert result["loaded"] == []
+    assert [phase for phase, _ in result["phases"]] == ["dotenv", "slack_bolt", "app_modules", "routing", "init"]
+
+
+def test_deferred_routes_call_the_lazily_imported_handler():
+    import routing
+    from slack import actions
+
+    route = routing.VIEW_ACK_MAPPER[actions.CONFIG_BACKUP_RESTORE_SUBMIT]
+    assert route.__name__ == "handle_backup_restore_submit_ack"
+    with patch("handlers.handle_backup_restore_submit_ack", return_value={"response_action": "clear"}) as ack:
+        assert route({}, "client", {}) == {"response_action": "clear"}
+    ack.assert_called_once_with({}, "client", {})
+
+
+def test_cold_start_profile_is_emitted_once(monkeypatch):
+    monkeypatch.setattr(logger, "_cold_start_phases", [])
+    monkeypatch.setattr(logger, "_cold_start_emitted", False)
+    logger.mark_cold_start_phase("imports")
+    logger.mark_cold_start_phase("init")
+
+    with patch.object(logger, "emit_metric") as emit:
+        logger.emit_cold_start_profile()
+        logger.emit_cold_start_profile()
+
+    assert [c.args[0] for c in emit.call_args_list] == ["cold_start_phase", "cold_start_phase", "cold_start_total"]
+    assert [c.kwargs.get("phase") for c in emit.call_args_list] == ["imports", "init", None]
+    assert all(c.kwargs["unit"] == "Milliseconds" for c in emit.call_args_list)
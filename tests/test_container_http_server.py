@@ -52,3 +52,133 @@ def test_health_endpoint_on_container_server() -> None:
             last_err = e
             time.sleep(0.05)
     pytest.fail(f"/health never became ready: {last_err!r}")
+
+
+def _free_port() -> int:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+def _wait_for_health(port: int) -> None:
+    for _ in range(100):
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=0.3):
+                return
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.05)
+    pytest.fail("/health never became ready")
+
+
+def _post_event(port: int, results: list) -> None:
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/slack/events", data=b"{}", method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as r:
+            results.append(r.status)
+    except urllib.error.HTTPError as e:
+        results.append(e.code)
+
+
+@pytest.fixture
+def slow_bolt():
+    """Make ``/slack/events`` block until the returned event is set."""
+    from slack_bolt.response import BoltResponse
+
+    import app as app_module
+
+    release = threading.Event()
+    started = threading.Semaphore(0)
+
+    def dispatch(_req):
+        started.release()
+        release.wait(5)
+        return BoltResponse(status=200, body="")
+
+    with patch.object(app_module.app, "dispatch", side_effect=dispatch):
+        yield release, started
+    release.set()
+
+
+def _serve(**kwargs) -> int:
+    from app import run_syncbot_http_server
+
+    port = _free_port()
+    threading.Thread(
+        target=run_syncbot_http_server,
+        kwargs={"port": port, "http_server_logger_enabled": False, "maintenance_interval_seconds": None, **kwargs},
+        daemon=True,
+    ).start()
+    _wait_for_health(port)
+    return port
+
+
+def test_slow_request_does_not_block_health(slow_bolt) -> None:
+    release, started = slow_bolt
+    port = _serve(workers=2)
+    results: list = []
+    threading.Thread(target=_post_event, args=(port, results), daemon=True).start()
+    assert started.acquire(timeout=2)
+
+    start = time.monotonic()
+    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+        assert r.status == 200
+    assert time.monotonic() - start < 0.5
+    release.set()
+
+
+def test_requests_beyond_the_in_flight_limit_get_503(slow_bolt) -> None:
+    release, started = slow_bolt
+    port = _serve(workers=1, max_in_flight=1)
+    # The readiness probe may still hold the only slot for a moment.
+    for _ in range(20):
+        results: list = []
+        threading.Thread(target=_post_event, args=(port, results), daemon=True).start()
+        if started.acquire(timeout=0.5):
+            break
+    else:
+        pytest.fail("slow request was never admitted")
+
+    _post_event(port, results)
+    assert results == [503]
+    release.set()
+
+
+def test_drain_waits_for_in_flight_requests() -> None:
+    from http.server import BaseHTTPRequestHandler
+
+    from app import _PooledHTTPServer
+
+    release = threading.Event()
+    started = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            started.set()
+            release.wait(5)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = _PooledHTTPServer(("127.0.0.1", 0), Handler, workers=2, max_in_flight=4)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    statuses: list = []
+
+    def get() -> None:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/", timeout=5) as r:
+            statuses.append(r.status)
+
+    client = threading.Thread(target=get, daemon=True)
+    client.start()
+    assert started.wait(2)
+    server.shutdown()
+
+    assert server.drain(0.1) is False
+    release.set()
+    client.join(2)
+    assert statuses == [204]
+    assert server.in_flight == 0
+    server.server_close()
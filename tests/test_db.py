@@ -251,3 +251,228 @@ class TestBackendParity:
             else:
                 os.environ.setdefault("DATABASE_BACKEND", "mysql")
             importlib.reload(c)
+
+
+# -----------------------------------------------------------------------
+# Secondary indexes (002_secondary_indexes) cover the hot lookup queries
+# -----------------------------------------------------------------------
+
+
+class TestHotQueriesUseIndexes:
+    @pytest.fixture
+    def migrated_engine(self, migrated_sqlite_db):
+        return migrated_sqlite_db
+
+    @staticmethod
+    def _query_plan(engine, stmt) -> str:
+        compiled = stmt.compile(dialect=engine.dialect)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        with engine.connect() as conn:
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}", params).fetchall()
+        return " | ".join(str(row[-1]) for row in rows)
+
+    def test_alembic_at_head(self, migrated_engine):
+        from sqlalchemy import text
+
+        with migrated_engine.connect() as conn:
+            assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == "005_federation_user_sync"
+
+    @pytest.mark.parametrize(
+        ("name", "expected_index"),
+        [
+            ("post_meta_by_ts", "ix_post_meta_ts"),
+            ("post_meta_by_post_id", "ix_post_meta_post_id_sync_channel_id"),
+            ("sync_channels_by_channel_id", "ix_sync_channels_channel_id"),
+            ("sync_channels_by_sync_id", "ix_sync_channels_sync_id_workspace_id"),
+            ("user_directory_by_user", "ix_user_directory_workspace_id_slack_user_id"),
+            ("user_mapping_by_source_target", "ix_user_mappings_source_target"),
+            ("user_mapping_unmatched_for_target", "ix_user_mappings_target_workspace_id_match_method"),
+        ],
+    )
+    def test_hot_query_uses_index(self, migrated_engine, name, expected_index):
+        from sqlalchemy import select
+
+        from db import schemas
+
+        queries = {
+            "post_meta_by_ts": select(schemas.PostMeta).where(schemas.PostMeta.ts == 1700000000.123456),
+            "post_meta_by_post_id": select(schemas.PostMeta).where(schemas.PostMeta.post_id == "abc"),
+            "sync_channels_by_channel_id": select(schemas.SyncChannel).where(
+                schemas.SyncChannel.channel_id == "C123",
+                schemas.SyncChannel.deleted_at.is_(None),
+                schemas.SyncChannel.status == "active",
+            ),
+            "sync_channels_by_sync_id": select(schemas.SyncChannel).where(
+                schemas.SyncChannel.sync_id == 7,
+                schemas.SyncChannel.deleted_at.is_(None),
+            ),
+            "user_directory_by_user": select(schemas.UserDirectory).where(
+                schemas.UserDirectory.workspace_id == 1,
+                schemas.UserDirectory.slack_user_id == "U1",
+            ),
+            "user_mapping_by_source_target": select(schemas.UserMapping).where(
+                schemas.UserMapping.source_workspace_id == 1,
+                schemas.UserMapping.source_user_id == "U1",
+                schemas.UserMapping.target_workspace_id == 2,
+            ),
+            "user_mapping_unmatched_for_target": select(schemas.UserMapping).where(
+                schemas.UserMapping.target_workspace_id == 2,
+                schemas.UserMapping.match_method == "none",
+            ),
+        }
+        plan = self._query_plan(migrated_engine, queries[name])
+        assert expected_index in plan, plan
+
+
+# -----------------------------------------------------------------------
+# Request-scoped session
+# -----------------------------------------------------------------------
+
+
+class TestRequestSession:
+    @pytest.fixture
+    def checkouts(self, migrated_sqlite_db):
+        from sqlalchemy import event
+
+        counter = {"n": 0}
+
+        def on_checkout(*_args):
+            counter["n"] += 1
+
+        event.listen(migrated_sqlite_db, "checkout", on_checkout)
+        yield counter
+        event.remove(migrated_sqlite_db, "checkout", on_checkout)
+
+    @staticmethod
+    def _workspace(team_id: str):
+        from db import schemas
+
+        return schemas.Workspace(team_id=team_id, workspace_name=team_id, bot_token="x")
+
+    def test_calls_share_one_connection(self, checkouts):
+        from db import DbManager, request_session, schemas
+
+        with request_session():
+            ws = DbManager.create_record(self._workspace("T1"))
+            DbManager.get_record(schemas.Workspace, ws.id)
+            DbManager.find_records(schemas.Workspace, [schemas.Workspace.team_id == "T1"])
+            DbManager.update_record(schemas.Workspace, ws.id, {schemas.Workspace.workspace_name: "renamed"})
+        assert checkouts["n"] == 1
+
+    def test_without_scope_each_call_checks_out(self, checkouts):
+        from db import DbManager, schemas
+
+        DbManager.create_record(self._workspace("T1"))
+        DbManager.find_records(schemas.Workspace, [schemas.Workspace.team_id == "T1"])
+        assert checkouts["n"] == 2
+
+    def test_scope_is_lazy(self, checkouts):
+        from db import request_session
+
+        with request_session():
+            pass
+        assert checkouts["n"] == 0
+
+    def test_writes_are_visible_outside_the_scope(self, migrated_sqlite_db):
+        from db import DbManager, request_session, schemas
+
+        with request_session():
+            DbManager.create_record(self._workspace("T1"))
+            with migrated_sqlite_db.connect() as conn:
+                rows = conn.execute(schemas.Workspace.__table__.select()).fetchall()
+        assert [r.team_id for r in rows] == ["T1"]
+
+    def test_returned_records_are_detached(self, migrated_sqlite_db):
+        from sqlalchemy import inspect as sa_inspect
+
+        from db import DbManager, request_session, schemas
+
+        with request_session():
+            ws = DbManager.create_record(self._workspace("T1"))
+            found = DbManager.find_records(schemas.Workspace, [schemas.Workspace.id == ws.id])
+            assert sa_inspect(found[0]).detached
+
+    def test_worker_threads_use_their_own_sessions(self, migrated_sqlite_db):
+        from concurrent.futures import ThreadPoolExecutor
+
+        from db import get_session, request_session
+
+        with request_session():
+            scoped = get_session()
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                other = pool.submit(get_session).result()
+        assert other is not scoped
+        other.close()
+
+    def test_retry_reconnects_inside_scope(self, migrated_sqlite_db):
+        import db as db_mod
+
+        calls = {"n": 0}
+
+        @_with_retry
+        def flaky():
+            session = db_mod.get_session()
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise OperationalError("SELECT 1", {}, Exception("connection reset"))
+            return session
+
+        with db_mod.request_session():
+            first = db_mod.get_session()
+            second = flaky()
+        assert second is not first
+
+
+# -----------------------------------------------------------------------
+# Startup fast path: skip Alembic when the schema is at head
+# -----------------------------------------------------------------------
+
+
+class TestInitializeDatabaseFastPath:
+    def test_head_constant_matches_migrations(self):
+        from alembic.script import ScriptDirectory
+
+        import db as db_mod
+
+        assert ScriptDirectory.from_config(db_mod._alembic_config()).get_current_head() == db_mod.SCHEMA_HEAD_REVISION
+
+    def test_schema_at_head_skips_alembic(self, migrated_sqlite_db):
+        import db as db_mod
+
+        with (
+            patch.object(db_mod, "_run_alembic_upgrade") as upgrade,
+            patch.object(db_mod, "_ensure_database_exists") as ensure,
+            patch.object(db_mod, "emit_metric") as emit,
+        ):
+            db_mod.initialize_database()
+
+        upgrade.assert_not_called()
+        ensure.assert_not_called()
+        assert emit.call_args.args[0] == "cold_start_phase"
+        assert emit.call_args.kwargs == {"unit": "Milliseconds", "phase": "db_init", "path": "fast"}
+
+    def test_older_schema_is_migrated(self, migrated_sqlite_db):
+        from sqlalchemy import text
+
+        import db as db_mod
+
+        with migrated_sqlite_db.begin() as conn:
+            conn.execute(text("UPDATE alembic_version SET version_num = '004_federation_outbox'"))
+        with patch.object(db_mod, "emit_metric") as emit:
+            db_mod.initialize_database()
+
+        assert db_mod._schema_revision() == db_mod.SCHEMA_HEAD_REVISION
+        assert emit.call_args.kwargs["path"] == "migrate"
+
+    def test_migrate_entry_point_always_upgrades(self, migrated_sqlite_db):
+        import db as db_mod
+        from db import migrate
+
+        with patch.object(db_mod, "_run_alembic_upgrade") as upgrade:
+            assert migrate.main() == 0
+        upgrade.assert_called_once()
+
+        with patch.object(db_mod, "_run_alembic_upgrade", side_effect=RuntimeError("boom")), patch.object(
+            db_mod, "_DB_INIT_MAX_ATTEMPTS", 1
+        ):
+            assert migrate.main() == 1
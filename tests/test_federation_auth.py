@@ -0,0 +1,85 @@
+"""Tests for inbound federation request verification and the verified-peer cache."""
+
+import base64
+import time
+from unittest.mock import patch
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+import helpers
+from db import DbManager, schemas
+from federation import api as federation_api
+from federation import core as federation_core
+
+
+def _keypair():
+    private_key = Ed25519PrivateKey.generate()
+    pem = private_key.public_key().public_bytes(Encoding.PEM, PublicFormat.SubjectPublicKeyInfo).decode()
+    return private_key, pem
+
+
+def _headers(private_key, body, instance_id="remote-1"):
+    ts = str(int(time.time()))
+    sig = base64.b64encode(private_key.sign(f"{ts}:{body}".encode())).decode()
+    return {
+        "X-Federation-Signature": sig,
+        "X-Federation-Timestamp": ts,
+        "X-Federation-Instance": instance_id,
+    }
+
+
+@pytest.fixture
+def peer_key(migrated_sqlite_db):
+    helpers._CACHE.clear()
+    private_key, pem = _keypair()
+    federation_core.get_or_create_federated_workspace("remote-1", "https://remote.example", pem)
+    yield private_key
+    helpers._CACHE.clear()
+
+
+class TestVerifiedPeerCache:
+    def test_repeat_requests_skip_the_db_and_pem_parse(self, peer_key):
+        body = '{"text": "hi"}'
+        with (
+            patch.object(DbManager, "find_records", wraps=DbManager.find_records) as find,
+            patch.object(federation_core, "load_pem_public_key", wraps=federation_core.load_pem_public_key) as load,
+        ):
+            for _ in range(3):
+                fed_ws = federation_api._verify_federated_request(body, _headers(peer_key, body))
+                assert fed_ws.instance_id == "remote-1"
+
+        assert find.call_count == 1
+        assert load.call_count == 1
+        assert helpers.cache_stats()["federation_peer"]["hits"] == 2
+
+    def test_bad_signature_is_rejected(self, peer_key):
+        other_key, _ = _keypair()
+        body = "{}"
+        assert federation_api._verify_federated_request(body, _headers(other_key, body)) is None
+        assert federation_api._verify_federated_request(body, _headers(peer_key, body, "unknown")) is None
+
+    def test_re_pairing_replaces_the_cached_key(self, peer_key):
+        body = "{}"
+        assert federation_api._verify_federated_request(body, _headers(peer_key, body))
+
+        new_key, new_pem = _keypair()
+        federation_core.get_or_create_federated_workspace("remote-1", "https://remote.example", new_pem)
+
+        assert federation_api._verify_federated_request(body, _headers(peer_key, body)) is None
+        assert federation_api._verify_federated_request(body, _headers(new_key, body))
+
+    def test_key_changed_by_another_instance_is_reloaded(self, peer_key):
+        body = "{}"
+        assert federation_api._verify_federated_request(body, _headers(peer_key, body))
+
+        new_key, new_pem = _keypair()
+        DbManager.update_records(
+            schemas.FederatedWorkspace,
+            [schemas.FederatedWorkspace.instance_id == "remote-1"],
+            {schemas.FederatedWorkspace.public_key: new_pem},
+        )
+
+        assert federation_api._verify_federated_request(body, _headers(new_key, body))
+        assert federation_api._verify_federated_request(body, _headers(new_key, body))
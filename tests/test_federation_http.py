@@ -0,0 +1,194 @@
+"""Tests for federation transport: pooled client sessions and batched events."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from federation import api as federation_api
+from federation import core as federation_core
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    supports_batch = True
+    paths: list[str] = []
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length)) if length else {}
+        self.paths.append(self.path)
+        status, response = 200, {"ok": True, "ts": "1.000001"}
+        if self.path == federation_core.BATCH_PATH:
+            if self.supports_batch:
+                response = {
+                    "ok": True,
+                    "results": [
+                        {"status": 200, "body": {"ok": True, "ts": e["payload"]["ts"]}}
+                        if e["payload"].get("ts")
+                        else {"status": 404, "body": {"message": "Not Found"}}
+                        for e in request["events"]
+                    ],
+                }
+            else:
+                status, response = 404, {"message": "Not Found"}
+        body = json.dumps(response).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _reply
+    do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def remote():
+    _OkHandler.paths = []
+    _OkHandler.supports_batch = True
+    federation_core._batch_unsupported.clear()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    federation_core.close_federation_sessions()
+    yield SimpleNamespace(instance_id="remote-1", webhook_url=f"http://127.0.0.1:{server.server_port}/")
+    federation_core.close_federation_sessions()
+    server.shutdown()
+    server.server_close()
+
+
+def _metric_totals(emit):
+    totals: dict[str, float] = {}
+    for call in emit.call_args_list:
+        totals[call.args[0]] = totals.get(call.args[0], 0) + call.args[1]
+    return totals
+
+
+class TestFederationSessions:
+    def test_pushes_reuse_one_connection(self, remote):
+        with (
+            patch.object(federation_core, "federation_sign", return_value=("sig", "1")),
+            patch.object(federation_core, "get_instance_id", return_value="local-1"),
+            patch.object(federation_core, "emit_metric") as emit,
+        ):
+            for _ in range(3):
+                assert federation_core.push_message(remote, {"text": "hi"})["ok"] is True
+            assert federation_core.ping_federated_workspace(remote) is True
+
+        assert _metric_totals(emit) == {
+            "federation_http_connections_opened": 1,
+            "federation_http_connections_reused": 3,
+        }
+
+    def test_one_session_per_webhook_url(self, remote):
+        base = remote.webhook_url
+        assert federation_core._federation_session(base) is federation_core._federation_session(base.rstrip("/"))
+        assert federation_core._federation_session(base) is not federation_core._federation_session(
+            "https://other.example"
+        )
+
+
+@pytest.fixture
+def signed():
+    with (
+        patch.object(federation_core, "federation_sign", return_value=("sig", "1")),
+        patch.object(federation_core, "get_instance_id", return_value="local-1"),
+    ):
+        yield
+
+
+class TestPushBatch:
+    def test_events_share_one_envelope(self, remote, signed):
+        events = [("message", {"ts": "1.1"}), ("edit", {}), ("message", {"ts": "3.3"})]
+        results = federation_core.push_batch(remote, events)
+
+        assert results == [{"ok": True, "ts": "1.1"}, None, {"ok": True, "ts": "3.3"}]
+        assert _OkHandler.paths == [federation_core.BATCH_PATH]
+
+    def test_large_batches_are_split(self, remote, signed):
+        events = [("message", {"ts": str(i)}) for i in range(federation_core.BATCH_MAX_EVENTS + 1)]
+        results = federation_core.push_batch(remote, events)
+
+        assert [r["ts"] for r in results] == [str(i) for i in range(len(events))]
+        assert _OkHandler.paths == [federation_core.BATCH_PATH] * 2
+
+    def test_batches_are_split_by_payload_size(self, remote, signed):
+        events = [("message", {"ts": str(i), "text": "x" * 100}) for i in range(5)]
+        with patch.object(federation_core, "BATCH_MAX_BYTES", 250):
+            results = federation_core.push_batch(remote, events)
+
+        assert [r["ts"] for r in results] == [str(i) for i in range(5)]
+        assert _OkHandler.paths == [federation_core.BATCH_PATH] * 3
+
+    def test_older_peer_falls_back_to_single_events(self, remote, signed):
+        _OkHandler.supports_batch = False
+        events = [("message", {"ts": "1.1"}), ("delete", {}), ("react", {})]
+
+        assert all(r["ok"] for r in federation_core.push_batch(remote, events))
+        assert all(r["ok"] for r in federation_core.push_batch(remote, events))
+        singles = ["/api/federation/message", "/api/federation/message/delete", "/api/federation/message/react"]
+        assert _OkHandler.paths == [federation_core.BATCH_PATH, *singles, *singles]
+
+
+class TestHandleBatch:
+    def test_events_are_applied_in_order(self):
+        fed_ws = SimpleNamespace(instance_id="remote-1")
+        calls = []
+
+        def handler(name, status):
+            def handle(payload, ws):
+                calls.append((name, payload["n"]))
+                return status, {"ok": status == 200}
+
+            return handle
+
+        body = {
+            "events": [
+                {"type": "message", "payload": {"n": 1}},
+                {"type": "bogus", "payload": {"n": 2}},
+                {"type": "react", "payload": {"n": 3}},
+                {"type": "edit", "payload": {"n": 4}},
+            ]
+        }
+        with (
+            patch.object(federation_api, "handle_message", handler("message", 200)),
+            patch.object(federation_api, "handle_message_react", handler("react", 404)),
+            patch.object(federation_api, "handle_message_edit", handler("edit", 200)),
+        ):
+            status, response = federation_api.handle_batch(body, fed_ws)
+
+        assert status == 200
+        assert [r["status"] for r in response["results"]] == [200, 400, 404, 200]
+        assert calls == [("message", 1), ("react", 3), ("edit", 4)]
+
+    def test_failing_event_does_not_fail_the_envelope(self):
+        fed_ws = SimpleNamespace(instance_id="remote-1")
+        applied = []
+
+        def handle(payload, ws):
+            if payload["n"] == 2:
+                raise ValueError("undecryptable token")
+            applied.append(payload["n"])
+            return 200, {"ok": True}
+
+        body = {"events": [{"type": "message", "payload": {"n": n}} for n in (1, 2, 3)]}
+        with patch.object(federation_api, "handle_message", handle):
+            status, response = federation_api.handle_batch(body, fed_ws)
+
+        assert status == 200
+        assert [r["status"] for r in response["results"]] == [200, 500, 200]
+        assert applied == [1, 3]
+
+    def test_rejects_oversized_or_empty_envelopes(self):
+        fed_ws = SimpleNamespace(instance_id="remote-1")
+        too_many = {"events": [{"type": "delete", "payload": {}}] * (federation_core.BATCH_MAX_EVENTS + 1)}
+
+        assert federation_api.handle_batch({}, fed_ws)[0] == 400
+        assert federation_api.handle_batch(too_many, fed_ws) == (400, {"error": "too_many_events"})
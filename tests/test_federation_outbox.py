@@ -0,0 +1,130 @@
+"""Tests for the federation outbox (queued delivery, backoff, dead letters)."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from db import DbManager, schemas
+from federation import core as federation_core
+from federation import outbox
+
+_Outbox = schemas.FederationOutbox
+
+
+@pytest.fixture
+def peer(migrated_sqlite_db):
+    now = datetime.now(UTC)
+    fed_ws = DbManager.create_record(
+        schemas.FederatedWorkspace(
+            instance_id="remote-1",
+            webhook_url="https://remote.example",
+            public_key="pem",
+            status="active",
+            created_at=now,
+        )
+    )
+    workspace = DbManager.create_record(schemas.Workspace(team_id="T1", workspace_name="W", bot_token="x"))
+    sync = DbManager.create_record(schemas.Sync(title="S"))
+    channel = DbManager.create_record(
+        schemas.SyncChannel(sync_id=sync.id, workspace_id=workspace.id, channel_id="C1", created_at=now)
+    )
+    return fed_ws, channel
+
+
+def _rows():
+    return DbManager.find_records(_Outbox, [_Outbox.id > 0], order_by=_Outbox.id)
+
+
+def _events(channel, n):
+    return [("message", {"post_id": f"p{i}", "channel_id": "C1"}, channel.id) for i in range(n)]
+
+
+class TestDeliverOutbox:
+    def test_delivered_rows_are_removed_and_ts_reconciled(self, peer):
+        fed_ws, channel = peer
+        DbManager.create_record(schemas.PostMeta(post_id="p0", sync_channel_id=channel.id, ts=100.0))
+        ids = outbox.enqueue_events(fed_ws, _events(channel, 2))
+
+        with patch.object(federation_core, "deliver_events", return_value=[(200, {"ts": "555.000001"})] * 2) as send:
+            delivered = outbox.deliver_outbox(fed_ws.id)
+
+        assert sorted(delivered) == ids
+        assert send.call_count == 1
+        assert [kind for kind, _payload in send.call_args.args[1]] == ["message", "message"]
+        assert _rows() == []
+        post_meta = DbManager.find_records(schemas.PostMeta, [schemas.PostMeta.post_id == "p0"])
+        assert float(post_meta[0].ts) == pytest.approx(555.000001)
+
+    def test_transient_failure_backs_off_and_holds_the_peer(self, peer):
+        fed_ws, channel = peer
+        outbox.enqueue_events(fed_ws, _events(channel, 2))
+
+        with patch.object(federation_core, "deliver_events", return_value=[(None, None)] * 2):
+            assert outbox.deliver_outbox(fed_ws.id) == {}
+        head, second = _rows()
+        assert (head.attempts, head.status, head.last_error) == (1, "pending", "no response")
+        assert head.next_attempt_at.replace(tzinfo=UTC) > datetime.now(UTC)
+
+        outbox.enqueue_events(fed_ws, _events(channel, 1))
+        with patch.object(federation_core, "deliver_events") as send:
+            assert outbox.deliver_outbox(fed_ws.id) == {}
+        send.assert_not_called()
+
+        DbManager.update_records(_Outbox, [_Outbox.id > 0], {_Outbox.next_attempt_at: datetime.now(UTC)})
+        with patch.object(federation_core, "deliver_events", return_value=[(200, {"ok": True})] * 3):
+            assert len(outbox.deliver_outbox(fed_ws.id)) == 3
+        assert _rows() == []
+
+    def test_rejected_and_exhausted_events_are_dead_lettered(self, peer):
+        fed_ws, channel = peer
+        outbox.enqueue_events(fed_ws, _events(channel, 2))
+        DbManager.update_records(_Outbox, [_Outbox.id == _rows()[1].id], {_Outbox.attempts: 99})
+
+        with (
+            patch.object(federation_core, "deliver_events", return_value=[(400, None), (503, None)]),
+            patch.object(outbox, "emit_metric") as emit,
+        ):
+            outbox.deliver_outbox(fed_ws.id)
+
+        assert [(r.status, r.last_error) for r in _rows()] == [("dead", "status 400"), ("dead", "status 503")]
+        assert [c.args[:2] for c in emit.call_args_list] == [("federation_outbox_dead_lettered", 2)]
+
+        with patch.object(federation_core, "deliver_events") as send:
+            outbox.deliver_outbox(fed_ws.id)
+        send.assert_not_called()
+
+    def test_background_delivery_leaves_fresh_rows_to_the_handler(self, peer):
+        fed_ws, channel = peer
+        outbox.enqueue_events(fed_ws, _events(channel, 1))
+
+        with patch.object(federation_core, "deliver_events") as send:
+            assert outbox.deliver_outbox(settle_seconds=outbox.BACKGROUND_SETTLE_SECONDS) == {}
+        send.assert_not_called()
+
+        old = datetime.now(UTC) - timedelta(minutes=5)
+        DbManager.update_records(_Outbox, [_Outbox.id > 0], {_Outbox.created_at: old, _Outbox.next_attempt_at: old})
+        with patch.object(federation_core, "deliver_events", return_value=[(200, {"ok": True})]):
+            assert len(outbox.deliver_outbox(settle_seconds=outbox.BACKGROUND_SETTLE_SECONDS)) == 1
+
+    def test_max_envelopes_leaves_the_backlog_for_later(self, peer):
+        fed_ws, channel = peer
+        outbox.enqueue_events(fed_ws, _events(channel, 3))
+
+        with (
+            patch.object(federation_core, "BATCH_MAX_EVENTS", 2),
+            patch.object(federation_core, "deliver_events", return_value=[(200, {"ok": True})] * 2) as send,
+        ):
+            assert len(outbox.deliver_outbox(fed_ws.id, max_envelopes=1)) == 2
+
+        send.assert_called_once()
+        assert [row.payload for row in _rows()] == ['{"post_id": "p2", "channel_id": "C1"}']
+
+    def test_only_one_worker_claims_a_peer(self, peer):
+        fed_ws, channel = peer
+        outbox.enqueue_events(fed_ws, _events(channel, 1))
+        head = _rows()[0]
+        now = datetime.now(UTC)
+
+        assert outbox._claim(head, now) is True
+        assert outbox._claim(head, now) is False
@@ -58,8 +58,8 @@ class TestFederationReactionFallback:
         with (
             patch.object(federation_api, "_resolve_channel_for_federated", return_value=(sync_channel, workspace)),
             patch.object(federation_api, "_find_post_records", return_value=[post_meta]),
-            patch.object(federation_api.helpers, "decrypt_bot_token", return_value="xoxb-test"),
-            patch.object(federation_api, "WebClient", return_value=ws_client),
+            patch.object(federation_api.helpers, "get_bot_token", return_value="xoxb-test"),
+            patch.object(federation_api.helpers, "get_workspace_client", return_value=ws_client),
             patch.object(federation_api.helpers, "post_message", return_value={"ts": "200.000001"}) as post_message_mock,
         ):
             status, resp = federation_api.handle_message_react(body, fed_ws)
@@ -102,8 +102,8 @@ class TestFederationReactionFallback:
         with (
             patch.object(federation_api, "_resolve_channel_for_federated", return_value=(sync_channel, workspace)),
             patch.object(federation_api, "_find_post_records", return_value=[post_meta]),
-            patch.object(federation_api.helpers, "decrypt_bot_token", return_value="xoxb-test"),
-            patch.object(federation_api, "WebClient", return_value=ws_client),
+            patch.object(federation_api.helpers, "get_bot_token", return_value="xoxb-test"),
+            patch.object(federation_api.helpers, "get_workspace_client", return_value=ws_client),
             patch.object(federation_api.helpers, "post_message") as post_message_mock,
         ):
             status, resp = federation_api.handle_message_react(body, fed_ws)
@@ -131,8 +131,8 @@ class TestFederationReactionFallback:
         with (
             patch.object(federation_api, "_resolve_channel_for_federated", return_value=(sync_channel, workspace)),
             patch.object(federation_api, "_find_post_records", return_value=[post_meta]),
-            patch.object(federation_api.helpers, "decrypt_bot_token", return_value="xoxb-test"),
-            patch.object(federation_api, "WebClient", return_value=ws_client),
+            patch.object(federation_api.helpers, "get_bot_token", return_value="xoxb-test"),
+            patch.object(federation_api.helpers, "get_workspace_client", return_value=ws_client),
             patch.object(federation_api.helpers, "post_message") as post_message_mock,
         ):
             status, resp = federation_api.handle_message_react(body, fed_ws)
@@ -166,8 +166,8 @@ class TestFederationReactionFallback:
         with (
             patch.object(federation_api, "_resolve_channel_for_federated", return_value=(sync_channel, workspace)),
             patch.object(federation_api, "_find_post_records", return_value=[post_meta]),
-            patch.object(federation_api.helpers, "decrypt_bot_token", return_value="xoxb-test"),
-            patch.object(federation_api, "WebClient", return_value=ws_client),
+            patch.object(federation_api.helpers, "get_bot_token", return_value="xoxb-test"),
+            patch.object(federation_api.helpers, "get_workspace_client", return_value=ws_client),
             patch.object(federation_api.helpers, "post_message") as post_message_mock,
         ):
             status, resp = federation_api.handle_message_react(body, fed_ws)
@@ -199,8 +199,8 @@ class TestFederationReactionFallback:
         with (
             patch.object(federation_api, "_resolve_channel_for_federated", return_value=(sync_channel, workspace)),
             patch.object(federation_api, "_find_post_records", return_value=[post_meta]),
-            patch.object(federation_api.helpers, "decrypt_bot_token", return_value="xoxb-test"),
-            patch.object(federation_api, "WebClient", return_value=ws_client),
+            patch.object(federation_api.helpers, "get_bot_token", return_value="xoxb-test"),
+            patch.object(federation_api.helpers, "get_workspace_client", return_value=ws_client),
             patch.object(federation_api.helpers, "post_message", return_value={"ts": "200.000001"}) as post_message_mock,
         ):
             status, resp = federation_api.handle_message_react(body, fed_ws)
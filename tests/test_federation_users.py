@@ -0,0 +1,175 @@
+"""Tests for the paginated, delta federation user directory exchange."""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+import helpers
+from db import DbManager, schemas
+from federation import api as federation_api
+from federation import core as federation_core
+from federation import users as federation_users
+
+_Dir = schemas.UserDirectory
+
+
+@pytest.fixture
+def shared(migrated_sqlite_db):
+    helpers._CACHE.clear()
+    now = datetime.now(UTC)
+    local = DbManager.create_record(schemas.Workspace(team_id="T1", workspace_name="Local", bot_token="x"))
+    fed_ws = DbManager.create_record(
+        schemas.FederatedWorkspace(
+            instance_id="remote-1",
+            webhook_url="https://remote.example",
+            public_key="pem",
+            status="active",
+            created_at=now,
+        )
+    )
+    group = DbManager.create_record(
+        schemas.WorkspaceGroup(name="G", invite_code="ABC", created_at=now, created_by_workspace_id=local.id)
+    )
+    DbManager.create_records(
+        [
+            schemas.WorkspaceGroupMember(group_id=group.id, workspace_id=local.id, status="active", joined_at=now),
+            schemas.WorkspaceGroupMember(group_id=group.id, federated_workspace_id=fed_ws.id, status="active"),
+        ]
+    )
+    yield local, fed_ws
+    helpers._CACHE.clear()
+
+
+def _add_users(workspace_id, n, updated_at, prefix="U"):
+    DbManager.insert_rows(
+        _Dir,
+        [
+            {
+                "workspace_id": workspace_id,
+                "slack_user_id": f"{prefix}{i}",
+                "real_name": f"User {i}",
+                "display_name": f"user{i}",
+                "updated_at": updated_at,
+            }
+            for i in range(n)
+        ],
+    )
+
+
+class TestChangedUsers:
+    def test_pages_follow_the_keyset_cursor(self, shared):
+        local, _ = shared
+        stamp = datetime(2026, 1, 1, 12, 0, 0)
+        _add_users(local.id, 5, stamp)
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            users, cursor, watermark = federation_users.changed_users([local.id], None, cursor, 2)
+            seen += [u["user_id"] for u in users]
+            pages += 1
+            if cursor is None:
+                break
+
+        assert sorted(seen) == [f"U{i}" for i in range(5)]
+        assert pages == 3
+        assert watermark == stamp
+
+    def test_delta_includes_only_changes_and_deactivations(self, shared):
+        local, _ = shared
+        old = datetime(2026, 1, 1)
+        _add_users(local.id, 3, old)
+        later = old + timedelta(hours=1)
+        DbManager.update_records(_Dir, [_Dir.slack_user_id == "U1"], {_Dir.deleted_at: later, _Dir.updated_at: later})
+
+        users, cursor, watermark = federation_users.changed_users([local.id], old + timedelta(minutes=30), None, 10)
+
+        assert users == [
+            {
+                "user_id": "U1",
+                "email": None,
+                "real_name": "User 1",
+                "display_name": "user1",
+                "workspace_id": local.id,
+                "deleted": True,
+            }
+        ]
+        assert (cursor, watermark) == (None, later)
+
+
+class TestHandleUsers:
+    def test_receives_in_bulk_and_returns_one_page(self, shared):
+        local, fed_ws = shared
+        _add_users(local.id, 3, datetime(2026, 1, 1))
+        remote_users = [{"user_id": f"R{i}", "real_name": f"Remote {i}"} for i in range(50)]
+
+        with patch.object(DbManager, "find_records", wraps=DbManager.find_records) as find:
+            status, body = federation_api.handle_users({"users": remote_users, "workspace_id": 99, "limit": 2}, fed_ws)
+
+        assert status == 200
+        assert len(body["users"]) == 2
+        assert body["next_cursor"]
+        assert find.call_count < 10
+        assert len(DbManager.find_records(_Dir, [_Dir.workspace_id == 99])) == 50
+
+        status, body = federation_api.handle_users({"cursor": body["next_cursor"], "limit": 2}, fed_ws)
+        assert [u["user_id"] for u in body["users"]] == ["U2"]
+        assert body["next_cursor"] is None
+
+    def test_rejects_malformed_paging_fields(self, shared):
+        _, fed_ws = shared
+        assert federation_api.handle_users({"cursor": "bogus"}, fed_ws) == (400, {"error": "invalid_cursor"})
+        assert federation_api.handle_users({"since": "yesterday"}, fed_ws)[0] == 400
+
+
+class TestExchangeUserDirectory:
+    def test_later_exchanges_send_only_changes(self, shared, monkeypatch):
+        local, fed_ws = shared
+        monkeypatch.setattr("constants.FEDERATION_USERS_PAGE_SIZE", 2)
+        first = datetime(2026, 1, 1)
+        _add_users(local.id, 3, first)
+        requests = []
+        remote_pages = [
+            {"ok": True, "users": [{"user_id": "R0", "workspace_id": 7}], "next_cursor": "c1", "watermark": "w"},
+            {
+                "ok": True,
+                "users": [{"user_id": "R1", "workspace_id": 7}],
+                "next_cursor": None,
+                "watermark": "2026-02-01T00:00:00",
+            },
+        ]
+
+        def push_users(ws, payload):
+            requests.append(payload)
+            return remote_pages.pop(0) if remote_pages else {"ok": True, "users": [], "next_cursor": None}
+
+        with patch.object(federation_core, "push_users", side_effect=push_users):
+            assert federation_users.exchange_user_directory(fed_ws, local)
+
+        assert [len(r["users"]) for r in requests] == [2, 1]
+        assert [r["cursor"] for r in requests] == [None, "c1"]
+        assert {u.slack_user_id for u in DbManager.find_records(_Dir, [_Dir.workspace_id == 7])} == {"R0", "R1"}
+        state = DbManager.find_records(
+            schemas.FederationUserSync, [schemas.FederationUserSync.workspace_id == local.id]
+        )[0]
+        assert (state.sent_through, state.received_through) == (first, datetime(2026, 2, 1))
+
+        changed = first + timedelta(days=1)
+        DbManager.update_records(_Dir, [_Dir.slack_user_id == "U2"], {_Dir.real_name: "New", _Dir.updated_at: changed})
+        requests.clear()
+        with patch.object(federation_core, "push_users", side_effect=push_users):
+            assert federation_users.exchange_user_directory(fed_ws, local)
+
+        assert [[u["user_id"] for u in r["users"]] for r in requests] == [["U2"]]
+        assert requests[0]["since"] == "2026-02-01T00:00:00"
+
+    def test_failed_exchange_keeps_the_watermarks(self, shared):
+        local, fed_ws = shared
+        _add_users(local.id, 1, datetime(2026, 1, 1))
+
+        with patch.object(federation_core, "push_users", return_value=None):
+            assert federation_users.exchange_user_directory(fed_ws, local) is False
+        assert (
+            DbManager.find_records(schemas.FederationUserSync, [schemas.FederationUserSync.workspace_id == local.id])
+            == []
+        )
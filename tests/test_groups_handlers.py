@@ -46,3 +46,25 @@ class TestJoinGroupSubmit:
         assert extra["workspace_id"] == workspace.id
         assert extra["attempt"] == 1
         assert "code_length" in extra
+
+
+class TestActivateGroupMembership:
+    def test_directories_are_crawled_even_when_not_due(self):
+        from handlers.groups import _activate_group_membership
+
+        workspace = SimpleNamespace(id=1)
+        member_ws = SimpleNamespace(id=2, bot_token="enc", deleted_at=None)
+        member = SimpleNamespace(workspace_id=2)
+        member_client = MagicMock()
+
+        with (
+            patch("handlers.groups.DbManager.find_records", return_value=[member]),
+            patch("handlers.groups.helpers.get_workspace_by_id", return_value=member_ws),
+            patch("handlers.groups.helpers.get_workspace_client", return_value=member_client),
+            patch("handlers.groups.helpers._refresh_user_directory") as refresh,
+            patch("handlers.groups.helpers.seed_user_mappings"),
+            patch("handlers.groups.helpers.run_auto_match_for_workspace"),
+        ):
+            _activate_group_membership(MagicMock(), workspace, SimpleNamespace(id=9))
+
+        assert [(c.args[1], c.kwargs) for c in refresh.call_args_list] == [(1, {"force": True}), (2, {"force": True})]
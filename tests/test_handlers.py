@@ -23,16 +23,6 @@ from handlers.groups import _generate_invite_code
 
 
 class TestParseEventFields:
-    def _make_client(self):
-        client = MagicMock()
-        client.users_info.return_value = {
-            "user": {
-                "id": "U123",
-                "profile": {"display_name": "TestUser", "real_name": "Test User"},
-            }
-        }
-        return client
-
     def test_basic_message(self):
         body = {
             "team_id": "T001",
@@ -44,7 +34,7 @@ class TestParseEventFields:
                 "ts": "1234567890.000001",
             },
         }
-        ctx = _parse_event_fields(body, self._make_client())
+        ctx = _parse_event_fields(body)
         assert ctx["team_id"] == "T001"
         assert ctx["channel_id"] == "C001"
         assert ctx["user_id"] == "U001"
@@ -61,7 +51,7 @@ class TestParseEventFields:
                 "ts": "1234567890.000001",
             },
         }
-        ctx = _parse_event_fields(body, self._make_client())
+        ctx = _parse_event_fields(body)
         assert ctx["msg_text"] == " "
 
     def test_message_changed_subtype(self):
@@ -78,7 +68,7 @@ class TestParseEventFields:
                 },
             },
         }
-        ctx = _parse_event_fields(body, self._make_client())
+        ctx = _parse_event_fields(body)
         assert ctx["event_subtype"] == "message_changed"
         assert ctx["msg_text"] == "Edited text"
         assert ctx["user_id"] == "U001"
@@ -95,10 +85,20 @@ class TestParseEventFields:
                 },
             },
         }
-        ctx = _parse_event_fields(body, self._make_client())
+        ctx = _parse_event_fields(body)
         assert ctx["event_subtype"] == "message_deleted"
         assert ctx["ts"] == "1234567890.000001"
 
+    def test_mentions_are_not_resolved_while_parsing(self):
+        body = {
+            "team_id": "T001",
+            "event": {"type": "message", "channel": "C001", "user": "U001", "text": "hi <@U002>", "ts": "1.0"},
+        }
+        with patch("handlers.messages.helpers.parse_mentioned_users") as parse:
+            ctx = _parse_event_fields(body)
+        parse.assert_not_called()
+        assert ctx["mentioned_users"] is None
+
 
 # -----------------------------------------------------------------------
 # EventContext TypedDict
@@ -208,13 +208,6 @@ class TestIsOwnBotMessage:
 
 
 class TestParseEventFieldsBotMessage:
-    def _make_client(self):
-        client = MagicMock()
-        client.users_info.return_value = {
-            "user": {"id": "U123", "profile": {"display_name": "TestUser", "real_name": "Test User"}}
-        }
-        return client
-
     def test_bot_message_has_no_user_id(self):
         body = {
             "team_id": "T001",
@@ -228,7 +221,7 @@ class TestParseEventFieldsBotMessage:
                 "channel": "C001",
             },
         }
-        ctx = _parse_event_fields(body, self._make_client())
+        ctx = _parse_event_fields(body)
         assert ctx["user_id"] is None
         assert ctx["event_subtype"] == "bot_message"
         assert ctx["msg_text"] == "Today's forecast"
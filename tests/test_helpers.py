@@ -5,6 +5,7 @@ import time
 from unittest.mock import MagicMock, patch
 
 import pytest
+from cryptography.fernet import Fernet
 
 # Ensure minimal env vars are set before importing app code
 os.environ.setdefault("DATABASE_HOST", "localhost")
@@ -15,6 +16,7 @@ os.environ.setdefault("DATABASE_SCHEMA", "syncbot")
 os.environ.setdefault("SLACK_BOT_TOKEN", "xoxb-0-0")
 
 import helpers
+from helpers import encryption
 
 # -----------------------------------------------------------------------
 # safe_get
@@ -100,6 +102,51 @@ class TestEncryption:
             helpers.decrypt_bot_token(encrypted)
 
 
+class TestEncryptionKeys:
+    def setup_method(self):
+        encryption._derived.cache_clear()
+        encryption._pre_derived.cache_clear()
+
+    @patch.dict(os.environ, {"TOKEN_ENCRYPTION_KEY": "key-A"})
+    def test_envelope_names_the_key_and_legacy_tokens_still_decrypt(self):
+        encrypted = helpers.encrypt_bot_token("xoxb-0-0")
+        kid, _ = encryption._derived("key-A")
+        assert encrypted.startswith(f"v2:{kid}:")
+
+        legacy = Fernet(encryption.derive_key("key-A")).encrypt(b"xoxb-legacy").decode()
+        assert helpers.decrypt_bot_token(legacy) == "xoxb-legacy"
+
+    def test_pre_derived_key_skips_the_kdf(self):
+        derived = encryption.format_derived_key("key-A")
+        with patch.dict(os.environ, {"TOKEN_ENCRYPTION_KEY": "key-A"}):
+            encrypted = helpers.encrypt_bot_token("xoxb-0-0")
+        encryption._derived.cache_clear()
+
+        env = {"TOKEN_ENCRYPTION_KEY": "key-A", "TOKEN_ENCRYPTION_DERIVED_KEY": derived}
+        with patch.dict(os.environ, env), patch.object(encryption, "derive_key") as kdf:
+            assert helpers.decrypt_bot_token(encrypted) == "xoxb-0-0"
+            assert helpers.encrypt_bot_token("xoxb-1-1").split(":")[1] == encrypted.split(":")[1]
+        kdf.assert_not_called()
+
+    def test_stale_pre_derived_key_is_ignored(self):
+        env = {"TOKEN_ENCRYPTION_KEY": "key-B", "TOKEN_ENCRYPTION_DERIVED_KEY": encryption.format_derived_key("key-A")}
+        with patch.dict(os.environ, env):
+            encrypted = helpers.encrypt_bot_token("xoxb-0-0")
+        with patch.dict(os.environ, {"TOKEN_ENCRYPTION_KEY": "key-B"}):
+            assert helpers.decrypt_bot_token(encrypted) == "xoxb-0-0"
+
+    def test_rotated_key_still_decrypts_rows_of_the_previous_key(self):
+        with patch.dict(os.environ, {"TOKEN_ENCRYPTION_KEY": "key-A"}):
+            old = helpers.encrypt_bot_token("xoxb-old")
+
+        env = {"TOKEN_ENCRYPTION_KEY": "key-B", "TOKEN_ENCRYPTION_KEY_PREVIOUS": "key-0, key-A"}
+        with patch.dict(os.environ, env):
+            assert helpers.decrypt_bot_token(old) == "xoxb-old"
+            new = helpers.encrypt_bot_token("xoxb-new")
+            assert helpers.decrypt_bot_token(new) == "xoxb-new"
+        assert new.split(":")[1] != old.split(":")[1]
+
+
 # -----------------------------------------------------------------------
 # In-process cache
 # -----------------------------------------------------------------------
@@ -125,6 +172,842 @@ class TestCache:
         helpers._cache_set("k3", "value3", ttl=60)
         assert helpers._cache_get("k3") == "value3"
 
+    def test_namespace_evicts_least_recently_used(self):
+        with patch.object(helpers._CACHE, "max_entries", 2):
+            helpers._cache_set("ns:a", 1)
+            helpers._cache_set("ns:b", 2)
+            helpers._cache_get("ns:a")
+            helpers._cache_set("ns:c", 3)
+            helpers._cache_set("other:x", 4)
+        assert helpers._cache_get("ns:a") == 1
+        assert helpers._cache_get("ns:b") is None
+        assert helpers._cache_get("ns:c") == 3
+        assert helpers._cache_get("other:x") == 4
+        assert helpers.cache_stats()["ns"]["evictions"] == 1
+
+    def test_delete_prefix(self):
+        helpers._cache_set("home_tab_hash:T1", "a")
+        helpers._cache_set("home_tab_hash:T2", "b")
+        helpers._cache_set("home_tab_blocks:T1:U1", "c")
+        assert helpers._cache_delete_prefix("home_tab_hash:T1") == 1
+        assert helpers._cache_delete_prefix("home_tab") == 2
+        assert len(helpers._CACHE) == 0
+
+    def test_stats_count_hits_and_misses(self):
+        helpers._cache_set("user_info:U1", {"name": "a"})
+        helpers._cache_get("user_info:U1")
+        helpers._cache_get("user_info:U2")
+        stats = helpers.cache_stats()["user_info"]
+        assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+
+    def test_invalidate_tags_removes_only_tagged_entries(self):
+        helpers.refresh_after_full(
+            "home_tab_hash:T1", "home_tab_blocks:T1:U1", "refresh_at:home:T1:U1", "h", [], tags=["home_tab:T1"]
+        )
+        helpers._cache_set("home_tab_hash:T12", "other", tags=["home_tab:T12"])
+        assert helpers._cache_invalidate_tags("home_tab:T1") == 3
+        assert helpers._cache_get("home_tab_hash:T1") is None
+        assert helpers._cache_get("home_tab_hash:T12") == "other"
+
+    def test_resetting_a_key_replaces_its_tags(self):
+        helpers._cache_set("refresh_at:home:T1:U1", 1, tags=["home_tab:T1"])
+        helpers._cache_set("refresh_at:home:T1:U1", 2)
+        assert helpers._cache_invalidate_tags("home_tab:T1") == 0
+        assert helpers._cache_get("refresh_at:home:T1:U1") == 2
+
+    def test_invalidate_home_tab_caches_for_all_teams(self):
+        from helpers import export_import
+
+        for team in ("T1", "T2", "T3"):
+            helpers._cache_set(f"home_tab_hash:{team}", "h", tags=[helpers.home_tab_cache_tag(team)])
+        export_import.invalidate_home_tab_caches_for_all_teams(["T1", "T2"])
+        assert list(helpers._CACHE) == ["home_tab_hash:T3"]
+
+    def test_delete_namespace(self):
+        helpers._cache_set("ws_name_refresh:1", True, tags=["t"])
+        helpers._cache_set("ws_name_refresh:2", True)
+        helpers._cache_set("ws_info:1", {})
+        assert helpers._cache_delete_namespace("ws_name_refresh") == 2
+        assert list(helpers._CACHE) == ["ws_info:1"]
+        assert helpers._cache_invalidate_tags("t") == 0
+
+    def test_sweep_drops_expired_and_emits_metrics(self):
+        helpers._cache_set("chan_name:C1", "general", ttl=0)
+        helpers._cache_set("chan_name:C2", "random", ttl=60)
+        with patch("helpers._cache.emit_metric") as emit:
+            assert helpers._CACHE.sweep() == 1
+        assert "chan_name:C1" not in helpers._CACHE
+        emitted = {(c.args[0], c.kwargs["namespace"]): c.args[1] for c in emit.call_args_list}
+        assert emitted[("cache_size", "chan_name")] == 1
+        assert helpers.cache_stats()["chan_name"]["hits"] == 0
+
+
+# -----------------------------------------------------------------------
+# Workspace client registry
+# -----------------------------------------------------------------------
+
+
+class TestWorkspaceClients:
+    def setup_method(self):
+        helpers.clear_workspace_clients()
+
+    def teardown_method(self):
+        helpers.clear_workspace_clients()
+
+    @staticmethod
+    def _workspace(ws_id=1, token="xoxb-one"):
+        ws = MagicMock()
+        ws.id = ws_id
+        ws.bot_token = helpers.encrypt_bot_token(token)
+        return ws
+
+    def test_decrypts_once_and_reuses_client(self):
+        ws = self._workspace()
+        with patch("helpers.clients.decrypt_bot_token", wraps=helpers.decrypt_bot_token) as decrypt:
+            first = helpers.get_workspace_client(ws)
+            second = helpers.get_workspace_client(ws)
+            assert helpers.get_bot_token(ws) == "xoxb-one"
+        assert first is second
+        assert first.token == "xoxb-one"
+        assert decrypt.call_count == 1
+
+    def test_new_ciphertext_replaces_entry(self):
+        ws = self._workspace()
+        first = helpers.get_workspace_client(ws)
+        ws.bot_token = helpers.encrypt_bot_token("xoxb-two")
+        second = helpers.get_workspace_client(ws)
+        assert second is not first
+        assert second.token == "xoxb-two"
+        assert helpers.client_for_token("xoxb-one") is not first
+
+    def test_client_for_token_reuses_registered_client(self):
+        ws = self._workspace()
+        client = helpers.get_workspace_client(ws)
+        assert helpers.client_for_token("xoxb-one") is client
+        helpers.invalidate_workspace_client(ws.id)
+        assert helpers.client_for_token("xoxb-one") is not client
+
+    def test_refresh_bot_token_skips_unchanged_token(self):
+        from helpers.workspace import _maybe_refresh_bot_token
+
+        ws = self._workspace()
+        client = helpers.get_workspace_client(ws)
+        with patch("helpers.workspace.DbManager") as db:
+            _maybe_refresh_bot_token(ws, {"bot_token": "xoxb-one"})
+        db.update_records.assert_not_called()
+        assert helpers.get_workspace_client(ws) is client
+
+    def test_refresh_bot_token_invalidates_on_change(self):
+        from helpers.workspace import _maybe_refresh_bot_token
+
+        ws = self._workspace()
+        client = helpers.get_workspace_client(ws)
+        with patch("helpers.workspace.DbManager") as db:
+            _maybe_refresh_bot_token(ws, {"bot_token": "xoxb-two"})
+        db.update_records.assert_called_once()
+        assert helpers.client_for_token("xoxb-one") is not client
+        assert helpers.get_bot_token(ws) == "xoxb-two"
+
+
+# -----------------------------------------------------------------------
+# Slack rate limiting
+# -----------------------------------------------------------------------
+
+
+class TestThrottle:
+    def setup_method(self):
+        from helpers import rate_limit
+
+        rate_limit.reset_rate_limits()
+        self.now = 1000.0
+        self.slept: list[float] = []
+        self._patches = [
+            patch.object(rate_limit._time, "monotonic", side_effect=lambda: self.now),
+            patch.object(rate_limit._time, "sleep", side_effect=self.slept.append),
+            patch.object(rate_limit, "emit_metric"),
+        ]
+        for p in self._patches:
+            p.start()
+        self.emit = rate_limit.emit_metric
+
+    def teardown_method(self):
+        for p in self._patches:
+            p.stop()
+
+    def test_burst_then_waits(self):
+        for _ in range(3):
+            assert helpers.throttle("xoxb-a", "chat.postMessage", "C1") == 0
+        assert helpers.throttle("xoxb-a", "chat.postMessage", "C1") == pytest.approx(1.0)
+        assert self.slept == [pytest.approx(1.0)]
+        assert self.emit.call_args.args[0] == "slack_rate_limit_wait"
+
+    def test_buckets_are_per_channel_and_workspace(self):
+        for _ in range(3):
+            helpers.throttle("xoxb-a", "chat.postMessage", "C1")
+        assert helpers.throttle("xoxb-a", "chat.postMessage", "C2") == 0
+        assert helpers.throttle("xoxb-b", "chat.postMessage", "C1") == 0
+
+    def test_tokens_refill_over_time(self):
+        for _ in range(20):
+            helpers.throttle("xoxb-a", "users.list")
+        self.now += 3.0
+        assert helpers.throttle("xoxb-a", "users.list") == 0
+
+    def test_rejects_when_wait_exceeds_max(self):
+        with patch.object(helpers.rate_limit.constants, "SLACK_RATE_LIMIT_MAX_WAIT_SECONDS", 5):
+            for _ in range(20):
+                helpers.throttle("xoxb-a", "users.list")
+            helpers.throttle("xoxb-a", "users.list")  # waits 3s
+            with pytest.raises(helpers.RateLimitExceeded):
+                helpers.throttle("xoxb-a", "users.list")  # would wait 6s
+        assert self.emit.call_args.args[0] == "slack_rate_limit_rejected"
+        self.now += 3.0
+        assert helpers.throttle("xoxb-a", "users.list") == pytest.approx(3.0)
+
+    def test_throttled_user_lookups_fall_back(self):
+        client = MagicMock(token="xoxb-a")
+        helpers._CACHE.clear()
+        with (
+            patch.object(helpers.rate_limit.constants, "SLACK_RATE_LIMIT_MAX_WAIT_SECONDS", 0),
+            patch.dict(os.environ, {"REQUIRE_ADMIN": "true"}),
+        ):
+            for _ in range(100):
+                helpers.throttle("xoxb-a", "users.info")
+            assert helpers.get_user_info(client, "U1") == (None, None)
+            assert helpers.is_user_authorized(client, "U1") is False
+        client.users_info.assert_not_called()
+
+    def test_post_message_is_throttled(self):
+        client = MagicMock()
+        with (
+            patch("helpers.slack_api.client_for_token", return_value=client),
+            patch("helpers.slack_api.throttle") as throttle,
+        ):
+            helpers.post_message("xoxb-a", "C1", "hi")
+            helpers.post_message("xoxb-a", "C1", "hi", update_ts="1.0")
+        assert [c.args for c in throttle.call_args_list] == [
+            ("xoxb-a", "chat.postMessage", "C1"),
+            ("xoxb-a", "chat.update"),
+        ]
+
+    def test_throttled_file_upload_is_skipped(self):
+        client = MagicMock()
+        with (
+            patch("helpers.files.client_for_token", return_value=client),
+            patch("helpers.files.throttle", side_effect=helpers.RateLimitExceeded("files.upload_v2", "T1", 30)),
+        ):
+            assert helpers.upload_files_to_slack("xoxb-a", "C1", [{"path": "/tmp/f", "name": "f"}]) == (None, None)
+        client.files_upload_v2.assert_not_called()
+
+
+# -----------------------------------------------------------------------
+# resolve_mentions_bulk
+# -----------------------------------------------------------------------
+
+
+class TestResolveMentionsBulk:
+    @pytest.fixture
+    def seeded(self, migrated_sqlite_db):
+        from datetime import UTC, datetime
+
+        from db import DbManager, schemas
+
+        helpers._CACHE.clear()
+        source = DbManager.create_record(schemas.Workspace(team_id="TS", workspace_name="Source", bot_token="x"))
+        targets = [
+            DbManager.create_record(schemas.Workspace(team_id=f"T{i}", workspace_name=f"W{i}", bot_token="x"))
+            for i in range(3)
+        ]
+        now = datetime.now(UTC)
+        DbManager.create_records(
+            [
+                schemas.UserMapping(
+                    source_workspace_id=source.id,
+                    source_user_id="U1",
+                    target_workspace_id=t.id,
+                    target_user_id=f"L{t.id}",
+                    match_method="manual",
+                    matched_at=now,
+                )
+                for t in targets
+            ]
+            + [
+                schemas.UserMapping(
+                    source_workspace_id=source.id,
+                    source_user_id="U2",
+                    target_workspace_id=targets[0].id,
+                    target_user_id=None,
+                    match_method="none",
+                    source_display_name="Bob",
+                    matched_at=now,
+                )
+            ]
+        )
+        return migrated_sqlite_db, source, targets
+
+    def test_one_mapping_query_and_matching_only_for_misses(self, seeded):
+        from sqlalchemy import event
+
+        engine, source, targets = seeded
+        statements: list[str] = []
+
+        def on_execute(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            with (
+                patch("helpers.user_matching._get_source_profile_full", return_value={"display_name": "Bob"}),
+                patch("helpers.user_matching._find_user_match", return_value=("LBOB", "email")) as match,
+            ):
+                table = helpers.resolve_mentions_bulk(
+                    MagicMock(), source.id, ["U1", "U2", "U1"], {t.id: MagicMock() for t in targets}
+                )
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+        mapping_selects = [s for s in statements if s.lstrip().upper().startswith("SELECT") and "user_mappings" in s]
+        assert len(mapping_selects) == 1
+        assert match.call_count == 2
+        assert {call.args[3] for call in match.call_args_list} == {targets[1].id, targets[2].id}
+        assert table[targets[0].id] == {"U1": f"<@L{targets[0].id}>", "U2": "`[@Bob (Source)]`"}
+        assert table[targets[1].id] == {"U1": f"<@L{targets[1].id}>", "U2": "<@LBOB>"}
+
+    def test_failed_pair_left_out_and_labelled_by_apply(self, seeded):
+        _engine, source, targets = seeded
+        with patch("helpers.user_matching._get_source_profile_full", side_effect=RuntimeError("boom")):
+            table = helpers.resolve_mentions_bulk(MagicMock(), source.id, ["U9"], {targets[0].id: MagicMock()})
+            text = helpers.apply_mentioned_users(
+                "hi <@U9>",
+                MagicMock(),
+                MagicMock(),
+                [{"user_id": "U9", "user_name": "Zed"}],
+                source_workspace_id=source.id,
+                target_workspace_id=targets[0].id,
+                resolved=table[targets[0].id],
+            )
+        assert table[targets[0].id] == {}
+        assert text == "hi `[@Zed (Source)]`"
+
+
+# -----------------------------------------------------------------------
+# _find_user_match name index
+# -----------------------------------------------------------------------
+
+
+class TestFindUserMatchIndex:
+    @pytest.fixture
+    def directory(self, migrated_sqlite_db):
+        from datetime import UTC, datetime
+
+        from db import DbManager, schemas
+
+        helpers._CACHE.clear()
+        ws = DbManager.create_record(schemas.Workspace(team_id="T1", workspace_name="W", bot_token="x"))
+        now = datetime.now(UTC)
+        rows = [
+            ("UA", "Ann Lee", "Ann"),
+            ("UB1", "Bob Ray", "Bob"),
+            ("UB2", "Bob Ray", "Bobby"),
+            ("UC1", "Cat Ng", "Cat"),
+            ("UC2", "Cat Ng", "Cat"),
+        ]
+        DbManager.create_records(
+            [
+                schemas.UserDirectory(
+                    workspace_id=ws.id,
+                    slack_user_id=uid,
+                    real_name=real,
+                    display_name=display,
+                    normalized_name=display,
+                    updated_at=now,
+                )
+                for uid, real, display in rows
+            ]
+        )
+        with patch("helpers.user_matching._refresh_user_directory"):
+            yield migrated_sqlite_db, ws.id
+
+    @staticmethod
+    def _match(workspace_id, real, display):
+        from helpers.user_matching import _find_user_match
+
+        return _find_user_match("US", {"real_name": real, "display_name": display}, MagicMock(), workspace_id)
+
+    def test_matches_like_the_directory_scan(self, directory):
+        _engine, ws_id = directory
+        assert self._match(ws_id, "ann lee", "ANN") == ("UA", "name")
+        assert self._match(ws_id, "Bob Ray", "Bobby (PAX)") == ("UB2", "name")
+        assert self._match(ws_id, "Bob Ray", "Robert") == (None, "none")
+        assert self._match(ws_id, "Cat Ng", "Cat") == (None, "none")
+        assert self._match(ws_id, "", "Ann") == (None, "none")
+
+    def test_directory_loaded_once_for_many_lookups(self, directory):
+        from sqlalchemy import event
+
+        engine, ws_id = directory
+        selects: list[str] = []
+
+        def on_execute(_conn, _cursor, statement, *_args):
+            if "user_directory" in statement:
+                selects.append(statement)
+
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            for _ in range(5):
+                self._match(ws_id, "Ann Lee", "Ann")
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+        assert len(selects) == 1
+
+    def test_upsert_invalidates_index(self, directory):
+        from helpers.user_matching import _upsert_single_user_to_directory
+
+        _engine, ws_id = directory
+        assert self._match(ws_id, "Dee Fox", "Dee") == (None, "none")
+        _upsert_single_user_to_directory(
+            {"id": "UD", "profile": {"real_name": "Dee Fox", "display_name": "Dee"}}, ws_id
+        )
+        assert self._match(ws_id, "Dee Fox", "Dee") == ("UD", "name")
+
+
+# -----------------------------------------------------------------------
+# _refresh_user_directory bulk sync
+# -----------------------------------------------------------------------
+
+
+class TestRefreshUserDirectory:
+    @staticmethod
+    def _member(uid, real, display="", deleted=False):
+        return {"id": uid, "deleted": deleted, "profile": {"real_name": real, "display_name": display}}
+
+    @pytest.fixture
+    def seeded(self, migrated_sqlite_db):
+        from datetime import UTC, datetime
+
+        from db import DbManager, schemas
+        from helpers.rate_limit import reset_rate_limits
+
+        helpers._CACHE.clear()
+        reset_rate_limits()
+        ws = DbManager.create_record(schemas.Workspace(team_id="T1", workspace_name="W", bot_token="x"))
+        other = DbManager.create_record(schemas.Workspace(team_id="T2", workspace_name="X", bot_token="x"))
+        now = datetime.now(UTC)
+        DbManager.create_records(
+            [
+                schemas.UserDirectory(
+                    workspace_id=ws.id,
+                    slack_user_id=uid,
+                    real_name=real,
+                    display_name=display,
+                    normalized_name=display,
+                    updated_at=now,
+                )
+                for uid, real, display in [
+                    ("UA", "Ann Lee", "Ann"),
+                    ("UB", "Bob Ray", "Bob"),
+                    ("UC", "Cat Ng", "Cat"),
+                    ("UG", "Gus Oh", "Gus"),
+                ]
+            ]
+            + [
+                schemas.UserMapping(
+                    source_workspace_id=ws.id,
+                    source_user_id=uid,
+                    target_workspace_id=other.id,
+                    match_method="none",
+                    source_display_name=name,
+                    matched_at=now,
+                )
+                for uid, name in [("UA", "Ann"), ("UB", "Bob"), ("UC", "Cat")]
+            ]
+            + [
+                schemas.UserMapping(
+                    source_workspace_id=other.id,
+                    source_user_id="UX",
+                    target_workspace_id=ws.id,
+                    target_user_id="UG",
+                    match_method="manual",
+                    matched_at=now,
+                )
+            ]
+        )
+        return migrated_sqlite_db, ws.id
+
+    def _client(self):
+        client = MagicMock()
+        client.users_list.side_effect = [
+            {
+                "members": [
+                    self._member("UA", "Ann Lee", "Ann"),
+                    self._member("UB", "Bob Ray", "Bobby"),
+                    {"id": "UBOT", "is_bot": True},
+                ],
+                "response_metadata": {"next_cursor": "c2"},
+            },
+            {
+                "members": [
+                    self._member("UC", "Cat Ng", "Cat", deleted=True),
+                    self._member("UN", "New Person"),
+                ],
+                "response_metadata": {"next_cursor": ""},
+            },
+        ]
+        return client
+
+    def test_applies_inserts_updates_deletes_and_renames(self, seeded):
+        from db import DbManager, schemas
+        from helpers.user_matching import _refresh_user_directory
+
+        _engine, ws_id = seeded
+        _refresh_user_directory(self._client(), ws_id)
+
+        rows = {
+            r.slack_user_id: r
+            for r in DbManager.find_records(schemas.UserDirectory, [schemas.UserDirectory.workspace_id == ws_id])
+        }
+        assert sorted(rows) == ["UA", "UB", "UC", "UN"]
+        assert rows["UB"].display_name == "Bobby"
+        assert rows["UB"].normalized_name == "Bobby"
+        assert rows["UC"].deleted_at is not None
+        assert rows["UN"].real_name == "New Person"
+        assert rows["UA"].deleted_at is None
+
+        mappings = DbManager.find_records(schemas.UserMapping, [schemas.UserMapping.id.isnot(None)])
+        names = {m.source_user_id: m.source_display_name for m in mappings}
+        assert names == {"UA": "Ann", "UB": "Bobby"}
+
+    def test_statement_count_does_not_grow_per_user(self, seeded):
+        from sqlalchemy import event
+
+        from helpers.user_matching import _refresh_user_directory
+
+        engine, ws_id = seeded
+        statements: list[str] = []
+
+        def on_execute(_conn, _cursor, statement, *_args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            _refresh_user_directory(self._client(), ws_id)
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+        directory = [st for st in statements if "user_directory" in st and "user_directory_sync" not in st]
+        directory_writes = [st for st in directory if not st.lstrip().upper().startswith("SELECT")]
+        assert len(directory) - len(directory_writes) == 1
+        # page 1: one UPDATE; page 2: one INSERT and one soft-delete UPDATE; then one DELETE for stale rows
+        assert len(directory_writes) == 4
+
+
+# -----------------------------------------------------------------------
+# user directory watermark / background maintenance
+# -----------------------------------------------------------------------
+
+
+class TestDirectoryWatermark:
+    @staticmethod
+    def _state(sync_age=None, event_age=None):
+        from datetime import UTC, datetime, timedelta
+        from types import SimpleNamespace
+
+        now = datetime.now(UTC)
+        return SimpleNamespace(
+            last_full_sync_at=None if sync_age is None else (now - timedelta(seconds=sync_age)).replace(tzinfo=None),
+            last_event_at=None if event_age is None else (now - timedelta(seconds=event_age)).replace(tzinfo=None),
+        )
+
+    def test_full_sync_due(self):
+        from datetime import UTC, datetime
+
+        import constants
+        from helpers.user_matching import _full_sync_due
+
+        ttl = constants.USER_DIR_REFRESH_TTL
+        now = datetime.now(UTC)
+        assert _full_sync_due(None, now)
+        assert _full_sync_due(self._state(), now)
+        assert not _full_sync_due(self._state(sync_age=60), now)
+        assert not _full_sync_due(self._state(sync_age=ttl + 60), now)
+        assert not _full_sync_due(self._state(sync_age=ttl + 60, event_age=ttl + 120), now)
+        assert _full_sync_due(self._state(sync_age=ttl + 60, event_age=30), now)
+        assert not _full_sync_due(self._state(sync_age=60, event_age=30), now)
+        assert _full_sync_due(self._state(sync_age=constants.USER_DIR_FULL_SYNC_MAX_AGE_SECONDS + 1), now)
+
+    @pytest.fixture
+    def workspaces(self, migrated_sqlite_db):
+        from db import DbManager, schemas
+        from helpers.rate_limit import reset_rate_limits
+
+        helpers._CACHE.clear()
+        reset_rate_limits()
+        return [
+            DbManager.create_record(schemas.Workspace(team_id=f"T{i}", workspace_name=f"W{i}", bot_token="x"))
+            for i in range(3)
+        ]
+
+    @staticmethod
+    def _client():
+        client = MagicMock()
+        client.users_list.return_value = {
+            "members": [{"id": "UA", "profile": {"real_name": "Ann Lee", "display_name": "Ann"}}],
+            "response_metadata": {"next_cursor": ""},
+        }
+        return client
+
+    def test_refresh_records_watermark_and_then_skips(self, workspaces):
+        from db import DbManager, schemas
+        from helpers.user_matching import _refresh_user_directory
+
+        ws_id = workspaces[0].id
+        client = self._client()
+        assert _refresh_user_directory(client, ws_id) is True
+        assert DbManager.get_record(schemas.UserDirectorySync, ws_id).last_full_sync_at is not None
+        assert _refresh_user_directory(client, ws_id) is False
+        assert _refresh_user_directory(client, ws_id, force=True) is True
+        assert client.users_list.call_count == 2
+
+    def test_user_event_records_last_event_at(self, workspaces):
+        from db import DbManager, schemas
+        from helpers.user_matching import _upsert_single_user_to_directory
+
+        ws_id = workspaces[0].id
+        _upsert_single_user_to_directory({"id": "UB", "profile": {"real_name": "Bob Ray"}}, ws_id)
+        state = DbManager.get_record(schemas.UserDirectorySync, ws_id)
+        assert state.last_event_at is not None
+        assert state.last_full_sync_at is None
+
+    def test_watermark_insert_that_loses_the_race_updates(self, workspaces):
+        from datetime import UTC, datetime
+
+        from db import DbManager, schemas
+        from helpers.user_matching import _set_directory_watermark
+
+        ws_id = workspaces[0].id
+        DbManager.create_record(schemas.UserDirectorySync(workspace_id=ws_id))
+        real_update = DbManager.update_records
+        # First update runs "before" the concurrent insert: it matches nothing.
+        updates = iter([lambda *a, **k: 0, real_update])
+        with patch.object(DbManager, "update_records", side_effect=lambda *a, **k: next(updates)(*a, **k)):
+            _set_directory_watermark(ws_id, "last_event_at", datetime.now(UTC))
+
+        assert DbManager.get_record(schemas.UserDirectorySync, ws_id).last_event_at is not None
+
+    def test_matching_never_crawls(self, workspaces):
+        from helpers.user_matching import _find_user_match
+
+        client = self._client()
+        result = _find_user_match("US", {"real_name": "Ann Lee", "display_name": "Ann"}, client, workspaces[0].id)
+        assert result == (None, "none")
+        client.users_list.assert_not_called()
+
+    def test_maintenance_crawls_due_workspaces_oldest_first(self, workspaces):
+        from datetime import UTC, datetime
+
+        from db import DbManager, schemas
+
+        DbManager.create_record(
+            schemas.UserDirectorySync(workspace_id=workspaces[1].id, last_full_sync_at=datetime.now(UTC))
+        )
+        client = self._client()
+        with (
+            patch("helpers.user_matching.get_workspace_client", return_value=client),
+            patch("helpers.user_matching.run_auto_match_for_workspace") as auto_match,
+        ):
+            assert helpers.run_directory_maintenance(max_workspaces=5) == 2
+            assert helpers.run_directory_maintenance(max_workspaces=5) == 0
+
+        assert sorted(c.args[1] for c in auto_match.call_args_list) == [workspaces[0].id, workspaces[2].id]
+        assert client.users_list.call_count == 2
+
+
+class TestAutoMatch:
+    @pytest.fixture
+    def seeded(self, migrated_sqlite_db):
+        from datetime import UTC, datetime, timedelta
+
+        from db import DbManager, schemas
+        from helpers.rate_limit import reset_rate_limits
+
+        helpers._CACHE.clear()
+        reset_rate_limits()
+        source = DbManager.create_record(schemas.Workspace(team_id="T1", workspace_name="S", bot_token="x"))
+        target = DbManager.create_record(schemas.Workspace(team_id="T2", workspace_name="T", bot_token="x"))
+        DbManager.create_record(
+            schemas.UserDirectory(
+                workspace_id=target.id,
+                slack_user_id="TB",
+                real_name="Bob Ray",
+                display_name="Bob",
+                normalized_name="Bob",
+                updated_at=datetime.now(UTC),
+            )
+        )
+        old = datetime.now(UTC) - timedelta(days=1)
+        DbManager.create_records(
+            [
+                schemas.UserMapping(
+                    source_workspace_id=source.id,
+                    source_user_id=uid,
+                    target_workspace_id=target.id,
+                    match_method="none",
+                    matched_at=old + timedelta(minutes=i),
+                )
+                for i, uid in enumerate(["UA", "UB", "UC"])
+            ]
+        )
+        return source, target
+
+    @staticmethod
+    def _profiles(user):
+        profiles = {
+            "UA": {"real_name": "Ann Lee", "display_name": "Ann", "email": "ann@example.com"},
+            "UB": {"real_name": "Bob Ray", "display_name": "Bob", "email": "bob@example.com"},
+            "UC": {"real_name": "Cat Ng", "display_name": "Cat"},
+        }
+        return {"user": {"profile": profiles[user]}}
+
+    @staticmethod
+    def _mappings(target_id):
+        from db import DbManager, schemas
+
+        rows = DbManager.find_records(schemas.UserMapping, [schemas.UserMapping.target_workspace_id == target_id])
+        return {m.source_user_id: m for m in rows}
+
+    def test_matches_batch_with_one_lookup_per_user(self, seeded):
+        from slack_sdk.errors import SlackApiError
+
+        _source, target = seeded
+        source_client = MagicMock()
+        source_client.users_info.side_effect = lambda user: self._profiles(user)
+        target_client = MagicMock()
+
+        def lookup(email):
+            if email == "ann@example.com":
+                return {"user": {"id": "TA"}}
+            raise SlackApiError("users_not_found", MagicMock(status_code=200))
+
+        target_client.users_lookupByEmail.side_effect = lookup
+        before = self._mappings(target.id)
+        with patch("helpers.user_matching.get_workspace_client", return_value=source_client):
+            assert helpers.run_auto_match_for_workspace(target_client, target.id) == (2, 1)
+
+        after = self._mappings(target.id)
+        assert (after["UA"].target_user_id, after["UA"].match_method) == ("TA", "email")
+        assert (after["UB"].target_user_id, after["UB"].match_method) == ("TB", "name")
+        assert after["UC"].match_method == "none"
+        assert all(after[uid].matched_at > before[uid].matched_at for uid in after)
+        assert source_client.users_info.call_count == 3
+        assert target_client.users_lookupByEmail.call_count == 2
+
+    def test_rate_limited_lookup_defers_and_resumes(self, seeded):
+        from helpers.rate_limit import RateLimitExceeded
+
+        _source, target = seeded
+        source_client = MagicMock()
+        source_client.users_info.side_effect = lambda user: self._profiles(user)
+        target_client = MagicMock()
+        target_client.users_lookupByEmail.side_effect = RateLimitExceeded("users.lookupByEmail", "T2", 30)
+        before = self._mappings(target.id)
+        with patch("helpers.user_matching.get_workspace_client", return_value=source_client):
+            assert helpers.run_auto_match_for_workspace(target_client, target.id) == (0, 3)
+            after = self._mappings(target.id)
+            assert after["UA"].matched_at == before["UA"].matched_at
+            assert after["UB"].matched_at == before["UB"].matched_at
+            assert after["UC"].matched_at > before["UC"].matched_at
+
+            target_client.users_lookupByEmail.side_effect = None
+            target_client.users_lookupByEmail.return_value = {"user": {"id": "TA"}}
+            assert helpers.run_auto_match_for_workspace(target_client, target.id) == (2, 1)
+
+        after = self._mappings(target.id)
+        assert [after[uid].match_method for uid in ("UA", "UB", "UC")] == ["email", "email", "none"]
+
+    def test_spent_time_budget_leaves_mappings_untouched(self, seeded):
+        _source, target = seeded
+        source_client = MagicMock()
+        before = self._mappings(target.id)
+        with patch("helpers.user_matching.get_workspace_client", return_value=source_client):
+            assert helpers.run_auto_match_for_workspace(MagicMock(), target.id, time_budget_seconds=0) == (0, 3)
+
+        source_client.users_info.assert_not_called()
+        after = self._mappings(target.id)
+        assert all(after[uid].matched_at == before[uid].matched_at for uid in after)
+
+
+# -----------------------------------------------------------------------
+# fan_out
+# -----------------------------------------------------------------------
+
+
+class TestFanOut:
+    def test_preserves_input_order(self):
+        def slow_first(n):
+            time.sleep(0.05 if n == 0 else 0)
+            return n * 10
+
+        outcomes = helpers.fan_out(slow_first, [0, 1, 2], max_workers=3)
+        assert [(item, result) for item, result, _ in outcomes] == [(0, 0), (1, 10), (2, 20)]
+
+    def test_captures_errors_per_item(self):
+        def fn(n):
+            if n == 1:
+                raise RuntimeError("boom")
+            return n
+
+        outcomes = helpers.fan_out(fn, [0, 1, 2], max_workers=2)
+        assert outcomes[0][1:] == (0, None)
+        assert isinstance(outcomes[1][2], RuntimeError)
+        assert outcomes[2][1:] == (2, None)
+
+    def test_runs_targets_concurrently(self):
+        start = time.monotonic()
+        helpers.fan_out(lambda _: time.sleep(0.1), range(5), max_workers=5)
+        assert time.monotonic() - start < 0.4
+
+    def test_single_worker_runs_inline(self):
+        import threading
+
+        caller = threading.get_ident()
+        outcomes = helpers.fan_out(lambda _: threading.get_ident(), [1, 2], max_workers=1)
+        assert all(result == caller for _, result, _ in outcomes)
+
+    def test_worker_limit_is_shared_across_callers(self):
+        import threading
+
+        from helpers import fanout
+
+        lock = threading.Lock()
+        running = peak = 0
+
+        def task(_):
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        with patch.object(fanout, "_SLOTS", threading.BoundedSemaphore(3)):
+            callers = [threading.Thread(target=helpers.fan_out, args=(task, range(4), 4)) for _ in range(3)]
+            for caller in callers:
+                caller.start()
+            for caller in callers:
+                caller.join()
+        assert peak == 3
+
+    def test_nested_fan_out_runs_inline(self):
+        import threading
+
+        def outer(_):
+            worker = threading.get_ident()
+            inner = helpers.fan_out(lambda _: threading.get_ident(), [1, 2], max_workers=2)
+            return all(result == worker for _, result, _ in inner)
+
+        assert all(result for _, result, _ in helpers.fan_out(outer, [1, 2], max_workers=2))
+
 
 # -----------------------------------------------------------------------
 # get_request_type
@@ -40,37 +40,59 @@ class TestGetPostRecordsDeduplication:
         sc_a = SimpleNamespace(id=10, channel_id="C777")
         sc_b = SimpleNamespace(id=11, channel_id="C777")
 
-        with (
-            patch("helpers.slack_api.DbManager.find_records", return_value=[pm]),
-            patch(
-                "helpers.slack_api.DbManager.find_join_records3",
-                return_value=[(pm, sc_a, ws), (pm, sc_b, ws)],
-            ),
-        ):
+        with patch(
+            "helpers.slack_api.DbManager.find_join_records3",
+            return_value=[(pm, sc_a, ws), (pm, sc_b, ws)],
+        ) as find_join:
             result = get_post_records("123.456789")
 
         assert len(result) == 1
         assert result[0][1] is sc_a
+        find_join.assert_called_once()
+        assert find_join.call_args.kwargs["order_by"] is not None
 
-    def test_dedup_prefers_lower_post_meta_id_for_split_file_alias(self):
+    def test_dedup_prefers_lower_post_meta_id_for_split_file_alias(self, migrated_sqlite_db):
         """Reactions on file thread replies share post_id; primary text row must win."""
-        pm_file = SimpleNamespace(id=99, post_id="p1", ts=888.888)
-        pm_text = SimpleNamespace(id=10, post_id="p1", ts=111.111)
-        ws = SimpleNamespace(id=42)
-        sc = SimpleNamespace(id=10, channel_id="C777")
+        _seed_post(
+            [("p1", "C777", 111.111), ("p1", "C777", 888.888), ("p1", "C888", 222.222), ("p2", "C777", 999.0)]
+        )
 
-        with (
-            patch("helpers.slack_api.DbManager.find_records", return_value=[pm_file]),
-            patch(
-                "helpers.slack_api.DbManager.find_join_records3",
-                return_value=[(pm_file, sc, ws), (pm_text, sc, ws)],
-            ),
-        ):
-            result = get_post_records("888.888")
+        result = get_post_records("888.888")
 
-        assert len(result) == 1
-        assert result[0][0].id == 10
-        assert result[0][0].ts == 111.111
+        assert [(sc.channel_id, float(pm.ts)) for pm, sc, _ in result] == [("C777", 111.111), ("C888", 222.222)]
+
+    def test_single_round_trip(self, migrated_sqlite_db):
+        from sqlalchemy import event
+
+        _seed_post([("p1", "C777", 111.111), ("p1", "C888", 222.222)])
+        statements: list[str] = []
+        event.listen(migrated_sqlite_db, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+        assert len(get_post_records("222.222")) == 2
+        assert len([s for s in statements if s.lstrip().upper().startswith("SELECT")]) == 1
+
+    def test_unknown_ts_returns_empty(self, migrated_sqlite_db):
+        assert get_post_records("1.000001") == []
+
+
+def _seed_post(rows: list[tuple[str, str, float]]) -> None:
+    """Create one workspace/sync and a PostMeta row per ``(post_id, channel_id, ts)``."""
+    from datetime import UTC, datetime
+
+    from db import DbManager, schemas
+
+    ws = DbManager.create_record(schemas.Workspace(team_id="T1", workspace_name="WS", bot_token="x"))
+    sync = DbManager.create_record(schemas.Sync(title="s"))
+    channels: dict[str, int] = {}
+    for post_id, channel_id, ts in rows:
+        if channel_id not in channels:
+            sc = DbManager.create_record(
+                schemas.SyncChannel(
+                    sync_id=sync.id, workspace_id=ws.id, channel_id=channel_id, created_at=datetime.now(UTC)
+                )
+            )
+            channels[channel_id] = sc.id
+        DbManager.create_record(schemas.PostMeta(post_id=post_id, sync_channel_id=channels[channel_id], ts=ts))
 
 
 class TestJoinSyncDuplicateSkip:
@@ -105,3 +127,248 @@ class TestJoinSyncDuplicateSkip:
         create_record.assert_not_called()
         client.conversations_join.assert_not_called()
         refresh_home.assert_called_once()
+
+
+class TestNewPostFanOut:
+    def test_failed_target_counted_and_rows_written_once(self):
+        from handlers.messages import _handle_new_post
+
+        sc_source = SimpleNamespace(id=1, channel_id="C_SRC", sync_id=7)
+        ws_source = SimpleNamespace(id=10, bot_token="enc", workspace_name="A")
+        targets = [
+            (
+                SimpleNamespace(id=100 + i, channel_id=f"C{i}", sync_id=7),
+                SimpleNamespace(id=20 + i, bot_token="enc", workspace_name=f"W{i}"),
+            )
+            for i in range(3)
+        ]
+
+        def post_message(**kwargs):
+            if kwargs["channel_id"] == "C1":
+                raise RuntimeError("slack down")
+            return {"ts": "200.000000"}
+
+        body = {"event": {"channel": "C_SRC", "ts": "100.000000"}}
+        ctx = {"team_id": "T1", "channel_id": "C_SRC", "msg_text": "hi", "mentioned_users": [], "user_id": "U1"}
+
+        with (
+            patch("handlers.messages.helpers.get_sync_list", return_value=[(sc_source, ws_source), *targets]),
+            patch("handlers.messages.helpers.get_user_info", return_value=("N", None)),
+            patch("handlers.messages.helpers.get_federated_workspace_for_sync", return_value=None),
+            patch("handlers.messages.helpers.get_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_workspace_client", return_value=MagicMock()),
+            patch("handlers.messages.helpers.apply_mentioned_users", side_effect=lambda t, *a, **k: t),
+            patch("handlers.messages.helpers.resolve_channel_references", side_effect=lambda t, *a, **k: t),
+            patch("handlers.messages.helpers.get_workspace_by_id", return_value=None),
+            patch(
+                "handlers.messages.helpers.get_display_name_and_icon_for_synced_message",
+                return_value=("N", None),
+            ),
+            patch("handlers.messages.helpers.post_message", side_effect=post_message),
+            patch("handlers.messages.helpers.cleanup_temp_files"),
+            patch("handlers.messages.DbManager.create_records") as create_records,
+            patch("handlers.messages.emit_metric") as emit_metric,
+        ):
+            _handle_new_post(body, MagicMock(), MagicMock(), ctx, [], [], None)
+
+        create_records.assert_called_once()
+        rows = create_records.call_args.args[0]
+        assert sorted(r.sync_channel_id for r in rows) == [1, 100, 102]
+        emit_metric.assert_any_call("messages_synced", value=3, sync_type="new_post")
+        emit_metric.assert_any_call("sync_failures", value=1, sync_type="new_post")
+
+
+    def test_throttled_poster_lookup_still_syncs(self):
+        from handlers.messages import _handle_new_post
+        from helpers import rate_limit
+
+        sc_source = SimpleNamespace(id=1, channel_id="C_SRC", sync_id=7)
+        ws_source = SimpleNamespace(id=10, bot_token="enc", workspace_name="A")
+        target = (SimpleNamespace(id=100, channel_id="C0", sync_id=7), SimpleNamespace(id=20, workspace_name="W0"))
+        client = MagicMock(token="xoxb-drained")
+        body = {"event": {"channel": "C_SRC", "ts": "100.000000"}}
+        ctx = {"team_id": "T1", "channel_id": "C_SRC", "msg_text": "hi", "mentioned_users": [], "user_id": "U_NEW"}
+
+        rate_limit.reset_rate_limits()
+        with (
+            patch.object(rate_limit.constants, "SLACK_RATE_LIMIT_MAX_WAIT_SECONDS", 0),
+            patch.object(rate_limit, "emit_metric"),
+            patch("handlers.messages.helpers.get_sync_list", return_value=[(sc_source, ws_source), target]),
+            patch("handlers.messages.helpers.get_federated_workspace_for_sync", return_value=None),
+            patch("handlers.messages.helpers.get_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_workspace_client", return_value=MagicMock()),
+            patch("handlers.messages.helpers.apply_mentioned_users", side_effect=lambda t, *a, **k: t),
+            patch("handlers.messages.helpers.resolve_channel_references", side_effect=lambda t, *a, **k: t),
+            patch("handlers.messages.helpers.get_workspace_by_id", return_value=None),
+            patch(
+                "handlers.messages.helpers.get_display_name_and_icon_for_synced_message",
+                return_value=(None, None),
+            ),
+            patch("handlers.messages.helpers.post_message", return_value={"ts": "200.000000"}) as post_message,
+            patch("handlers.messages.helpers.cleanup_temp_files"),
+            patch("handlers.messages.DbManager.create_records") as create_records,
+            patch("handlers.messages.emit_metric"),
+        ):
+            while True:
+                try:
+                    rate_limit.throttle("xoxb-drained", "users.info")
+                except rate_limit.RateLimitExceeded:
+                    break
+            _handle_new_post(body, client, MagicMock(), ctx, [], [], None)
+        rate_limit.reset_rate_limits()
+
+        client.users_info.assert_not_called()
+        post_message.assert_called_once()
+        assert sorted(r.sync_channel_id for r in create_records.call_args.args[0]) == [1, 100]
+
+
+    def test_throttled_file_upload_keeps_the_posted_text(self):
+        from handlers.messages import _handle_new_post
+        from helpers import RateLimitExceeded
+
+        sc_source = SimpleNamespace(id=1, channel_id="C_SRC", sync_id=7)
+        ws_source = SimpleNamespace(id=10, bot_token="enc", workspace_name="A")
+        target = (SimpleNamespace(id=100, channel_id="C0", sync_id=7), SimpleNamespace(id=20, workspace_name="W0"))
+        body = {"event": {"channel": "C_SRC", "ts": "100.000000"}}
+        ctx = {"team_id": "T1", "channel_id": "C_SRC", "msg_text": "hi", "mentioned_users": [], "user_id": "U1"}
+        files = [{"path": "/tmp/f", "name": "f"}]
+
+        with (
+            patch("handlers.messages.helpers.get_sync_list", return_value=[(sc_source, ws_source), target]),
+            patch("handlers.messages.helpers.get_user_info", return_value=("N", None)),
+            patch("handlers.messages.helpers.get_federated_workspace_for_sync", return_value=None),
+            patch("handlers.messages.helpers.get_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_workspace_client", return_value=MagicMock()),
+            patch("handlers.messages.helpers.apply_mentioned_users", side_effect=lambda t, *a, **k: t),
+            patch("handlers.messages.helpers.resolve_channel_references", side_effect=lambda t, *a, **k: t),
+            patch("handlers.messages.helpers.get_workspace_by_id", return_value=None),
+            patch(
+                "handlers.messages.helpers.get_display_name_and_icon_for_synced_message",
+                return_value=("N", None),
+            ),
+            patch("handlers.messages._shared_by_file_initial_comment", return_value=None),
+            patch("handlers.messages.helpers.post_message", return_value={"ts": "200.000000"}),
+            patch("helpers.files.throttle", side_effect=RateLimitExceeded("files.upload_v2", "T2", 30)),
+            patch("handlers.messages.helpers.cleanup_temp_files"),
+            patch("handlers.messages.DbManager.create_records") as create_records,
+            patch("handlers.messages.emit_metric"),
+        ):
+            _handle_new_post(body, MagicMock(), MagicMock(), ctx, [], [], files)
+
+        rows = create_records.call_args.args[0]
+        assert [(r.sync_channel_id, r.ts) for r in rows if r.sync_channel_id == 100] == [(100, 200.0)]
+
+
+class TestLazyMentionResolution:
+    def _ctx(self, text="hi <@U2>"):
+        return {
+            "team_id": "T1",
+            "channel_id": "C_SRC",
+            "msg_text": text,
+            "mentioned_users": None,
+            "user_id": "U1",
+            "thread_ts": None,
+            "ts": "100.000000",
+            "event_subtype": None,
+        }
+
+    def test_unsynced_channel_skips_mention_lookup(self):
+        from handlers.messages import _handle_new_post
+
+        with (
+            patch("handlers.messages.helpers.get_sync_list", return_value=[]),
+            patch("handlers.messages.DbManager.find_records", return_value=[object()]),
+            patch("handlers.messages.helpers.parse_mentioned_users") as parse,
+        ):
+            _handle_new_post({"event": {}}, MagicMock(), MagicMock(), self._ctx(), [], [], None)
+
+        parse.assert_not_called()
+
+    def test_unknown_thread_skips_mention_lookup(self):
+        from handlers.messages import _handle_thread_reply
+
+        ctx = self._ctx()
+        ctx["thread_ts"] = "99.000000"
+        with (
+            patch("handlers.messages.helpers.get_post_records", return_value=[]),
+            patch("handlers.messages.helpers.parse_mentioned_users") as parse,
+        ):
+            _handle_thread_reply({"event": {}}, MagicMock(), MagicMock(), ctx, [], None)
+
+        parse.assert_not_called()
+
+    def test_mentions_resolved_once_for_all_targets(self):
+        from handlers.messages import _handle_new_post
+
+        sc_source = SimpleNamespace(id=1, channel_id="C_SRC", sync_id=7)
+        ws_source = SimpleNamespace(id=10, bot_token="enc", workspace_name="A")
+        targets = [
+            (
+                SimpleNamespace(id=100 + i, channel_id=f"C{i}", sync_id=7),
+                SimpleNamespace(id=20 + i, bot_token="enc", workspace_name=f"W{i}"),
+            )
+            for i in range(3)
+        ]
+        mentions = [{"user_id": "U2", "user_name": "Bob", "email": None}]
+        ctx = self._ctx()
+
+        with (
+            patch("handlers.messages.helpers.get_sync_list", return_value=[(sc_source, ws_source), *targets]),
+            patch("handlers.messages.helpers.parse_mentioned_users", return_value=mentions) as parse,
+            patch("handlers.messages.helpers.get_user_info", return_value=("N", None)),
+            patch("handlers.messages.helpers.get_federated_workspace_for_sync", return_value=None),
+            patch("handlers.messages.helpers.get_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_workspace_client", return_value=MagicMock()),
+            patch(
+                "handlers.messages.helpers.resolve_mentions_bulk",
+                return_value={20 + i: {"U2": f"<@L{i}>"} for i in range(3)},
+            ) as bulk,
+            patch("handlers.messages.helpers.apply_mentioned_users", side_effect=lambda t, *a, **k: t) as apply,
+            patch("handlers.messages.helpers.resolve_channel_references", side_effect=lambda t, *a, **k: t),
+            patch("handlers.messages.helpers.get_workspace_by_id", return_value=None),
+            patch(
+                "handlers.messages.helpers.get_display_name_and_icon_for_synced_message",
+                return_value=("N", None),
+            ),
+            patch("handlers.messages.helpers.post_message", return_value={"ts": "200.000000"}),
+            patch("handlers.messages.helpers.cleanup_temp_files"),
+            patch("handlers.messages.DbManager.create_records"),
+            patch("handlers.messages.emit_metric"),
+        ):
+            _handle_new_post({"event": {"channel": "C_SRC", "ts": "100.000000"}}, MagicMock(), MagicMock(), ctx, [], [])
+
+        parse.assert_called_once()
+        assert ctx["mentioned_users"] is mentions
+        assert all(c.args[3] is mentions for c in apply.call_args_list)
+        assert apply.call_count == 3
+        bulk.assert_called_once()
+        assert bulk.call_args.args[2] == ["U2"]
+        assert sorted(bulk.call_args.args[3]) == [20, 21, 22]
+        assert sorted(c.kwargs["resolved"]["U2"] for c in apply.call_args_list) == ["<@L0>", "<@L1>", "<@L2>"]
+
+
+class TestFederatedTargets:
+    def test_delete_sends_remote_targets_through_the_outbox_only(self):
+        from handlers.messages import _handle_message_delete
+
+        ws_local = SimpleNamespace(id=10, bot_token="enc", workspace_name="A")
+        ws_remote = SimpleNamespace(id=30, bot_token=None, workspace_name="R")
+        records = [
+            (SimpleNamespace(post_id="p", ts=1.0), SimpleNamespace(id=1, channel_id="C_SRC", sync_id=7), ws_local),
+            (SimpleNamespace(post_id="p", ts=2.0), SimpleNamespace(id=2, channel_id="C_LOCAL", sync_id=7), ws_local),
+            (SimpleNamespace(post_id="p", ts=3.0), SimpleNamespace(id=3, channel_id="C_REMOTE", sync_id=7), ws_remote),
+        ]
+
+        with (
+            patch("handlers.messages.helpers.get_post_records", return_value=records),
+            patch("handlers.messages.helpers.get_federated_workspace_for_sync", return_value=SimpleNamespace(id=5)),
+            patch("handlers.messages._push_federated") as push,
+            patch("handlers.messages.helpers.get_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.delete_message") as delete_message,
+            patch("handlers.messages.emit_metric") as emit_metric,
+        ):
+            _handle_message_delete({"channel_id": "C_SRC", "ts": "1.000000"}, MagicMock())
+
+        assert list(push.call_args.args[1]) == [(3, 3.0)]
+        delete_message.assert_called_once_with(bot_token="xoxb-test", channel_id="C_LOCAL", ts="2.000000")
+        emit_metric.assert_called_once_with("messages_synced", value=2, sync_type="message_delete")
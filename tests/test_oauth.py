@@ -31,8 +31,8 @@ class TestGetOAuthFlow:
         clear=True,
     )
     @patch("db.get_engine")
-    @patch("helpers.oauth.SQLAlchemyOAuthStateStore")
-    @patch("helpers.oauth.SQLAlchemyInstallationStore")
+    @patch("slack_sdk.oauth.state_store.sqlalchemy.SQLAlchemyOAuthStateStore")
+    @patch("slack_sdk.oauth.installation_store.sqlalchemy.SQLAlchemyInstallationStore")
     def test_local_dev_with_credentials_uses_sql_stores(
         self,
         mock_installation_store_cls,
@@ -45,8 +45,15 @@ class TestGetOAuthFlow:
         flow = get_oauth_flow()
 
         assert flow is not None
-        mock_get_engine.assert_called_once_with()
+        mock_get_engine.assert_not_called()
+        mock_installation_store_cls.assert_not_called()
+
+        flow.settings.installation_store.find_bot(enterprise_id=None, team_id="T1")
+        flow.settings.installation_store.find_bot(enterprise_id=None, team_id="T2")
+        flow.settings.state_store.issue()
+
         mock_installation_store_cls.assert_called_once_with(client_id="cid", engine=engine)
+        assert mock_installation_store_cls.return_value.find_bot.call_count == 2
         mock_state_store_cls.assert_called_once_with(expiration_seconds=600, engine=engine)
 
     @patch("helpers.oauth.constants.LOCAL_DEVELOPMENT", False)
@@ -60,8 +67,8 @@ class TestGetOAuthFlow:
         clear=True,
     )
     @patch("db.get_engine")
-    @patch("helpers.oauth.SQLAlchemyOAuthStateStore")
-    @patch("helpers.oauth.SQLAlchemyInstallationStore")
+    @patch("slack_sdk.oauth.state_store.sqlalchemy.SQLAlchemyOAuthStateStore")
+    @patch("slack_sdk.oauth.installation_store.sqlalchemy.SQLAlchemyInstallationStore")
     def test_production_uses_sql_stores_without_s3(
         self,
         mock_installation_store_cls,
@@ -76,7 +83,9 @@ class TestGetOAuthFlow:
         assert flow is not None
         assert flow.settings.scopes == ["chat:write", "groups:read"]
         assert flow.settings.user_scopes == list(USER_SCOPES)
-        mock_get_engine.assert_called_once_with()
+        flow.settings.installation_store.find_installation(enterprise_id=None, team_id="T1")
+        flow.settings.state_store.consume("state")
+        assert mock_get_engine.call_count == 2
         mock_installation_store_cls.assert_called_once_with(client_id="prod-cid", engine=engine)
         mock_state_store_cls.assert_called_once_with(expiration_seconds=600, engine=engine)
 
@@ -92,8 +101,8 @@ class TestGetOAuthFlow:
         clear=True,
     )
     @patch("db.get_engine")
-    @patch("helpers.oauth.SQLAlchemyOAuthStateStore")
-    @patch("helpers.oauth.SQLAlchemyInstallationStore")
+    @patch("slack_sdk.oauth.state_store.sqlalchemy.SQLAlchemyOAuthStateStore")
+    @patch("slack_sdk.oauth.installation_store.sqlalchemy.SQLAlchemyInstallationStore")
     def test_slack_user_scopes_env_overrides_default(
         self,
         mock_installation_store_cls,
@@ -44,7 +44,8 @@ class TestSplitMessagePostMeta:
             patch("handlers.messages.helpers.get_user_info", return_value=("N", "http://i")),
             patch("handlers.messages.helpers.get_mapped_target_user_id", return_value=None),
             patch("handlers.messages.helpers.get_federated_workspace_for_sync", return_value=None),
-            patch("handlers.messages.helpers.decrypt_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_workspace_client", return_value=MagicMock()),
             patch("handlers.messages.helpers.apply_mentioned_users", side_effect=lambda t, *a, **k: t),
             patch("handlers.messages.helpers.resolve_channel_references", side_effect=lambda t, *a, **k: t),
             patch("handlers.messages.helpers.get_workspace_by_id", return_value=None),
@@ -96,7 +97,8 @@ class TestSplitMessagePostMeta:
             patch("handlers.messages.helpers.get_user_info", return_value=("N", "http://i")),
             patch("handlers.messages.helpers.get_mapped_target_user_id", return_value=None),
             patch("handlers.messages.helpers.get_federated_workspace_for_sync", return_value=None),
-            patch("handlers.messages.helpers.decrypt_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_bot_token", return_value="xoxb-test"),
+            patch("handlers.messages.helpers.get_workspace_client", return_value=MagicMock()),
             patch("handlers.messages.helpers.apply_mentioned_users", side_effect=lambda t, *a, **k: t),
             patch("handlers.messages.helpers.resolve_channel_references", side_effect=lambda t, *a, **k: t),
             patch("handlers.messages.helpers.get_workspace_by_id", return_value=None),